@@ -4,13 +4,14 @@ import typing
 from datetime import datetime, time, timedelta
 
 import discord
-import enkanetwork
 from discord import app_commands
 from discord.app_commands import Choice
 from discord.ext import commands, tasks
 
+from enka_network import update_enka_assets
 from genshin_py import auto_task
 from utility import SlashCommandLogger, config
+from utility.loop_monitor import SlowCallbackMonitor
 
 
 class Admin(commands.Cog):
@@ -74,10 +75,7 @@ class Admin(commands.Cog):
                 await interaction.edit_original_response(content="Start Daily Auto Check-In")
                 asyncio.create_task(auto_task.DailyReward.execute(self.bot))
             case "UPDATE_ENKA_ASSETS":  # 更新 Enka 新版本素材資料
-                client = enkanetwork.EnkaNetworkAPI()
-                async with client:
-                    await client.update_assets()
-                enkanetwork.Assets(lang=enkanetwork.Language.EN)
+                await update_enka_assets()
                 await interaction.edit_original_response(content="Enka data update completed")
 
     # /config指令：設定config配置檔案的參數值
@@ -131,6 +129,34 @@ class Admin(commands.Cog):
                 + "If the daily autosign-in time is within this range, use the /config command to change the daily autosign-in time."
             )
 
+    # /slow_callbacks指令：查看最近阻塞 event loop 的程式碼
+    @app_commands.command(name="slow_callbacks", description="Show recent code that blocked the event loop")
+    @SlashCommandLogger
+    async def slash_slow_callbacks(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can use this command", ephemeral=True)
+            return
+        if config.slow_callback_threshold is None:
+            await interaction.response.send_message(
+                "Slow callback monitor is disabled, set SLOW_CALLBACK_THRESHOLD to enable it", ephemeral=True
+            )
+            return
+
+        records = list(SlowCallbackMonitor.records)[-5:]
+        if len(records) == 0:
+            await interaction.response.send_message("No slow callbacks recorded", ephemeral=True)
+            return
+        embed = discord.Embed(title=f"Slow Callbacks (threshold {config.slow_callback_threshold}s)")
+        for record in reversed(records):
+            # 只顯示 stack 最後幾行 (最接近阻塞發生處)，避免超過嵌入訊息欄位長度上限
+            stack = record.stack[-900:]
+            embed.add_field(
+                name=f"{record.time:%Y-%m-%d %H:%M:%S} blocked {record.duration:.2f}s",
+                value=f"```{stack}```",
+                inline=False,
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     # ======== Loop Task ========
 
     # 每一定時間更改機器人狀態
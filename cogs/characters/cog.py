@@ -12,6 +12,7 @@ from genshinpyrail.src.tools.model import GenshinCharterList, StarRaillCharterLi
 import genshin_py
 from utility import EmbedTemplate
 from utility.custom_log import SlashCommandLogger
+from utility.startup import WarmUp
 
 from .ui import DropdownView
 
@@ -45,6 +46,8 @@ class CharactersCog(commands.Cog, name="character"):
         user: discord.User | discord.Member | None = None,
     ):
         user = user or interaction.user
+        if game == genshin.Game.GENSHIN and not await WarmUp.check_ready(interaction, "genshin_characters"):
+            return
         try:
             match game:
                 case genshin.Game.GENSHIN:
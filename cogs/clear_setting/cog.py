@@ -2,6 +2,9 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+import enka_network
+import genshin_py
+import star_rail.showcase
 from database import Database
 from utility import custom_log
 
@@ -20,7 +23,13 @@ class ClearSettingCog(commands.Cog, name="user_data"):
 
         await view.wait()
         if view.value is True:
-            await Database.delete_all(interaction.user.id)
+            uid_genshin, uid_starrail = await Database.delete_all(interaction.user.id)
+            genshin_py.ClientPool.invalidate(interaction.user.id)
+            # 清除記憶體內保存的展示櫃資料，避免已刪除的資料在有效時間內繼續被使用
+            if uid_genshin is not None:
+                enka_network.Showcase.invalidate(uid_genshin)
+            if uid_starrail is not None:
+                star_rail.showcase.Showcase.invalidate(uid_starrail)
             await interaction.edit_original_response(content="All user information has been deleted", view=None)
         else:
             await interaction.edit_original_response(content="Cancel command", view=None)
@@ -1,5 +1,5 @@
-import random
-from typing import Iterable, List, Literal
+import asyncio
+from typing import ClassVar, List, Literal
 
 import discord
 import sentry_sdk
@@ -8,7 +8,8 @@ from discord.app_commands import Choice
 from discord.ext import commands
 
 import genshin_db
-from utility import EmbedTemplate, config, custom_log
+from utility import LOG, EmbedTemplate, config, custom_log
+from utility.startup import WarmUp
 
 from .ui import SearchResultsDropdown
 
@@ -16,9 +17,51 @@ StrCategory = Literal["角色", "武器", "聖遺物", "物品/食物", "成就"
 
 
 class Search(commands.Cog, name="search"):
-    def __init__(self, bot: commands.Bot, genshin_db_data: genshin_db.GenshinDbAllData):
+    RETRY_MIN_DELAY: ClassVar[float] = 30.0
+    """沒有本地快照時，從 API 取得資料失敗後第一次重試的等待秒數，之後每次加倍"""
+    RETRY_MAX_DELAY: ClassVar[float] = 1800.0
+    """重試的最長等待秒數"""
+
+    def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = genshin_db_data
+        self.refresh_task: asyncio.Task | None = None
+        self.refresh_failed = False
+        """沒有本地快照且從 API 取得資料失敗，正在等待重試"""
+
+    async def cog_load(self) -> None:
+        # 先從本地快照載入資料，再從 API 背景更新，不阻塞機器人啟動
+        await genshin_db.GenshinDbSnapshot.load()
+        self.refresh_task = WarmUp.start("genshin_db", self.refresh_data)
+
+    async def refresh_data(self) -> None:
+        """從 API 更新 genshin-db 資料；已有本地快照時失敗就繼續使用快照，
+        沒有任何資料時則以指數退避重試，直到取得資料為止"""
+        delay = self.RETRY_MIN_DELAY
+        while True:
+            try:
+                await genshin_db.GenshinDbSnapshot.refresh()
+            except Exception as e:
+                if genshin_db.GenshinDbSnapshot.data is not None:
+                    raise
+                self.refresh_failed = True
+                LOG.Error(f"genshin-db 資料取得失敗 {e}，{delay:.0f} 秒後重試")
+                sentry_sdk.capture_exception(e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RETRY_MAX_DELAY)
+            else:
+                self.refresh_failed = False
+                return
+
+    async def cog_unload(self) -> None:
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+
+    @property
+    def db(self) -> genshin_db.GenshinDbAllData:
+        """目前使用中的 genshin-db 資料"""
+        if (data := genshin_db.GenshinDbSnapshot.data) is None:
+            raise RuntimeError("genshin-db 資料尚未載入")
+        return data
 
     @app_commands.command(name="zbeta_search", description="Search Genshin Impact database, including characters, weapons, various items, achievements, etc ..")
     @app_commands.rename(category="類別", item_name="名稱")
@@ -41,37 +84,41 @@ class Search(commands.Cog, name="search"):
         item_name: str,
     ):
         """搜尋 genshin-db 資料庫斜線指令"""
+        if genshin_db.GenshinDbSnapshot.data is None:
+            message = "資料載入失敗，正在重新嘗試，請稍後再試" if self.refresh_failed else "資料載入中，請稍後再試"
+            await interaction.response.send_message(embed=EmbedTemplate.error(message), ephemeral=True)
+            return
         titles: list[str] = []
         embeds: list[discord.Embed] = []
         match category:
             case "角色":
                 character = self.db.characters.find(item_name)
                 titles.append("基本資料")
-                embeds.append(genshin_db.parse(character))
+                embeds.append(genshin_db.EmbedCache.parse(character))
 
                 # 旅行者多元素特殊處理
                 if "旅行者" in item_name:
                     for element in ["風", "岩", "雷", "草"]:
                         talent = self.db.talents.find(f"旅行者 ({element}元素)")
                         titles.append(f"天賦：{element}")
-                        embeds.append(genshin_db.parse(talent))
+                        embeds.append(genshin_db.EmbedCache.parse(talent))
                     for element in ["風", "岩", "雷", "草"]:
                         constell = self.db.constellations.find(f"旅行者 ({element}元素)")
                         titles.append(f"命座：{element}")
-                        embeds.append(genshin_db.parse(constell))
+                        embeds.append(genshin_db.EmbedCache.parse(constell))
                 else:
                     talent = self.db.talents.find(item_name)
                     titles.append("天賦")
-                    embeds.append(genshin_db.parse(talent))
+                    embeds.append(genshin_db.EmbedCache.parse(talent))
                     constell = self.db.constellations.find(item_name)
                     titles.append("命座")
-                    embeds.append(genshin_db.parse(constell))
+                    embeds.append(genshin_db.EmbedCache.parse(constell))
             case "聖遺物":
                 artifact = self.db.artifacts.find(item_name)
                 if artifact is None:
                     return
                 titles = ["總覽"]
-                embeds = [genshin_db.parse(artifact)]
+                embeds = [genshin_db.EmbedCache.parse(artifact)]
                 _titles = ["花", "羽", "沙", "杯", "頭"]
                 _parts = [
                     artifact.flower,
@@ -83,10 +130,10 @@ class Search(commands.Cog, name="search"):
                 for i, _part in enumerate(_parts):
                     if _part is not None:
                         titles.append(_titles[i])
-                        embeds.append(genshin_db.parse(_part))
+                        embeds.append(genshin_db.EmbedCache.parse(_part))
             case _:
                 item = self.db.find(item_name)
-                embeds.append(genshin_db.parse(item))
+                embeds.append(genshin_db.EmbedCache.parse(item))
 
         match len(embeds):
             case 0:
@@ -109,36 +156,23 @@ class Search(commands.Cog, name="search"):
         # which means that if a parameter was renamed then the
         # renamed key is used instead of the function parameter name.
         category: StrCategory | None = interaction.namespace.類別
-        if category is None:
+        if category is None or genshin_db.GenshinDbSnapshot.data is None:
             return []
 
-        item_list: Iterable[genshin_db.GenshinDbBase] = {
-            "角色": self.db.characters.list,
-            "武器": self.db.weapons.list,
-            "聖遺物": self.db.artifacts.list,
-            "物品/食物": self.db.materials.list + self.db.foods.list,
-            "成就": self.db.achievements.list,
-            "七聖召喚": self.db.tcg_cards.list,
-        }.get(category, [])
-
-        choices: List[Choice[str]] = []
-        for item in item_list:
-            if current.lower() in item.name.lower():
-                choices.append(Choice(name=item.name, value=item.name))
-        # 使用者沒輸入的情況下，隨機找 25 個
-        if current == "":
-            choices = random.sample(choices, k=25)
-
-        choices = choices[:25]
-        choices.sort(key=lambda choice: choice.name)
-        return choices
+        index = self.db.search_indices.get(
+            {
+                "角色": "characters",
+                "武器": "weapons",
+                "聖遺物": "artifacts",
+                "物品/食物": "items",
+                "成就": "achievements",
+                "七聖召喚": "tcg_cards",
+            }.get(category, "")
+        )
+        if index is None:
+            return []
+        return [Choice(name=name, value=name) for name in index.search(current)]
 
 
 async def setup(client: commands.Bot):
-    try:
-        gdb_data = await genshin_db.fetch_all()
-    except Exception as e:
-        custom_log.LOG.Error(str(e))
-        sentry_sdk.capture_exception(e)
-    else:
-        await client.add_cog(Search(client, gdb_data))
+    await client.add_cog(Search(client))
@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 import psutil
 from discord import AutoShardedClient, Interaction, InteractionType
 from discord.ext import commands, tasks
@@ -12,10 +15,12 @@ class PrometheusCog(commands.Cog):
         self.bot = bot
         self.set_metrics_loop.start()
         self.set_metrics_loop_users.start()
+        self.measure_event_loop_lag.start()
 
     async def cog_unload(self) -> None:
         self.set_metrics_loop.cancel()
         self.set_metrics_loop_users.cancel()
+        self.measure_event_loop_lag.cancel()
 
     @tasks.loop(seconds=5)
     async def set_metrics_loop(self):
@@ -35,6 +40,14 @@ class PrometheusCog(commands.Cog):
     async def before_set_metrics_loop(self):
         await self.bot.wait_until_ready()
 
+    @tasks.loop(seconds=1)
+    async def measure_event_loop_lag(self):
+        """循環測量 event loop 的延遲：睡眠固定時間後，實際經過的時間超出的部分即為延遲"""
+        interval = 0.5
+        start_time = time.perf_counter()
+        await asyncio.sleep(interval)
+        Metrics.EVENT_LOOP_LAG.observe(max(time.perf_counter() - start_time - interval, 0))
+
     @tasks.loop(seconds=300)
     async def set_metrics_loop_users(self):
         """循環更新使用者總數量"""
@@ -10,6 +10,7 @@ from discord.ext import commands
 import genshin_py
 from utility import EmbedTemplate, config
 from utility.custom_log import LOG, ContextCommandLogger, SlashCommandLogger
+from utility.render_executor import RenderExecutor
 
 
 class RecordCard:
@@ -32,9 +33,13 @@ class RecordCard:
         try:
             avatar_bytes = await user.display_avatar.read()
             if option == "RECORD":
-                fp = genshin_py.draw_record_card(avatar_bytes, uid, userstats)
+                fp = await RenderExecutor.run(
+                    genshin_py.draw_record_card, avatar_bytes, uid, userstats
+                )
             elif option == "EXPLORATION":
-                fp = genshin_py.draw_exploration_card(avatar_bytes, uid, userstats)
+                fp = await RenderExecutor.run(
+                    genshin_py.draw_exploration_card, avatar_bytes, uid, userstats
+                )
         except Exception as e:
             LOG.ErrorLog(interaction, e)
             sentry_sdk.capture_exception(e)
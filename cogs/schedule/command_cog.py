@@ -16,6 +16,7 @@ from database import (
     StarrailScheduleNotes,
     ZZZScheduleNotes,
 )
+from genshin_py.auto_task import RealtimeNotes
 from utility import EmbedTemplate, get_app_command_mention
 from utility.custom_log import SlashCommandLogger
 
@@ -162,7 +163,7 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
                 )
 
             elif switch == "OFF":  # 關閉簽到功能
-                await Database.delete(
+                await Database.delete_where(
                     ScheduleDailyCheckin, ScheduleDailyCheckin.discord_id.is_(interaction.user.id)
                 )
                 await interaction.response.send_message(
@@ -177,10 +178,11 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
                 )
                 await interaction.response.send_modal(GenshinNotesThresholdModal(genshin_setting))
             elif switch == "OFF":  # 關閉即時便箋檢查功能
-                await Database.delete(
+                await Database.delete_where(
                     GenshinScheduleNotes,
                     GenshinScheduleNotes.discord_id.is_(interaction.user.id),
                 )
+                RealtimeNotes.unschedule(GenshinScheduleNotes, interaction.user.id)
                 await interaction.response.send_message(
                     embed=EmbedTemplate.normal("Real-time notes checking reminder for Genshin Impact has been turned off.")
                 )
@@ -195,10 +197,11 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
                     StarrailCheckNotesThresholdModal(starrail_setting)
                 )
             elif switch == "OFF":  # 關閉即時便箋檢查功能
-                await Database.delete(
+                await Database.delete_where(
                     StarrailScheduleNotes,
                     StarrailScheduleNotes.discord_id.is_(interaction.user.id),
                 )
+                RealtimeNotes.unschedule(StarrailScheduleNotes, interaction.user.id)
                 await interaction.response.send_message(
                     embed=EmbedTemplate.normal("Real-time notes checking reminder for Honkai: Star Rail has been turned off.")
                 )
@@ -211,10 +214,11 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
                 )
                 await interaction.response.send_modal(ZZZCheckNotesThresholdModal(zzz_setting))
             elif switch == "OFF":  # 關閉即時便箋檢查功能
-                await Database.delete(
+                await Database.delete_where(
                     ZZZScheduleNotes,
                     ZZZScheduleNotes.discord_id.is_(interaction.user.id),
                 )
+                RealtimeNotes.unschedule(ZZZScheduleNotes, interaction.user.id)
                 await interaction.response.send_message(
                     embed=EmbedTemplate.normal("絕區零即時便箋檢查提醒已關閉")
                 )
@@ -243,7 +247,7 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
     ):
         channel_id = interaction.channel_id
         if function == "DAILY":
-            await Database.delete(
+            await Database.delete_where(
                 ScheduleDailyCheckin,
                 ScheduleDailyCheckin.discord_id.is_(user.id)
                 & ScheduleDailyCheckin.discord_channel_id.is_(channel_id),
@@ -252,7 +256,7 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
                 embed=EmbedTemplate.normal(f"{user.name} The daily automatic check-in has been turned off")
             )
         elif function == "GENSHIN_NOTES":
-            await Database.delete(
+            await Database.delete_where(
                 GenshinScheduleNotes,
                 GenshinScheduleNotes.discord_id.is_(user.id)
                 & GenshinScheduleNotes.discord_channel_id.is_(channel_id),
@@ -261,7 +265,7 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
                 embed=EmbedTemplate.normal(f"{user.name} The real-time notes reminder for Genshin Impact has been turned off")
             )
         elif function == "STARRAIL_NOTES":
-            await Database.delete(
+            await Database.delete_where(
                 StarrailScheduleNotes,
                 StarrailScheduleNotes.discord_id.is_(user.id)
                 & StarrailScheduleNotes.discord_channel_id.is_(channel_id),
@@ -270,7 +274,7 @@ class ScheduleCommandCog(commands.Cog, name="Schedule"):
                 embed=EmbedTemplate.normal(f"{user.name} The real-time notes reminder for Honkai: Star Rail has been turned off")
             )
         elif function == "ZZZ_NOTES":
-            await Database.delete(
+            await Database.delete_where(
                 ZZZScheduleNotes,
                 ZZZScheduleNotes.discord_id.is_(user.id)
                 & ZZZScheduleNotes.discord_channel_id.is_(channel_id),
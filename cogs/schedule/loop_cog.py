@@ -1,12 +1,11 @@
 import asyncio
-import shutil
-from datetime import date, datetime
+from datetime import datetime
 
 import sentry_sdk
 from discord.ext import commands, tasks
 
 import database
-from genshin_py import auto_task
+from genshin_py import ClientPool, auto_task
 from utility import config
 from utility.custom_log import LOG
 
@@ -18,6 +17,9 @@ class ScheduleLoopCog(commands.Cog, name="排程循環"):
 
     async def cog_unload(self) -> None:
         self.schedule.cancel()
+        auto_task.RealtimeNotes.stop()
+        # 發送佇列內尚未發送的排程通知
+        await auto_task.NotificationDispatcher.flush()
 
     loop_interval = 1  # 循環間隔1分鐘
 
@@ -26,6 +28,9 @@ class ScheduleLoopCog(commands.Cog, name="排程循環"):
         """排程主循環，每 {loop_interval} 分鐘執行排程相關函式"""
 
         now = datetime.now()
+        # 即時便箋為常駐排程，依照使用者的下次檢查時間自行喚醒，這裡只確保排程正在執行
+        await auto_task.RealtimeNotes.execute(self.bot)
+
         # 確認沒有在遊戲維護時間內
         if config.game_maintenance_time is None or not (
             config.game_maintenance_time[0] <= now < config.game_maintenance_time[1]
@@ -34,20 +39,25 @@ class ScheduleLoopCog(commands.Cog, name="排程循環"):
             if now.minute % config.schedule_daily_checkin_interval < self.loop_interval:
                 asyncio.create_task(auto_task.DailyReward.execute(self.bot))
 
-            # 每 {config.schedule_check_resin_interval} 分鐘檢查一次樹脂
-            if now.minute % config.schedule_check_resin_interval < self.loop_interval:
-                asyncio.create_task(auto_task.RealtimeNotes.execute(self.bot))
-
         # 每日凌晨一點備份資料庫、刪除過期使用者資料
         if now.hour == 1 and now.minute < self.loop_interval:
-            try:
-                db_path = "data/bot/bot.db"
-                today = date.today()
-                shutil.copyfile(db_path, f"{db_path.split('.')[0]}_backup_{today}.db")
-            except Exception as e:
-                LOG.Error(str(e))
-                sentry_sdk.capture_exception(e)
-            asyncio.create_task(database.Tool.remove_expired_user(config.expired_user_days))
+            asyncio.create_task(self.backup_database())
+            asyncio.create_task(self.remove_expired_user())
+
+    async def backup_database(self):
+        """備份資料庫，備份在 worker thread 執行，不阻塞 event loop"""
+        try:
+            await database.Backup.run()
+        except Exception as e:
+            LOG.Error(str(e))
+            sentry_sdk.capture_exception(e)
+
+    async def remove_expired_user(self):
+        """刪除過期使用者，並清除 Client 快取池內可能已被刪除的使用者"""
+        try:
+            await database.Tool.remove_expired_user(config.expired_user_days)
+        finally:
+            ClientPool.clear()
 
     @schedule.before_loop
     async def before_schedule(self):
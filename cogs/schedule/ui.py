@@ -4,6 +4,7 @@ from typing import overload
 import discord
 
 from database import Database, GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes
+from genshin_py.auto_task import RealtimeNotes
 from utility import EmbedTemplate, config
 
 
@@ -233,17 +234,17 @@ class GenshinNotesThresholdModal(BaseNotesThresholdModal, title="Set Genshin Imp
             )
         else:
             # 儲存設定資料
-            await Database.insert_or_replace(
-                GenshinScheduleNotes(
-                    discord_id=interaction.user.id,
-                    discord_channel_id=interaction.channel_id or 0,
-                    threshold_resin=resin,
-                    threshold_currency=realm_currency,
-                    threshold_transformer=transformer,
-                    threshold_expedition=expedition,
-                    check_commission_time=commission_time,
-                )
+            settings = GenshinScheduleNotes(
+                discord_id=interaction.user.id,
+                discord_channel_id=interaction.channel_id or 0,
+                threshold_resin=resin,
+                threshold_currency=realm_currency,
+                threshold_transformer=transformer,
+                threshold_expedition=expedition,
+                check_commission_time=commission_time,
             )
+            await Database.insert_or_replace(settings)
+            RealtimeNotes.schedule(settings)
             await interaction.response.send_message(
                 embed = EmbedTemplate.normal(
                     f"Genshin Impact settings completed. Reminders will be sent when the following thresholds are reached:\n"
@@ -375,17 +376,17 @@ class StarrailCheckNotesThresholdModal(BaseNotesThresholdModal, title="Set Honka
             )
         else:
             # 儲存設定資料
-            await Database.insert_or_replace(
-                StarrailScheduleNotes(
-                    discord_id=interaction.user.id,
-                    discord_channel_id=interaction.channel_id or 0,
-                    threshold_power=power,
-                    threshold_expedition=expedition,
-                    check_daily_training_time=dailytraining_time,
-                    check_universe_time=universe_time,
-                    check_echoofwar_time=echoofwar_time,
-                )
+            settings = StarrailScheduleNotes(
+                discord_id=interaction.user.id,
+                discord_channel_id=interaction.channel_id or 0,
+                threshold_power=power,
+                threshold_expedition=expedition,
+                check_daily_training_time=dailytraining_time,
+                check_universe_time=universe_time,
+                check_echoofwar_time=echoofwar_time,
             )
+            await Database.insert_or_replace(settings)
+            RealtimeNotes.schedule(settings)
             await interaction.response.send_message(
                 embed = EmbedTemplate.normal(
                     f"Honkai: Star Rail settings completed. Reminders will be sent when the following thresholds are reached:\n"
@@ -455,14 +456,14 @@ class ZZZCheckNotesThresholdModal(BaseNotesThresholdModal, title="Set Zenless Zo
             )
         else:
             # 儲存設定資料
-            await Database.insert_or_replace(
-                ZZZScheduleNotes(
-                    discord_id=interaction.user.id,
-                    discord_channel_id=interaction.channel_id or 0,
-                    threshold_battery=battery,
-                    check_daily_engagement_time=dailyengagement_time,
-                )
+            settings = ZZZScheduleNotes(
+                discord_id=interaction.user.id,
+                discord_channel_id=interaction.channel_id or 0,
+                threshold_battery=battery,
+                check_daily_engagement_time=dailyengagement_time,
             )
+            await Database.insert_or_replace(settings)
+            RealtimeNotes.schedule(settings)
             await interaction.response.send_message(
                 embed=EmbedTemplate.normal(
                     f"Zenless Zone Zero settings completed. Reminders will be sent when the following thresholds are reached：\n"
@@ -1,11 +1,12 @@
 from typing import Literal, Optional
 
 import discord
-import enkanetwork
 from discord import app_commands
 from discord.ext import commands
 
+from enka_network import update_enka_assets
 from utility.custom_log import ContextCommandLogger, SlashCommandLogger
+from utility.startup import WarmUp
 
 from .ui_genshin import showcase as genshin_showcase
 from .ui_starrail import showcase as starrail_showcase
@@ -34,21 +35,22 @@ class ShowcaseCog(commands.Cog, name="showcase"):
     ):
         match game:
             case "Genshin Impact":
+                if not await WarmUp.check_ready(interaction, "enka_assets"):
+                    return
                 await genshin_showcase(interaction, user or interaction.user, uid)
             case "Honkai: Star Rail":
                 await starrail_showcase(interaction, user or interaction.user, uid)
 
 
 async def setup(client: commands.Bot):
-    # 更新 Enka 素材資料
-    enka = enkanetwork.EnkaNetworkAPI()
-    async with enka:
-        await enka.update_assets()
-    enkanetwork.Assets(lang=enkanetwork.Language.EN)
+    # 在背景更新 Enka 素材資料，更新完成前使用本地既有的素材
+    WarmUp.start("enka_assets", update_enka_assets)
 
     await client.add_cog(ShowcaseCog(client))
 
     @client.tree.context_menu(name="showcase")
     @ContextCommandLogger
     async def context_showcase(interaction: discord.Interaction, user: discord.User):
+        if not await WarmUp.check_ready(interaction, "enka_assets"):
+            return
         await genshin_showcase(interaction, user, None)
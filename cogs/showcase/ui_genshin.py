@@ -5,7 +5,7 @@ import discord
 import enkanetwork
 import sentry_sdk
 
-from database import Database, GenshinShowcase, User
+from database import Database, User
 from enka_network import Showcase, enka_assets
 from utility import EmbedTemplate, config, emoji, get_app_command_mention
 from utility.custom_log import LOG
@@ -19,7 +19,7 @@ class ShowcaseCharactersDropdown(discord.ui.Select):
     def __init__(self, showcase: Showcase) -> None:
         self.showcase = showcase
         options = [discord.SelectOption(label="Player Profile", value="-1", emoji="📜")]
-        for i, character in enumerate(showcase.data.player.characters_preview):  # type: ignore
+        for i, character in enumerate(showcase.player_data.player.characters_preview):  # type: ignore
             element = {
                 enkanetwork.ElementType.Pyro: "pyro",
                 enkanetwork.ElementType.Electro: "electro",
@@ -67,10 +67,7 @@ class ShowcaseCharactersDropdown(discord.ui.Select):
                 )
             else:
                 embed = self.showcase.get_player_overview_embed()
-                await Database.delete(
-                    GenshinShowcase,
-                    GenshinShowcase.uid.is_(self.showcase.uid),
-                )
+                await self.showcase.delete_data()
                 await interaction.response.edit_message(embed=embed, view=None, attachments=[])
 
 
@@ -127,7 +124,7 @@ class ShowcaseView(discord.ui.View):
             self.add_item(ShowcaseButton("Character", showcase.get_character_stat_embed, character_index))
             self.add_item(ShowcaseButton("Artifact", showcase.get_artifact_stat_embed, character_index))
 
-        if showcase.data.player.characters_preview:  # type: ignore
+        if showcase.player_data.player.characters_preview:  # type: ignore
             self.add_item(ShowcaseCharactersDropdown(showcase))
 
 
@@ -3,7 +3,7 @@ from typing import Any
 import discord
 import sentry_sdk
 
-from database import Database, StarrailShowcase, User
+from database import Database, User
 from star_rail.showcase import Showcase
 from utility import EmbedTemplate, config, emoji, get_app_command_mention
 from utility.custom_log import LOG
@@ -57,10 +57,7 @@ class ShowcaseCharactersDropdown(discord.ui.Select):
                 )
             else:
                 embed = self.showcase.get_player_overview_embed()
-                await Database.delete(
-                    StarrailShowcase,
-                    StarrailShowcase.uid.is_(self.showcase.uid),
-                )
+                await self.showcase.delete_data()
                 await interaction.response.edit_message(embed=embed, view=None, attachments=[])
 
 
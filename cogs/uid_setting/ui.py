@@ -3,6 +3,7 @@ import typing
 import discord
 import genshin
 
+import genshin_py
 from database import Database, User
 from utility import EmbedTemplate, get_server_name
 
@@ -38,6 +39,7 @@ class UIDModal(discord.ui.Modal, title="提交UID"):
                 user.uid_zzz = int(self.uid.value)
         try:
             await Database.insert_or_replace(user)
+            genshin_py.ClientPool.invalidate(interaction.user.id)
         except Exception as e:
             await interaction.response.send_message(embed=EmbedTemplate.error(e), ephemeral=True)
         else:
@@ -77,6 +79,7 @@ class UidDropdown(discord.ui.Select):
             case genshin.Game.ZZZ:
                 user.uid_zzz = uid
         await Database.insert_or_replace(user)
+        genshin_py.ClientPool.invalidate(interaction.user.id)
         await interaction.response.edit_message(
             embed=EmbedTemplate.normal(f"UID {uid} set completed"), view=None
         )
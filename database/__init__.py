@@ -1,4 +1,6 @@
 from .app import Database
+from .backup import Backup
+from .buffer import LastUsedTimeBuffer
 from .dataclass import *
 from .migration import migrate
 from .models import (
@@ -0,0 +1,37 @@
+"""增加排程資料表索引
+
+Revision ID: 7e3b9c41d2a8
+Revises: b446593bd37f
+Create Date: 2026-10-18 10:12:31.508214
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7e3b9c41d2a8"
+down_revision = "b446593bd37f"
+branch_labels = None
+depends_on = None
+
+# (資料表, 欄位)
+INDEXES = [
+    ("users", "last_used_time"),
+    ("schedule_daily_checkin", "next_checkin_time"),
+    ("schedule_daily_checkin", "discord_channel_id"),
+    ("genshin_schedule_notes", "next_check_time"),
+    ("genshin_schedule_notes", "discord_channel_id"),
+    ("starrail_schedule_notes", "next_check_time"),
+    ("starrail_schedule_notes", "discord_channel_id"),
+    ("zzz_schedule_notes", "next_check_time"),
+    ("zzz_schedule_notes", "discord_channel_id"),
+]
+
+
+def upgrade() -> None:
+    for table, column in INDEXES:
+        op.create_index(f"ix_{table}_{column}", table, [column], unique=False)
+
+
+def downgrade() -> None:
+    for table, column in INDEXES:
+        op.drop_index(f"ix_{table}_{column}", table_name=table)
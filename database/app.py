@@ -1,36 +1,78 @@
+import asyncio
 import pathlib
-from typing import Sequence, TypeVar
+from typing import Any, ClassVar, Final, Mapping, Sequence, TypeVar
 
 import sqlalchemy
 from alembic import command as alembic_cmd
 from alembic.config import Config as alembic_config
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.sql._typing import ColumnExpressionArgument
 
+from utility import config
+
 from .models import (
     Base,
+    GeetestChallenge,
     GenshinScheduleNotes,
     GenshinShowcase,
     GenshinSpiralAbyss,
     ScheduleDailyCheckin,
+    StarrailForgottenHall,
+    StarrailPureFiction,
+    StarrailScheduleNotes,
     StarrailShowcase,
     User,
+    ZZZScheduleNotes,
 )
 
 DatabaseModel = Base
 T_DatabaseModel = TypeVar("T_DatabaseModel", bound=Base)
 
 
+SQLITE_PROFILES: Final[dict[str, dict[str, str | int]]] = {
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+}
+"""SQLite 效能設定檔，由 `config.sqlite_profile` 選擇，在每條連線建立時以 PRAGMA 套用
+- default: SQLite 預設值 (rollback journal，每次 commit 都 fsync)
+- performance: WAL journal、synchronous=NORMAL、5 秒 busy_timeout、256MB mmap、64MB 快取
+"""
+
 _engine = create_async_engine("sqlite+aiosqlite:///data/bot/bot.db")
 _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
 
 
+@sqlalchemy.event.listens_for(_engine.sync_engine, "connect")
+def _apply_sqlite_profile(dbapi_connection, connection_record) -> None:
+    """資料庫連線建立時，套用 config 所選擇的 SQLite 效能設定檔"""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PROFILES[config.sqlite_profile].items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
 class Database:
-    """資料庫方法類別，提供類別方法來操作資料庫，包含了：初始化、關閉、插入、選擇、刪除"""
+    """資料庫方法類別，提供類別方法來操作資料庫，包含了：初始化、關閉、插入、選擇、更新、刪除"""
 
     engine = _engine
     sessionmaker = _sessionmaker
 
+    WRITE_BATCH_SIZE: Final[int] = 100
+    """寫入佇列每個交易最多合併的寫入數量"""
+
+    _write_queue: ClassVar[asyncio.Queue[tuple[DatabaseModel, asyncio.Future[None]]]] = (
+        asyncio.Queue()
+    )
+    _writer_task: ClassVar[asyncio.Task | None] = None
+
     @classmethod
     async def init(cls) -> None:
         """初始化資料庫，在 bot 最初運行時需要呼叫一次"""
@@ -43,15 +85,21 @@ class Database:
             async with cls.engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
             alembic_cmd.stamp(alembic_cfg, "head")
+        cls._writer_task = asyncio.create_task(cls._writer())
 
     @classmethod
     async def close(cls) -> None:
         """關閉資料庫，在 bot 關閉前需要呼叫一次"""
+        if cls._writer_task is not None:
+            await cls._write_queue.join()  # 等待佇列內的寫入完成
+            cls._writer_task.cancel()
+            cls._writer_task = None
         await cls.engine.dispose()
 
     @classmethod
     async def insert_or_replace(cls, instance: DatabaseModel) -> None:
         """插入物件到資料庫，若已存在相同 Primary Key，則以新物件取代舊物件，
+        資料庫初始化後會交由單一寫入任務與其他同時送出的寫入合併在同一個交易內 commit，
         Example: `Database.insert_or_replace(User(discord_id=123))`
 
         Paramaters:
@@ -59,9 +107,49 @@ class Database:
         instance: `DatabaseModel`
             資料庫 Table (ORM) 的實例物件
         """
-        async with cls.sessionmaker() as session:
-            await session.merge(instance)
-            await session.commit()
+        if cls._writer_task is None or cls._writer_task.done():
+            # 寫入任務未啟動時 (例如資料庫遷移)，直接寫入
+            async with cls.sessionmaker() as session:
+                await session.merge(instance)
+                await session.commit()
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        await cls._write_queue.put((instance, future))
+        await future
+
+    @classmethod
+    async def _writer(cls) -> None:
+        """單一寫入任務：將寫入佇列中的多筆 `insert_or_replace` 合併在同一個交易內 commit，
+        同一個 Table 的物件以單一 `INSERT ... ON CONFLICT DO UPDATE` 語句寫入，
+        避免多個協程各自開啟交易互相等待資料庫的寫入鎖，同時減少 fsync 的次數"""
+        while True:
+            batch = [await cls._write_queue.get()]
+            while len(batch) < cls.WRITE_BATCH_SIZE and not cls._write_queue.empty():
+                batch.append(cls._write_queue.get_nowait())
+            try:
+                async with cls.sessionmaker() as session:
+                    await cls._upsert(session, [instance for instance, _ in batch])
+                    await session.commit()
+            except Exception:
+                # 合併寫入失敗時改為逐筆寫入，讓錯誤只影響造成錯誤的那一筆
+                for instance, future in batch:
+                    try:
+                        async with cls.sessionmaker() as session:
+                            await session.merge(instance)
+                            await session.commit()
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(None)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            finally:
+                for _ in batch:
+                    cls._write_queue.task_done()
 
     @classmethod
     async def select_one(
@@ -96,6 +184,7 @@ class Database:
         cls,
         table: type[T_DatabaseModel],
         whereclause: ColumnExpressionArgument[bool] | None = None,
+        order_by: ColumnExpressionArgument[Any] | None = None,
     ) -> Sequence[T_DatabaseModel]:
         """指定資料庫 Table 與選擇條件，從資料庫選擇符合條件的全部物件
 
@@ -106,6 +195,9 @@ class Database:
         whereclause: `ColumnExpressionArgument[bool]` | `None`
             - ORM Column 的 Where 選擇條件，若為 `None` 則表示選擇該 Table 內全部資料
             - Ex: `GenshinSpiralAbyss.discord_id.is_(123456)`
+        order_by: `ColumnExpressionArgument` | `None`
+            - 排序的欄位，若為 `None` 則不排序
+            - Ex: `ScheduleDailyCheckin.next_checkin_time`
 
         Returns
         ------
@@ -116,6 +208,8 @@ class Database:
             stmt = sqlalchemy.select(table)
             if whereclause is not None:
                 stmt = stmt.where(whereclause)
+            if order_by is not None:
+                stmt = stmt.order_by(order_by)
             result = await session.execute(stmt)
             return result.scalars().all()
 
@@ -133,39 +227,156 @@ class Database:
             await session.commit()
 
     @classmethod
-    async def delete(
-        cls, table: type[T_DatabaseModel], whereclause: ColumnExpressionArgument[bool]
-    ) -> None:
-        """指定資料庫 Table 與 where 條件，從資料庫刪除符合條件的物件，
-        Example: `Database.delete(User, User.discord_id.is_(id))`
+    async def insert_or_replace_many(cls, instances: Sequence[DatabaseModel]) -> None:
+        """在同一個交易內插入多個物件到資料庫，若已存在相同 Primary Key，則以新物件取代舊物件，
+        同一個 Table 的物件會以單一 `INSERT ... ON CONFLICT DO UPDATE` 語句寫入
+
+        Paramaters:
+        ------
+        instances: `Sequence[DatabaseModel]`
+            資料庫 Table (ORM) 的實例物件，可以包含不同 Table 的物件
+        """
+        if len(instances) == 0:
+            return
+        async with cls.sessionmaker() as session:
+            await cls._upsert(session, instances)
+            await session.commit()
+
+    @staticmethod
+    async def _upsert(session: AsyncSession, instances: Sequence[DatabaseModel]) -> None:
+        """將物件依照 Table 分組，每個 Table 以單一 `INSERT ... ON CONFLICT DO UPDATE` 語句寫入，不 commit"""
+        rows_by_table: dict[type[DatabaseModel], list[dict[str, Any]]] = {}
+        for instance in instances:
+            mapper = sqlalchemy.inspect(type(instance))
+            rows_by_table.setdefault(type(instance), []).append(
+                {attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs}
+            )
+        for table, rows in rows_by_table.items():
+            columns = table.__table__.columns
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[c.name for c in columns if c.primary_key],
+                set_={c.name: stmt.excluded[c.name] for c in columns if not c.primary_key},
+            )
+            await session.execute(stmt, rows)
+
+    @classmethod
+    async def select_ids(
+        cls,
+        table: type[T_DatabaseModel],
+        whereclause: ColumnExpressionArgument[bool] | None = None,
+    ) -> Sequence[int]:
+        """指定資料庫 Table 與選擇條件，只選擇符合條件物件的 Primary Key (例如 `discord_id`)，不載入整個物件，
+        Example: `Database.select_ids(User, User.last_used_time.is_(None))`
 
         Parameters
         ------
         table: `type[T_DatabaseModel]`
             要選擇的資料庫 Table (ORM) Class，Ex: `User`
         whereclause: `ColumnExpressionArgument[bool]` | `None`
+            ORM Column 的 Where 選擇條件，若為 `None` 則表示選擇該 Table 內全部資料
+
+        Returns
+        ------
+        `Sequence[int]`:
+            符合條件物件的第一個 Primary Key 欄位的值
+        """
+        async with cls.sessionmaker() as session:
+            stmt = sqlalchemy.select(sqlalchemy.inspect(table).primary_key[0])
+            if whereclause is not None:
+                stmt = stmt.where(whereclause)
+            result = await session.execute(stmt)
+            return result.scalars().all()
+
+    @classmethod
+    async def update_where(
+        cls,
+        table: type[T_DatabaseModel],
+        whereclause: ColumnExpressionArgument[bool],
+        values: Mapping[str, Any],
+    ) -> int:
+        """指定資料庫 Table 與 where 條件，以單一 `UPDATE` 語句更新符合條件的物件，
+        Example: `Database.update_where(User, User.discord_id.in_(ids), {"last_used_time": now})`
+
+        Parameters
+        ------
+        table: `type[T_DatabaseModel]`
+            要更新的資料庫 Table (ORM) Class，Ex: `User`
+        whereclause: `ColumnExpressionArgument[bool]`
             ORM Column 的 Where 選擇條件，Ex: `User.discord_id.is_(123456)`
+        values: `Mapping[str, Any]`
+            要更新的欄位名稱與值
+
+        Returns
+        ------
+        `int`:
+            被更新的物件數量
         """
-        instances = await cls.select_all(table, whereclause)
-        for instance in instances:
-            await cls.delete_instance(instance)
+        async with cls.sessionmaker() as session:
+            stmt = sqlalchemy.update(table).where(whereclause).values(values)
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.rowcount
 
     @classmethod
-    async def delete_all(cls, discord_id: int) -> None:
-        """指定使用者 discord_id，刪除此使用者在資料庫內的所有資料
+    async def delete_where(
+        cls, table: type[T_DatabaseModel], whereclause: ColumnExpressionArgument[bool]
+    ) -> int:
+        """指定資料庫 Table 與 where 條件，以單一 `DELETE` 語句從資料庫刪除符合條件的物件，
+        Example: `Database.delete_where(User, User.discord_id.is_(id))`
+
+        Parameters
+        ------
+        table: `type[T_DatabaseModel]`
+            要選擇的資料庫 Table (ORM) Class，Ex: `User`
+        whereclause: `ColumnExpressionArgument[bool]`
+            ORM Column 的 Where 選擇條件，Ex: `User.discord_id.is_(123456)`
+
+        Returns
+        ------
+        `int`:
+            被刪除的物件數量
+        """
+        async with cls.sessionmaker() as session:
+            result = await session.execute(sqlalchemy.delete(table).where(whereclause))
+            await session.commit()
+            return result.rowcount
+
+    @classmethod
+    async def delete_all(cls, discord_id: int) -> tuple[int | None, int | None]:
+        """指定使用者 discord_id，在同一個交易內刪除此使用者在資料庫內的所有資料
 
         Parameters
         ------
         discord_id: `int`
             使用者 Discord ID
+
+        Returns
+        ------
+        `tuple[int | None, int | None]`
+            被刪除展示櫃資料的 (原神 UID, 星穹鐵道 UID)，讓呼叫端清除記憶體內的展示櫃快取
         """
-        user = await cls.select_one(User, User.discord_id.is_(discord_id))
-        if user is None:
-            return
-        await cls.delete(User, User.discord_id.is_(discord_id))
-        await cls.delete(ScheduleDailyCheckin, ScheduleDailyCheckin.discord_id.is_(discord_id))
-        await cls.delete(GenshinScheduleNotes, GenshinScheduleNotes.discord_id.is_(discord_id))
-        await cls.delete(GenshinSpiralAbyss, GenshinSpiralAbyss.discord_id.is_(discord_id))
-        await cls.delete(GenshinShowcase, GenshinShowcase.uid.is_(user.uid_genshin))
-        await cls.delete(StarrailShowcase, StarrailShowcase.uid.is_(user.uid_starrail))
-        await cls.delete(User, User.discord_id.is_(discord_id))
+        async with cls.sessionmaker() as session:
+            stmt = sqlalchemy.select(User.uid_genshin, User.uid_starrail).where(
+                User.discord_id.is_(discord_id)
+            )
+            uids = (await session.execute(stmt)).first()
+            if uids is None:
+                return None, None
+            uid_genshin, uid_starrail = uids
+            for table, whereclause in [
+                (ScheduleDailyCheckin, ScheduleDailyCheckin.discord_id.is_(discord_id)),
+                (GeetestChallenge, GeetestChallenge.discord_id.is_(discord_id)),
+                (GenshinScheduleNotes, GenshinScheduleNotes.discord_id.is_(discord_id)),
+                (StarrailScheduleNotes, StarrailScheduleNotes.discord_id.is_(discord_id)),
+                (ZZZScheduleNotes, ZZZScheduleNotes.discord_id.is_(discord_id)),
+                (GenshinSpiralAbyss, GenshinSpiralAbyss.discord_id.is_(discord_id)),
+                (StarrailForgottenHall, StarrailForgottenHall.discord_id.is_(discord_id)),
+                (StarrailPureFiction, StarrailPureFiction.discord_id.is_(discord_id)),
+                (GenshinShowcase, GenshinShowcase.uid.is_(uid_genshin)),
+                (StarrailShowcase, StarrailShowcase.uid.is_(uid_starrail)),
+                (User, User.discord_id.is_(discord_id)),
+            ]:
+                await session.execute(sqlalchemy.delete(table).where(whereclause))
+            await session.commit()
+            return uid_genshin, uid_starrail
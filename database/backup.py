@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Final
+
+from utility import LOG, config
+from utility.prometheus import Metrics
+
+
+class Backup:
+    """以 SQLite online backup API 備份資料庫
+
+    備份在 worker thread 中以每次固定頁數的方式複製，複製過程中其他連線仍可讀寫資料庫，
+    且得到的是一致的資料庫快照；複製完成後以 gzip 壓縮，並依照保留設定刪除舊的備份。
+    """
+
+    DB_PATH: Final[Path] = Path("data/bot/bot.db")
+    """要備份的資料庫檔案"""
+    BACKUP_DIR: Final[Path] = Path("data/bot/backup")
+    """備份檔案的資料夾"""
+    PAGES_PER_STEP: Final[int] = 256
+    """每次複製的頁數，每次複製之間會釋放資料庫鎖，讓其他連線寫入"""
+
+    @classmethod
+    async def run(cls) -> Path:
+        """備份資料庫並刪除超過保留數量的舊備份
+
+        Returns
+        ------
+        `Path`
+            壓縮後的備份檔案路徑
+        """
+        start_time = time.perf_counter()
+        path = await asyncio.to_thread(cls._backup, date.today())
+        duration = time.perf_counter() - start_time
+        size = path.stat().st_size
+
+        Metrics.DATABASE_BACKUP_DURATION.set(duration)
+        Metrics.DATABASE_BACKUP_SIZE.set(size)
+        Metrics.DATABASE_BACKUP_LAST_SUCCESS.set(time.time())
+        LOG.System(f"database backup: {path} ({size / 1024 / 1024:.1f} MB, {duration:.1f}s)")
+
+        removed = await asyncio.to_thread(
+            cls._apply_retention, config.backup_keep_daily, config.backup_keep_weekly
+        )
+        if len(removed) > 0:
+            LOG.System(f"database backup: 刪除 {len(removed)} 個舊備份")
+        return path
+
+    @classmethod
+    def _backup(cls, day: date) -> Path:
+        cls.BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+        path = cls.BACKUP_DIR / f"bot_{day.isoformat()}.db.gz"
+        temp_db = path.with_suffix(".tmp")
+        temp_gz = path.with_suffix(".gz.tmp")
+        try:
+            source = sqlite3.connect(cls.DB_PATH)
+            target = sqlite3.connect(temp_db)
+            try:
+                source.backup(target, pages=cls.PAGES_PER_STEP, sleep=0.005)
+            finally:
+                target.close()
+                source.close()
+
+            with open(temp_db, "rb") as f_in, gzip.open(temp_gz, "wb", compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+            os.replace(temp_gz, path)
+        finally:
+            temp_db.unlink(missing_ok=True)
+            temp_gz.unlink(missing_ok=True)
+        return path
+
+    @classmethod
+    def _apply_retention(cls, keep_daily: int, keep_weekly: int) -> list[Path]:
+        """保留最近 `keep_daily` 天的備份，以及再往前 `keep_weekly` 週每週最新的一個備份，刪除其餘的備份
+
+        Returns
+        ------
+        `list[Path]`
+            被刪除的備份檔案
+        """
+        backups: list[tuple[date, Path]] = []
+        for path in cls.BACKUP_DIR.glob("bot_*.db.gz"):
+            try:
+                day = datetime.strptime(path.name, "bot_%Y-%m-%d.db.gz").date()
+            except ValueError:
+                continue
+            backups.append((day, path))
+        backups.sort(reverse=True)
+
+        keep: set[Path] = {path for _, path in backups[:keep_daily]}
+        weeks: set[tuple[int, int]] = set()
+        for day, path in backups[keep_daily:]:
+            week = day.isocalendar()[:2]
+            if week not in weeks and len(weeks) < keep_weekly:
+                weeks.add(week)
+                keep.add(path)
+
+        removed = [path for _, path in backups if path not in keep]
+        for path in removed:
+            path.unlink(missing_ok=True)
+        return removed
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime
+from typing import ClassVar, Final
+
+import sentry_sdk
+
+from utility.custom_log import LOG
+
+from .app import Database
+from .models import User
+
+
+class LastUsedTimeBuffer:
+    """使用者最後使用時間的寫入緩衝區 (write-behind)
+
+    使用指令時只在記憶體內記錄使用者 ID，每隔 `FLUSH_INTERVAL` 秒以單一
+    `UPDATE users SET last_used_time = ... WHERE discord_id IN (...)` 語句寫入資料庫，
+    同一段時間內重複使用指令的使用者只會被更新一次
+    """
+
+    FLUSH_INTERVAL: Final[float] = 5.0
+    """寫入資料庫的間隔 (單位：秒)"""
+    CHUNK_SIZE: Final[int] = 500
+    """每個 UPDATE 語句最多包含的使用者數量，避免超過 SQLite 參數數量上限"""
+
+    _touched: ClassVar[set[int]] = set()
+    _task: ClassVar[asyncio.Task | None] = None
+
+    @classmethod
+    def touch(cls, discord_id: int) -> None:
+        """記錄使用者剛使用過指令，在下次寫入時更新此使用者的最後使用時間
+
+        Parameters
+        ------
+        discord_id: `int`
+            使用者 Discord ID
+        """
+        cls._touched.add(discord_id)
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._flush_loop())
+
+    @classmethod
+    async def flush(cls) -> None:
+        """將緩衝區內的使用者最後使用時間寫入資料庫"""
+        if len(cls._touched) == 0:
+            return
+        user_ids = list(cls._touched)
+        cls._touched = set()
+        now = datetime.now()
+        try:
+            for i in range(0, len(user_ids), cls.CHUNK_SIZE):
+                chunk = user_ids[i : i + cls.CHUNK_SIZE]
+                await Database.update_where(
+                    User, User.discord_id.in_(chunk), {"last_used_time": now}
+                )
+        except BaseException:
+            # 寫入失敗或被取消 (例：關閉時取消定期寫入) 時將使用者放回緩衝區，等待下次寫入
+            cls._touched.update(user_ids)
+            raise
+
+    @classmethod
+    async def close(cls) -> None:
+        """停止定期寫入並將剩餘的資料寫入資料庫，在關閉資料庫之前呼叫"""
+        if cls._task is not None:
+            task, cls._task = cls._task, None
+            task.cancel()
+            # 等待定期寫入確實結束，寫入到一半被取消的使用者會放回緩衝區，由下面的 flush 寫入
+            await asyncio.gather(task, return_exceptions=True)
+        await cls.flush()
+
+    @classmethod
+    async def _flush_loop(cls) -> None:
+        while True:
+            await asyncio.sleep(cls.FLUSH_INTERVAL)
+            try:
+                await cls.flush()
+            except Exception as e:
+                LOG.Error(f"寫入使用者最後使用時間時發生錯誤：{e}")
+                sentry_sdk.capture_exception(e)
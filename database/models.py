@@ -24,7 +24,7 @@ class User(Base):
 
     discord_id: Mapped[int] = mapped_column(primary_key=True)
     """使用者 Discord ID"""
-    last_used_time: Mapped[datetime.datetime | None] = mapped_column(default=None)
+    last_used_time: Mapped[datetime.datetime | None] = mapped_column(default=None, index=True)
     """使用者最後一次成功使用機器人指令的時間"""
 
     cookie_default: Mapped[str | None] = mapped_column(default=None)
@@ -57,11 +57,11 @@ class ScheduleDailyCheckin(Base):
 
     discord_id: Mapped[int] = mapped_column(primary_key=True)
     """使用者 Discord ID"""
-    discord_channel_id: Mapped[int]
+    discord_channel_id: Mapped[int] = mapped_column(index=True)
     """發送通知訊息的 Discord 頻道的 ID"""
     is_mention: Mapped[bool]
     """發送訊息時是否要 tag 使用者"""
-    next_checkin_time: Mapped[datetime.datetime]
+    next_checkin_time: Mapped[datetime.datetime] = mapped_column(index=True)
     """下次簽到的時間 (使用者設定每日要簽到的時間)"""
 
     has_genshin: Mapped[bool] = mapped_column(default=False)
@@ -108,10 +108,10 @@ class GenshinScheduleNotes(Base):
 
     discord_id: Mapped[int] = mapped_column(primary_key=True)
     """使用者 Discord ID"""
-    discord_channel_id: Mapped[int]
+    discord_channel_id: Mapped[int] = mapped_column(index=True)
     """發送通知訊息的 Discord 頻道的 ID"""
     next_check_time: Mapped[datetime.datetime | None] = mapped_column(
-        insert_default=sqlalchemy.func.now(), default=None
+        insert_default=sqlalchemy.func.now(), default=None, index=True
     )
     """下次檢查的時間，當檢查時超過此時間才會對 Hoyolab 請求資料"""
 
@@ -192,8 +192,17 @@ class GenshinSpiralAbyss(Base):
         return [spiral_abyss.CharacterData.parse_obj(c) for c in listobj]
 
 
+_SHOWCASE_BLOB_MAGIC: typing.Final = b"GSC2"
+"""展示櫃資料分段格式的開頭標記，沒有此標記的資料為整份 JSON 壓縮的舊格式"""
+
+
 class GenshinShowcase(Base):
-    """原神角色展示櫃資料庫 Table"""
+    """原神角色展示櫃資料庫 Table
+
+    資料格式：`標記` + `標頭長度 (4 bytes)` + `標頭 JSON` + 各段壓縮資料，
+    第一段為角色列表 (avatarInfoList) 以外的玩家資料，之後每段為一名角色，
+    讓更新資料時只需重新壓縮有變動的角色，沒有變動的角色直接沿用舊資料的壓縮結果
+    """
 
     __tablename__ = "genshin_showcases"
 
@@ -202,7 +211,12 @@ class GenshinShowcase(Base):
     _raw_data: Mapped[bytes]
     """展示櫃 bytes 資料"""
 
-    def __init__(self, uid: int, data: dict[str, typing.Any]):
+    def __init__(
+        self,
+        uid: int,
+        data: dict[str, typing.Any],
+        previous: "GenshinShowcase | None" = None,
+    ):
         """初始化原神角色展示櫃資料表的物件
 
         Parameters
@@ -211,17 +225,71 @@ class GenshinShowcase(Base):
             原神 UID
         data: `dict[str, Any]`
             Enka network API 的 JSON 格式資料
+        previous: `GenshinShowcase | None` = None
+            資料庫內同一個 UID 的舊資料，內容沒有變動的角色直接沿用舊資料的壓縮結果
         """
-        # 將 dict 物件轉成 json -> byte -> 壓縮 -> 保存
-        json_str = json.dumps(data)
+        previous_segments = previous._get_character_segments() if previous is not None else {}
+        characters: list[dict[str, typing.Any]] = data.get("avatarInfoList", [])
+        player_data = {k: v for k, v in data.items() if k != "avatarInfoList"}
+
+        segments = [self._compress(player_data)]
+        for character in characters:
+            segment = previous_segments.get(character.get("avatarId"))
+            if segment is None or self._decompress(segment) != character:
+                segment = self._compress(character)
+            segments.append(segment)
+
+        header = json.dumps(
+            {
+                "has_characters": "avatarInfoList" in data,
+                "ids": [c.get("avatarId") for c in characters],
+                "sizes": [len(s) for s in segments],
+            }
+        ).encode("utf-8")
         self.uid = uid
-        self._raw_data = zlib.compress(json_str.encode("utf-8"), level=5)
+        self._raw_data = b"".join(
+            [_SHOWCASE_BLOB_MAGIC, len(header).to_bytes(4, "big"), header, *segments]
+        )
 
     @property
     def data(self) -> dict[str, typing.Any]:
         """Enka network API 的 JSON 格式資料"""
-        data = zlib.decompress(self._raw_data).decode("utf-8")
-        return json.loads(data)
+        if not self._raw_data.startswith(_SHOWCASE_BLOB_MAGIC):  # 舊格式
+            return self._decompress(self._raw_data)
+        header, segments = self._split()
+        data = self._decompress(segments[0])
+        if header["has_characters"]:
+            data["avatarInfoList"] = [self._decompress(s) for s in segments[1:]]
+        return data
+
+    def _get_character_segments(self) -> dict[typing.Any, bytes]:
+        """dict[avatarId, 該角色的壓縮資料]，舊格式回傳空 dict"""
+        if not self._raw_data.startswith(_SHOWCASE_BLOB_MAGIC):
+            return {}
+        header, segments = self._split()
+        return dict(zip(header["ids"], segments[1:]))
+
+    def _split(self) -> tuple[dict[str, typing.Any], list[bytes]]:
+        """將資料拆成 (標頭, 各段壓縮資料)"""
+        view = memoryview(self._raw_data)
+        offset = len(_SHOWCASE_BLOB_MAGIC)
+        header_size = int.from_bytes(view[offset : offset + 4], "big")
+        offset += 4
+        header: dict[str, typing.Any] = json.loads(bytes(view[offset : offset + header_size]))
+        offset += header_size
+        segments: list[bytes] = []
+        for size in header["sizes"]:
+            segments.append(bytes(view[offset : offset + size]))
+            offset += size
+        return header, segments
+
+    @staticmethod
+    def _compress(obj: typing.Any) -> bytes:
+        return zlib.compress(json.dumps(obj).encode("utf-8"), level=5)
+
+    @staticmethod
+    def _decompress(segment: bytes) -> typing.Any:
+        return json.loads(zlib.decompress(segment).decode("utf-8"))
 
 
 class StarrailScheduleNotes(Base):
@@ -231,10 +299,10 @@ class StarrailScheduleNotes(Base):
 
     discord_id: Mapped[int] = mapped_column(primary_key=True)
     """使用者 Discord ID"""
-    discord_channel_id: Mapped[int]
+    discord_channel_id: Mapped[int] = mapped_column(index=True)
     """發送通知訊息的 Discord 頻道的 ID"""
     next_check_time: Mapped[datetime.datetime | None] = mapped_column(
-        insert_default=sqlalchemy.func.now(), default=None
+        insert_default=sqlalchemy.func.now(), default=None, index=True
     )
     """下次檢查的時間，當檢查時超過此時間才會對 Hoyolab 請求資料"""
 
@@ -360,10 +428,10 @@ class ZZZScheduleNotes(Base):
 
     discord_id: Mapped[int] = mapped_column(primary_key=True)
     """使用者 Discord ID"""
-    discord_channel_id: Mapped[int]
+    discord_channel_id: Mapped[int] = mapped_column(index=True)
     """發送通知訊息的 Discord 頻道的 ID"""
     next_check_time: Mapped[datetime.datetime | None] = mapped_column(
-        insert_default=sqlalchemy.func.now(), default=None
+        insert_default=sqlalchemy.func.now(), default=None, index=True
     )
     """下次檢查的時間，當檢查時超過此時間才會對 Hoyolab 請求資料"""
 
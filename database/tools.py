@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import genshin
 
@@ -64,14 +64,7 @@ class Tool:
         diff_days: `int`
             刪除超過此天數未使用的使用者
         """
-        now = datetime.now()
-        count = 0
-        users = await Database.select_all(User)
-        for user in users:
-            if user.last_used_time is None:
-                continue
-            interval = now - user.last_used_time
-            if interval.days > diff_days:
-                await Database.delete_instance(user)
-                count += 1
-        LOG.System(f"檢查過期使用者：{len(users)} 位使用者已檢查，已刪除 {count} 位過期使用者")
+        # 超過 diff_days 整天未使用，即最後使用時間早於 (diff_days + 1) 天前
+        expired_time = datetime.now() - timedelta(days=diff_days + 1)
+        count = await Database.delete_where(User, User.last_used_time <= expired_time)
+        LOG.System(f"檢查過期使用者：已刪除 {count} 位超過 {diff_days} 天未使用的使用者")
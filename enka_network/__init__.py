@@ -1,3 +1,4 @@
 from .api import EnkaAPI, EnkaError
+from .assets import update_enka_assets
 from .enka_card import generate_image
 from .showcase import Showcase, enka_assets
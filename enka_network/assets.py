@@ -0,0 +1,35 @@
+import asyncio
+
+import enkanetwork
+import sentry_sdk
+
+from utility import LOG
+from utility.prometheus import upstream_trace_config
+
+from .enka_card import http_trace_configs, prefetch_all_assets
+
+_prefetch_task: asyncio.Task | None = None
+http_trace_configs.append(upstream_trace_config("assets"))
+
+
+async def update_enka_assets() -> None:
+    """更新 Enka 素材資料，並在背景下載角色卡片需要的圖片素材，讓產生卡片時不需要等待下載"""
+    global _prefetch_task
+    client = enkanetwork.EnkaNetworkAPI()
+    async with client:
+        await client.update_assets()
+    enkanetwork.Assets(lang=enkanetwork.Language.EN)
+
+    if _prefetch_task is None or _prefetch_task.done():
+        _prefetch_task = asyncio.create_task(_prefetch_card_assets())
+
+
+async def _prefetch_card_assets() -> None:
+    """下載所有角色的立繪、命之座與天賦圖示中本地尚未存在的圖片"""
+    try:
+        count = await prefetch_all_assets()
+    except Exception as e:
+        LOG.Error(f"預先下載角色卡片素材時發生錯誤：{e}")
+        sentry_sdk.capture_exception(e)
+    else:
+        LOG.System(f"prefetch enka card assets: {count} files downloaded")
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import ClassVar, Final
+
+import enkanetwork
+from enkanetwork.model.character import CharacterInfo
+
+from utility import config
+from utility.prometheus import Metrics
+
+
+class CardCache:
+    """已繪製的角色展示卡片圖片快取
+
+    以角色卡片用到的所有資料 (角色的裝備、數值、命之座、玩家名稱與等級、語言、卡片模板版本) 的雜湊值作為檔名，
+    將圖片保存在硬碟，相同的角色只需繪製一次，不同使用者、重新啟動機器人之後都能直接使用。
+    所有圖片的總大小超過 `config.showcase_card_cache_mb` 時，刪除最久未被使用的圖片 (LRU)。
+    """
+
+    DIRECTORY: Final[Path] = Path("data/cache/showcase_card")
+    """保存圖片的資料夾"""
+    TEMPLATE_VERSION: Final[int] = 1
+    """卡片模板的版本，修改卡片的繪製方式後需要增加此數字，讓舊的圖片失效"""
+
+    _index: ClassVar[OrderedDict[str, int] | None] = None
+    """所有已保存圖片的 dict[key, 檔案大小]，依照最後使用時間由舊到新排序"""
+    _total_size: ClassVar[int] = 0
+    _lock: ClassVar[asyncio.Lock | None] = None
+
+    @classmethod
+    def key(
+        cls,
+        data: enkanetwork.EnkaNetworkResponse,
+        character: CharacterInfo,
+        locale: enkanetwork.Language,
+    ) -> str:
+        """計算角色卡片的快取 key
+
+        Parameters
+        ------
+        data: `EnkaNetworkResponse`
+            玩家的角色展示櫃資料
+        character: `CharacterInfo`
+            要繪製的角色
+        locale: `Language`
+            卡片的語言
+
+        Returns
+        ------
+        `str`
+            卡片內容的 sha256 雜湊值
+        """
+        player = data.player
+        content = json.dumps(
+            {
+                "template": cls.TEMPLATE_VERSION,
+                "locale": str(locale.value),
+                "uid": data.uid,
+                "player": [player.nickname, player.world_level, player.level] if player else None,
+                "character": json.loads(character.json()),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @classmethod
+    async def get(cls, key: str) -> bytes | None:
+        """取得快取的卡片圖片，不存在時回傳 `None`"""
+        index = await cls._get_index()
+        if key not in index:
+            Metrics.RENDER_CACHE_EVENTS.labels("showcase_card", "miss").inc()
+            return None
+        try:
+            content = await asyncio.to_thread(cls._read, cls.DIRECTORY / f"{key}.jpeg")
+        except OSError:
+            cls._total_size -= index.pop(key)
+            Metrics.RENDER_CACHE_EVENTS.labels("showcase_card", "miss").inc()
+            return None
+        index.move_to_end(key)
+        Metrics.RENDER_CACHE_EVENTS.labels("showcase_card", "hit").inc()
+        return content
+
+    @classmethod
+    async def put(cls, key: str, content: bytes) -> None:
+        """保存卡片圖片，並刪除超過容量上限的最久未使用圖片"""
+        index = await cls._get_index()
+        await asyncio.to_thread(cls._write, cls.DIRECTORY / f"{key}.jpeg", content)
+        cls._total_size += len(content) - index.pop(key, 0)
+        index[key] = len(content)
+
+        max_size = config.showcase_card_cache_mb * 1024 * 1024
+        evicted: list[str] = []
+        while cls._total_size > max_size and len(index) > 1:
+            evicted_key, size = index.popitem(last=False)
+            cls._total_size -= size
+            evicted.append(evicted_key)
+        if len(evicted) > 0:
+            await asyncio.to_thread(
+                lambda: [(cls.DIRECTORY / f"{k}.jpeg").unlink(missing_ok=True) for k in evicted]
+            )
+
+    @classmethod
+    async def _get_index(cls) -> OrderedDict[str, int]:
+        """第一次使用時掃描資料夾，依照檔案的最後修改時間建立索引"""
+        if cls._index is not None:
+            return cls._index
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            if cls._index is None:
+                files = await asyncio.to_thread(cls._scan)
+                cls._index = OrderedDict((path.stem, size) for path, size, _ in files)
+                cls._total_size = sum(size for _, size, _ in files)
+        return cls._index
+
+    @classmethod
+    def _scan(cls) -> list[tuple[Path, int, float]]:
+        cls.DIRECTORY.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in cls.DIRECTORY.glob("*.jpeg"):
+            stat = path.stat()
+            files.append((path, stat.st_size, stat.st_mtime))
+        return sorted(files, key=lambda f: f[2])
+
+    @staticmethod
+    def _read(path: Path) -> bytes:
+        content = path.read_bytes()
+        # 更新修改時間，讓重新啟動後掃描資料夾時仍能依照最後使用時間排序
+        os.utime(path)
+        return content
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        # 同一張卡片可能同時被寫入，每次寫入使用不同的暫存檔，避免互相覆蓋
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+            f.write(content)
+        try:
+            os.replace(f.name, path)
+        except OSError:
+            Path(f.name).unlink(missing_ok=True)
+            raise
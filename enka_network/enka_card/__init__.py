@@ -1 +1,8 @@
-from .enka_card.generator import generate_image
\ No newline at end of file
+from .enka_card.generator import generate_image, render_image
+from .enka_card.utils import (
+    http_trace_configs,
+    image_cache,
+    prefetch_all_assets,
+    prefetch_assets,
+    preload_fonts,
+)
@@ -13,7 +13,7 @@ from PIL import Image, ImageChops, ImageDraw, ImageEnhance
 from .prop_reference import RARITY_REFERENCE, SUBST_ORDER
 from .utils import (fade_asset_icon, fade_character_art, format_statistics,
                    get_active_artifact_sets, get_font, get_stat_filename,
-                   open_image, scale_image, current_path)
+                   load_image, prefetch_assets, scale_image, current_path)
 
 
 async def generate_image(
@@ -23,6 +23,23 @@ async def generate_image(
     *,
     save_locally: bool = True,
 ) -> BytesIO:
+    """Download the assets of the character, then render its card.
+    Use `prefetch_assets` and `render_image` separately to render
+    the card in another thread or process."""
+    await prefetch_assets(character)
+    return render_image(data, character, locale, save_locally=save_locally)
+
+
+def render_image(
+    data: EnkaNetworkResponse,
+    character: CharacterInfo,
+    locale: Language = Language.EN,
+    *,
+    save_locally: bool = True,
+) -> BytesIO:
+    """Render the card of the character, every remote asset
+    must already be downloaded by `prefetch_assets`."""
+
     """Create language-specific asset-getter"""
     asset_reference = Assets(lang=locale)
 
@@ -33,7 +50,7 @@ async def generate_image(
     BEIGE = (245, 222, 179)
 
     """ BACKGROUND SETUP """
-    background = await open_image("attributes/Assets/default_enka_card.png")
+    background = load_image("attributes/Assets/default_enka_card.png")
 
     background_rgb = {
         "Pyro": (186, 140, 131),
@@ -51,12 +68,12 @@ async def generate_image(
     foreground = Image.new("RGBA", background.size, (0, 0, 0, 0))
     textground = Image.new("RGBA", background.size, (0, 0, 0, 0))
     draw = ImageDraw.Draw(textground)
+    foreground_draw = ImageDraw.Draw(foreground, "RGBA")
 
     """ FIRST TRIMESTER """
     character_bg = Image.new('RGBA', (2048, 1024), (255, 255, 255, 0))
-    character_art = await open_image(
+    character_art = load_image(
         path=f"attributes/Genshin/Gacha/{character.image.banner.filename}.png",
-        asset_url=character.image.banner.url,
     )
     # Center the character art
     bg_width, bg_height = character_bg.size
@@ -75,7 +92,7 @@ async def generate_image(
 
     foreground.paste(character_art, (0, 0), character_art)
 
-    character_shade = await open_image("attributes/Assets/enka_character_shade.png")
+    character_shade = load_image("attributes/Assets/enka_character_shade.png")
     foreground.paste(character_shade, (0, 0), character_shade)
 
     w = int(draw.textlength(f"{character.name}", font=get_font("normal", 30)))
@@ -143,7 +160,7 @@ async def generate_image(
         font=get_font("normal", 23),
     )
 
-    friendship_icon = await open_image("attributes/UI/COMPANIONSHIP.png")
+    friendship_icon = load_image("attributes/UI/COMPANIONSHIP.png")
     friendship_icon = scale_image(friendship_icon, fixed_height=45)
     foreground.paste(friendship_icon, (34, 108), friendship_icon)
     draw.text(
@@ -154,21 +171,20 @@ async def generate_image(
     )
 
     """ Constellations Section """
-    c_overlay = await open_image("attributes/Assets/enka_constellation_overlay.png")
+    c_overlay = load_image("attributes/Assets/enka_constellation_overlay.png")
     c_overlay = scale_image(c_overlay, fixed_height=75)
     ImageDraw.Draw(c_overlay).ellipse(
         (15, 15, 59, 59), fill=(50, 50, 50, 150), outline=background_rgb, width=2
     )
-    lock = await open_image("attributes/UI/LOCKED.png", resize=(20, 25))
+    lock = load_image("attributes/UI/LOCKED.png", resize=(20, 25))
 
     constellation_starting_index = 160
     for index, constellation in enumerate(character.constellations):
         foreground.paste(
             c_overlay, (25, constellation_starting_index + 60 * index), c_overlay
         )
-        constellation_icon = await open_image(
+        constellation_icon = load_image(
             path=f"attributes/Genshin/UI/{constellation.icon.filename}.png",
-            asset_url=constellation.icon.url,
         )
         constellation_icon = scale_image(constellation_icon, fixed_height=45)
 
@@ -197,16 +213,15 @@ async def generate_image(
         )
 
     """ Talents Section """
-    talent_overlay = await open_image(f"attributes/Assets/enka_talent_overlay.png")
+    talent_overlay = load_image(f"attributes/Assets/enka_talent_overlay.png")
     talent_overlay = scale_image(talent_overlay, fixed_height=80)
 
     for index, skill in enumerate(character.skills):
         for _ in range(4):
             foreground.paste(talent_overlay, (430, 305 + 90 * index), talent_overlay)
 
-        sk = await open_image(
+        sk = load_image(
             path=f"attributes/Genshin/UI/{skill.icon.filename}.png",
-            asset_url=skill.icon.url,
             resize=(50, 50),
         )
 
@@ -214,7 +229,7 @@ async def generate_image(
             foreground.paste(sk, (int(471 - (sk.size[0] / 2)), 320 + 90 * index), sk)
 
         w = int(draw.textlength(str(skill.level), font=get_font("normal", 20)))
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (
                 471 - w / 2 - 6,
                 382 + 90 * index - 15,
@@ -225,7 +240,7 @@ async def generate_image(
             fill=(50, 50, 50, 178) if not skill.is_boosted else (79, 188, 212),
         )
 
-        ImageDraw.Draw(foreground, "RGBA").text(
+        foreground_draw.text(
             (472, 383 + 90 * index),
             f"{skill.level}",
             font=get_font("normal", 20),
@@ -233,16 +248,15 @@ async def generate_image(
         )
 
     weapon = character.equipments[-1]
-    weapon_image = await open_image(
+    weapon_image = load_image(
         path=f"attributes/Genshin/Weapon/{weapon.detail.icon.filename}.png",
-        asset_url=weapon.detail.icon.url,
     )
     weapon_image = scale_image(weapon_image, fixed_height=125)
 
     foreground.paste(weapon_image, (555, 25), weapon_image)
 
     rarity_light = scale_image(
-        await open_image(
+        load_image(
             f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}_WEAPON_LIGHT.png"
         ),
         fixed_height=40,
@@ -252,7 +266,7 @@ async def generate_image(
     )
 
     rarity = scale_image(
-        await open_image(f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}.png"),
+        load_image(f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}.png"),
         fixed_height=25,
     )
 
@@ -266,7 +280,7 @@ async def generate_image(
         draw.textlength(f"{weapon.detail.name}", font=get_font("normal", 22))
     )
 
-    async def draw_weapon_information(line_buffer: int = 0):
+    def draw_weapon_information(line_buffer: int = 0):
         # Weapon Main Stat
         mainstat = weapon.detail.mainstats
         w = int(
@@ -278,13 +292,13 @@ async def generate_image(
 
         endpoint = 690 + 20 + 35 + w
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (690, 60 + line_buffer, endpoint, 95 + line_buffer),
             fill=(235, 235, 235, 40),
             radius=4,
         )
 
-        image = await open_image(f"attributes/UI/{get_stat_filename(mainstat.prop_id)}.png")
+        image = load_image(f"attributes/UI/{get_stat_filename(mainstat.prop_id)}.png")
         icon_file = scale_image(image, fixed_height=30)
         icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
@@ -310,7 +324,7 @@ async def generate_image(
                 )
             )
 
-            ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+            foreground_draw.rounded_rectangle(
                 (
                     endpoint + 10,
                     60 + line_buffer,
@@ -321,7 +335,7 @@ async def generate_image(
                 radius=4,
             )
 
-            image = await open_image(
+            image = load_image(
                 f"attributes/UI/{get_stat_filename(substat.prop_id)}.png"
             )
             icon_file = scale_image(image, fixed_height=30)
@@ -348,7 +362,7 @@ async def generate_image(
 
         endpoint = 690 + 20 + w
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (690, 60 + 45 + line_buffer, endpoint, 95 + 40 + line_buffer),
             fill=(0, 0, 0, 100),
             radius=4,
@@ -368,7 +382,7 @@ async def generate_image(
             )
         )
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (
                 endpoint + 10,
                 60 + 45 + line_buffer,
@@ -406,7 +420,7 @@ async def generate_image(
             (690, 32), f"{weapon.detail.name}", font=get_font("normal", 22), anchor="lt"
         )
 
-        await draw_weapon_information(line_buffer=5)
+        draw_weapon_information(line_buffer=5)
     else:
         weapon_name = textwrap.wrap(f"{weapon.detail.name}", width=20)
 
@@ -415,13 +429,13 @@ async def generate_image(
                 (690, 32 + (index * 25)), line, font=get_font("normal", 22), anchor="lt"
             )
 
-        await draw_weapon_information(line_buffer=28 * index)
+        draw_weapon_information(line_buffer=28 * index)
 
     all_stats = format_statistics(character)
     statistic_buffer = 365 // len(all_stats)
     for index, item in enumerate(all_stats):
         """Draw Icon for Stat"""
-        image = await open_image(f"attributes/UI/{get_stat_filename(item)}.png")
+        image = load_image(f"attributes/UI/{get_stat_filename(item)}.png")
         icon_file = scale_image(image, fixed_height=30)
         icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
@@ -492,7 +506,7 @@ async def generate_image(
             character.equipments
         ), None)
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (
                 1009,
                 14 + artifact_spacer * artif_index,
@@ -507,9 +521,8 @@ async def generate_image(
             continue
 
         artif_icon = fade_asset_icon(
-            await open_image(
+            load_image(
                 path=f"attributes/Genshin/Artifact/{artifact.detail.icon.filename}.png",
-                asset_url=artifact.detail.icon.url,
                 resize=(190, 190),
             ),
             "artifact",
@@ -530,7 +543,7 @@ async def generate_image(
             width=2,
         )
 
-        image = await open_image(
+        image = load_image(
             f"attributes/UI/{get_stat_filename(artifact.detail.mainstats.prop_id)}.png"
         )
         icon_file = scale_image(image, fixed_height=30)
@@ -552,7 +565,7 @@ async def generate_image(
 
         w = draw.textlength(f"+{artifact.level}", font=get_font("normal", 12))
 
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (
                 1150 - w - 8,
                 60 + 30 + artifact_spacer * artif_index,
@@ -572,7 +585,7 @@ async def generate_image(
         )
 
         rarity = scale_image(
-            await open_image(
+            load_image(
                 f"attributes/UI/{RARITY_REFERENCE[str(artifact.detail.rarity)]}.png"
             ),
             fixed_height=18,
@@ -592,7 +605,7 @@ async def generate_image(
 
             position = {0: [0, 0], 1: [1, 0], 2: [0, 1], 3: [1, 1]}.get(index)
 
-            image = await open_image(f"attributes/UI/{get_stat_filename(subst.prop_id)}.png")
+            image = load_image(f"attributes/UI/{get_stat_filename(subst.prop_id)}.png")
             icon_file = scale_image(image, fixed_height=30)
             icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
@@ -616,11 +629,11 @@ async def generate_image(
                 font=get_font("normal", 20),
             )
 
-    ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+    foreground_draw.rounded_rectangle(
         (555, 547, 555 + 48, 547 + 48), fill=(0, 0, 0, 50), radius=5
     )
 
-    flower_of_life = await open_image(
+    flower_of_life = load_image(
         "attributes/Assets/flower_of_life_icon.png", resize=(35, 35)
     )
     foreground.paste(flower_of_life, (562, 555), flower_of_life)
@@ -638,7 +651,7 @@ async def generate_image(
                 font=get_font("normal", 17),
             )
 
-            ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+            foreground_draw.rounded_rectangle(
                 (935, 548 + 25 * set_index, 935 + 30, 548 + 21 + 25 * set_index),
                 fill=(0, 0, 0, 50),
                 radius=3,
@@ -655,7 +668,7 @@ async def generate_image(
             set_index += 1
     elif len(active_sets) == 1:
         """Single Activated Set"""
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (935, 548 + 12, 935 + 30, 548 + 21 + 12),
             fill=(0, 0, 0, 50),
             radius=3,
@@ -678,7 +691,7 @@ async def generate_image(
         )
     else:
         """No Activated Sets"""
-        ImageDraw.Draw(foreground, "RGBA").rounded_rectangle(
+        foreground_draw.rounded_rectangle(
             (935, 548 + 12, 935 + 30, 548 + 21 + 12),
             fill=(0, 0, 0, 50),
             radius=3,
@@ -1,8 +1,16 @@
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from collections import Counter
-from typing import List, Literal
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Literal, Optional
 
 import aiohttp
+from enkanetwork import Assets
 from enkanetwork.enum import EquipmentsType
 from enkanetwork.model import Stats
 from enkanetwork.model.character import CharacterInfo
@@ -13,32 +21,169 @@ from pydantic import BaseModel
 from .prop_reference import ELEMENT_REFERENCE, RELIQUARY_STATS
 
 current_path = os.path.dirname(os.path.abspath(__file__))
+logger = logging.getLogger(__name__)
 
 class ActiveSet(BaseModel):
     name: str
     count: int
 
 
-async def check_asset(path: str, asset_url: str) -> None:
+MANIFEST_PATH = os.path.join(current_path, "attributes", "manifest.json")
+"""Records the size and sha256 of every downloaded asset, keyed by its relative path."""
+
+http_trace_configs: List[aiohttp.TraceConfig] = []
+"""`aiohttp.TraceConfig`s attached to every session used to download assets,
+e.g. to record request metrics."""
+
+
+async def check_asset(
+    path: str, asset_url: str, session: Optional[aiohttp.ClientSession] = None
+) -> Optional[dict]:
     """Helper function to check if an asset
     exists given a path and reference to the
     asset's source. If the asset does not exist,
     the asset will be downloaded from the source.
+
+    The file is written to a temporary file first and then renamed,
+    so a partially downloaded asset is never visible to the renderer.
+    Returns the manifest entry of the asset if it was downloaded.
     """
 
     if os.path.exists(path):
-        return
-    
+        return None
+
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(asset_url) as response:
-            if response.status != 200:
-                raise Exception("There was an error downloading the asset.")
-            content = await response.read()
-    
-    with open(path, "wb") as f:
+
+    if session is None:
+        async with aiohttp.ClientSession(trace_configs=http_trace_configs) as session:
+            return await check_asset(path, asset_url, session)
+
+    async with session.get(asset_url) as response:
+        if response.status != 200:
+            raise Exception("There was an error downloading the asset.")
+        content = await response.read()
+
+    return await asyncio.to_thread(_write_asset, path, asset_url, content)
+
+
+def _write_asset(path: str, asset_url: str, content: bytes) -> dict:
+    """Write a downloaded asset atomically and return its manifest entry,
+    run in a worker thread so file I/O and hashing stay off the event loop."""
+    _atomic_write(path, content)
+
+    return {
+        "url": asset_url,
+        "size": len(content),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+async def download_assets(assets: Dict[str, str], concurrency: int = 8) -> int:
+    """Download the missing assets of `{relative path: url}` concurrently,
+    at most `concurrency` at a time over a single HTTP session, and record
+    them in the manifest. Failed downloads are skipped and logged.
+    Returns the number of downloaded assets."""
+    semaphore = asyncio.Semaphore(concurrency)
+    downloaded: Dict[str, dict] = {}
+    failed: Dict[str, Exception] = {}
+
+    async def download(session: aiohttp.ClientSession, path: str, url: str) -> None:
+        async with semaphore:
+            try:
+                entry = await check_asset(os.path.join(current_path, path), url, session)
+            except Exception as e:
+                failed[path] = e
+                logger.debug("Failed to download asset %s from %s: %s", path, url, e)
+                return
+            if entry is not None:
+                downloaded[path] = entry
+
+    missing = {
+        path: url
+        for path, url in assets.items()
+        if url and not os.path.exists(os.path.join(current_path, path))
+    }
+    if len(missing) > 0:
+        async with aiohttp.ClientSession(trace_configs=http_trace_configs) as session:
+            await asyncio.gather(*[download(session, path, url) for path, url in missing.items()])
+        try:
+            await asyncio.to_thread(update_manifest, downloaded)
+        except Exception as e:
+            # The assets themselves are already on disk, a missing
+            # manifest entry must not fail the card being rendered.
+            logger.warning("Failed to update the asset manifest: %s", e)
+    if len(failed) > 0:
+        path, error = next(iter(failed.items()))
+        logger.warning(
+            "Failed to download %d of %d assets, e.g. %s: %s", len(failed), len(missing), path, error
+        )
+    return len(downloaded)
+
+
+_manifest_lock = threading.Lock()
+"""Serializes the read-merge-write of the manifest across concurrent downloads."""
+
+
+def _atomic_write(path: str, content: bytes) -> None:
+    """Write `content` to a unique temporary file next to `path`
+    and rename it over `path`, so concurrent writers never share
+    a temporary file and readers never see a partial file."""
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
         f.write(content)
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+def update_manifest(entries: Dict[str, dict]) -> None:
+    """Merge `entries` into the manifest, written atomically."""
+    if len(entries) == 0:
+        return
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    with _manifest_lock:
+        manifest: Dict[str, dict] = {}
+        if os.path.exists(MANIFEST_PATH):
+            try:
+                with open(MANIFEST_PATH, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except ValueError:
+                manifest = {}
+        manifest.update(entries)
+        content = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True)
+        _atomic_write(MANIFEST_PATH, content.encode("utf-8"))
+
+
+def collect_assets() -> Dict[str, str]:
+    """Walk the loaded `enkanetwork.Assets` data and return the
+    `{relative path: url}` of every character banner, constellation
+    and talent icon a card may need.
+
+    Weapon and artifact icons are not part of the assets data,
+    they are downloaded per card by `prefetch_assets`."""
+    assets: Dict[str, str] = {}
+    for character_id in list(Assets.DATA.get("characters", {})):
+        character = Assets.character(character_id)
+        if character is None or character.images.banner is None:
+            continue
+        banner = character.images.banner
+        if banner.filename:
+            assets[f"attributes/Genshin/Gacha/{banner.filename}.png"] = banner.url
+    for key, getter in (("constellations", Assets.constellations), ("skills", Assets.skills)):
+        for asset_id in list(Assets.DATA.get(key, {})):
+            asset = getter(asset_id)
+            if asset is None or asset.icon is None or not asset.icon.filename:
+                continue
+            assets[f"attributes/Genshin/UI/{asset.icon.filename}.png"] = asset.icon.url
+    return assets
+
+
+async def prefetch_all_assets(concurrency: int = 8) -> int:
+    """Download every missing asset listed by `collect_assets`,
+    meant to run in the background after `update_assets`.
+    Returns the number of downloaded assets."""
+    return await download_assets(collect_assets(), concurrency)
 
 
 async def open_image(
@@ -48,17 +193,118 @@ async def open_image(
     resize: tuple = None,
     resample: int = Image.BICUBIC,
 ) -> Image:
-    path = os.path.join(current_path, path)
-    if not os.path.exists(path):
-        await check_asset(path, asset_url)
-
-    image = Image.open(path)
-    image = image.convert(mode)
-
-    if resize:
-        image = image.resize(resize, resample)
+    if not os.path.exists(os.path.join(current_path, path)):
+        await check_asset(os.path.join(current_path, path), asset_url)
+
+    return load_image(path, mode=mode, resize=resize, resample=resample)
+
+
+class ImageCache:
+    """LRU cache of decoded, converted and resized images keyed by
+    (path, mode, size, resample), bounded by `max_bytes` of pixel data.
+
+    Cached images are never handed out directly, `get` returns a copy
+    so callers can paste into or modify it freely. `on_event`, if set,
+    is called with "hit" or "miss" on every lookup."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.on_event: Optional[Callable[[str], None]] = None
+        self._images: OrderedDict[tuple, Image.Image] = OrderedDict()
+        self._size = 0
+        # Renders may run on several threads of the same process
+        # (e.g. the default thread pool), so every access to the
+        # dict and the size counter holds this lock.
+        self._lock = threading.Lock()
+
+    def get(self, path: str, mode: str, resize: tuple = None, resample: int = Image.BICUBIC) -> Image:
+        key = (path, mode, resize, resample)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self.hits += 1
+                self._images.move_to_end(key)
+                image = image.copy()
+            else:
+                self.misses += 1
+        if self.on_event is not None:
+            self.on_event("hit" if image is not None else "miss")
+        if image is not None:
+            return image
+
+        # Decode outside the lock, two threads missing on the same
+        # key only decode it twice, `_put` keeps a single entry.
+        image = Image.open(path)
+        image = image.convert(mode)
+        if resize:
+            image = image.resize(resize, resample)
+        self._put(key, image)
+        return image.copy()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._size = 0
+
+    def _put(self, key: tuple, image: Image.Image) -> None:
+        size = self._byte_size(image)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self._size -= self._byte_size(previous)
+            self._images[key] = image
+            self._size += size
+            while self._size > self.max_bytes and len(self._images) > 0:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= self._byte_size(evicted)
+
+    @staticmethod
+    def _byte_size(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+
+image_cache = ImageCache()
+"""Decoded asset cache shared by every card rendered in this process."""
+
+
+def load_image(
+    path: str,
+    mode: str = "RGBA",
+    resize: tuple = None,
+    resample: int = Image.BICUBIC,
+) -> Image:
+    """Synchronous counterpart of `open_image` for assets that
+    already exist locally (see `prefetch_assets`), served from `image_cache`."""
+    return image_cache.get(os.path.join(current_path, path), mode, resize, resample)
+
+
+async def prefetch_assets(character: CharacterInfo) -> None:
+    """Download every remote asset the card of this character needs,
+    so that the card itself can be rendered without network access."""
+    assets = [
+        (f"attributes/Genshin/Gacha/{character.image.banner.filename}.png", character.image.banner.url),
+        *[
+            (f"attributes/Genshin/UI/{c.icon.filename}.png", c.icon.url)
+            for c in character.constellations
+        ],
+        *[(f"attributes/Genshin/UI/{s.icon.filename}.png", s.icon.url) for s in character.skills],
+    ]
+    for equipment in character.equipments:
+        if equipment.type == EquipmentsType.WEAPON:
+            folder = "Weapon"
+        elif equipment.type == EquipmentsType.ARTIFACT:
+            folder = "Artifact"
+        else:
+            continue
+        assets.append(
+            (f"attributes/Genshin/{folder}/{equipment.detail.icon.filename}.png", equipment.detail.icon.url)
+        )
 
-    return image
+    await download_assets(dict(assets))
 
 
 def scale_image(
@@ -85,18 +331,31 @@ def scale_image(
         )
 
 
+FONT_FILES = {
+    "normal": "/attributes/Fonts/JA-JP.TTF",
+    # Insert other fonts you'd like to use here, if any
+}
+
+PRELOAD_FONT_SIZES = (12, 14, 16, 17, 18, 20, 22, 23, 27, 30)
+"""Font sizes used by the card, loaded ahead of time by `preload_fonts`."""
+
+
+@lru_cache(maxsize=None)
 def get_font(font: Literal["normal"], size: int) -> ImageFont.FreeTypeFont:
-    """Helper method to get a font."""
-    return {
-        "normal": ImageFont.truetype(current_path + "/attributes/Fonts/JA-JP.TTF", size),
-        # Insert other fonts you'd like to use here, if any
-    }.get(font, ImageFont.truetype(current_path + "/attributes/Fonts/JA-JP.TTF", size))
+    """Helper method to get a font, each (font, size) pair
+    is only loaded from disk once."""
+    return ImageFont.truetype(current_path + FONT_FILES.get(font, FONT_FILES["normal"]), size)
+
+
+def preload_fonts() -> None:
+    """Load the fonts of `PRELOAD_FONT_SIZES` into the cache."""
+    for size in PRELOAD_FONT_SIZES:
+        get_font("normal", size)
 
 
 def fade_character_art(im: Image) -> Image:
     # Load mask from attributes
-    mask = Image.open(current_path + "/attributes/Assets/enka_character_mask.png").convert("L")
-    mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
+    mask = load_image("attributes/Assets/enka_character_mask.png", "L", im.size, Image.NEAREST)
 
     # Extract alpha channel from original image
     alpha = im.split()[-1]
@@ -114,12 +373,11 @@ def fade_character_art(im: Image) -> Image:
 
 def fade_asset_icon(im: Image, _type: Literal["artifact"]) -> Image:
     mask_fp = {
-        "artifact": current_path + "/attributes/Assets/artifact_mask.png",
+        "artifact": "attributes/Assets/artifact_mask.png",
         # Insert other masks you'd like to use here, if any
     }.get(_type)
 
-    mask = Image.open(mask_fp).convert("L")
-    mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
+    mask = load_image(mask_fp, "L", im.size, Image.NEAREST)
 
     overlay = Image.new("RGBA", im.size, (0, 0, 0, 0))
     overlay.paste(im, (0, 0), mask)
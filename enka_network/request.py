@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Optional
 
 import aiohttp
 
+from utility.prometheus import upstream_trace_config
+
 from .api import EnkaAPI, EnkaError
 
 
@@ -27,8 +29,9 @@ async def fetch_enka_data(
         將從 API 取得的資料
 
     """
-    async with aiohttp.request(
-        "GET",
+    async with aiohttp.ClientSession(
+        trace_configs=[upstream_trace_config("enka")]
+    ) as session, session.get(
         EnkaAPI.get_user_data_url(uid),
         headers={"User-Agent": "KT-Yeh/Genshin-Discord-Bot"},
     ) as resp:
@@ -85,14 +88,13 @@ def _combine_cache_data(new_data: Dict[str, Any], cache_data: Dict[str, Any]) ->
         return new_data
 
     def combine_list(new_list: List[Dict[str, Any]], cache_list: List[Dict[str, Any]]):
+        # 若新資料與快取資料有相同角色，則保留新資料；其他角色從快取資料加入到新資料裡面
+        new_ids = {avatarInfo["avatarId"] for avatarInfo in new_list}
         for cache_avatarInfo in cache_list:
             if len(new_list) >= 23:  # 因應Discord下拉選單的上限，在此只保留23名角色
                 break
-            # 若新資料與快取資料有相同角色，則保留新資料；其他角色從快取資料加入到新資料裡面
-            for new_avatarInfo in new_list:
-                if new_avatarInfo["avatarId"] == cache_avatarInfo["avatarId"]:
-                    break
-            else:
+            if cache_avatarInfo["avatarId"] not in new_ids:
+                new_ids.add(cache_avatarInfo["avatarId"])
                 new_list.append(cache_avatarInfo)
 
     if "showAvatarInfoList" in cache_data["playerInfo"]:
@@ -1,18 +1,75 @@
 import io
 from datetime import datetime
+from functools import partial
 from typing import Any
 
 import discord
 import enkanetwork
 
 from database import Database, GenshinShowcase
-from utility import emoji
+from utility import config, emoji
+from utility.render_executor import RenderExecutor, record_cache_event
+from utility.singleflight import SingleFlight
 
 from .api import EnkaAPI
-from .enka_card import generate_image
+from .card_cache import CardCache
+from .enka_card import image_cache, prefetch_assets, preload_fonts, render_image
 from .request import fetch_enka_data
 
 enka_assets = enkanetwork.Assets(lang=enkanetwork.Language.EN)
+RenderExecutor.register_initializer(preload_fonts)
+# 設定角色卡片素材快取，此模組在繪圖程序內也會被載入，因此設定同樣套用到繪圖程序
+image_cache.max_bytes = config.enka_image_cache_mb * 1024 * 1024
+image_cache.on_event = partial(record_cache_event, "enka_image")
+
+
+_loader: SingleFlight[int, tuple[dict[str, Any], bool, str | None]] = SingleFlight()
+"""以 UID 為 key 合併並行的展示櫃資料請求，並在 Enka 回傳的 ttl 內保存資料"""
+
+
+async def _load_raw_data(uid: int) -> tuple[tuple[dict[str, Any], bool, str | None], float]:
+    """從資料庫或 API 取得玩家的展示櫃原生資料
+
+    Returns
+    ------
+    `tuple[tuple[dict[str, Any], bool, str | None], float]`
+        ((原生資料, 是否為快取資料, API 錯誤訊息), 資料在記憶體內的有效秒數)
+    """
+    raw_data: dict[str, Any] | None = None
+    is_fetched_data = False
+    is_cached_data = False
+    api_error_msg: str | None = None
+
+    # 從資料庫取得快取資料
+    gshowcase = await Database.select_one(GenshinShowcase, GenshinShowcase.uid.is_(uid))
+    if gshowcase is not None:
+        raw_data = gshowcase.data
+
+    if raw_data is None:  # 新的使用者
+        raw_data = await fetch_enka_data(uid)
+        is_fetched_data = True
+    else:  # 舊有的使用者
+        # 為了減少無效的重複請求，檢查快取時間戳是否有效，若超過期限則從API取得資料
+        refresh_timestamp = raw_data.get("timestamp", 0) + raw_data.get("ttl", 0)
+        if datetime.now().timestamp() > refresh_timestamp:
+            try:
+                raw_data = await fetch_enka_data(uid, raw_data)
+                is_fetched_data = True
+            except Exception as e:
+                # 發生錯誤時，標記目前資料為快取資料
+                is_cached_data = True
+                api_error_msg = str(e)
+
+    # 當有從 API 取得新資料時，則存入資料庫，內容沒有變動的角色沿用資料庫內的壓縮資料
+    if is_fetched_data:
+        gshowcase = GenshinShowcase(uid, raw_data, gshowcase)
+        await Database.insert_or_replace(gshowcase)
+
+    # 在 Enka 的 ttl 到期之前，直接使用記憶體內的資料，不再讀取資料庫；API 發生錯誤時不保存
+    ttl = 0.0
+    if is_cached_data is False:
+        ttl = raw_data.get("timestamp", 0) + raw_data.get("ttl", 0) - datetime.now().timestamp()
+    return (raw_data, is_cached_data, api_error_msg), ttl
 
 
 class Showcase:
@@ -22,8 +79,10 @@ class Showcase:
     -----
     raw_data: `Dict[str, Any] | None`
         從 Enka API 取得的原生 JSON 資料
+    player_data: `enkanetwork.EnkaNetworkResponse`
+        經由 EnkaNetwork.py 解析 raw_data 後的資料，只包含玩家資料與角色預覽，不包含角色詳細資料
     data: `enkanetwork.EnkaNetworkResponse`
-        經由 EnkaNetwork.py 解析 raw_data 後的資料
+        經由 EnkaNetwork.py 解析 raw_data 後的完整資料，第一次使用時才解析所有角色
     uid: `int`
         使用者的原神 UID
     is_cached_data: `bool`
@@ -38,7 +97,8 @@ class Showcase:
 
     def __init__(self, uid: int) -> None:
         self.raw_data: dict[str, Any] | None = None
-        self.data: enkanetwork.EnkaNetworkResponse
+        self.player_data: enkanetwork.EnkaNetworkResponse
+        self._data: enkanetwork.EnkaNetworkResponse | None = None
         self.uid: int = uid
         self.is_cached_data = False
         self.api_error_msg: str | None = None
@@ -46,35 +106,35 @@ class Showcase:
         self.image_buffers: list[io.BytesIO | None] = [None] * 25
 
     async def load_data(self) -> None:
-        """取得玩家的角色展示櫃資料"""
-        # 從資料庫取得快取資料
-        gshowcase = await Database.select_one(GenshinShowcase, GenshinShowcase.uid.is_(self.uid))
-        if gshowcase is not None:
-            self.raw_data = gshowcase.data
-
-        if self.raw_data is None:  # 新的使用者
-            self.raw_data = await fetch_enka_data(self.uid)
-        else:  # 舊有的使用者
-            # 為了減少無效的重複請求，檢查快取時間戳是否有效，若超過期限則從API取得資料
-            refresh_timestamp = self.raw_data.get("timestamp", 0) + self.raw_data.get("ttl", 0)
-            if datetime.now().timestamp() > refresh_timestamp:
-                try:
-                    self.raw_data = await fetch_enka_data(self.uid, self.raw_data)
-                except Exception as e:
-                    # 發生錯誤時，標記目前資料為快取資料
-                    self.is_cached_data = True
-                    self.api_error_msg = str(e)
-
-        # 當有從 API 取得資料時 (非快取)，則存入資料庫
-        if self.is_cached_data is False:
-            gshowcase = GenshinShowcase(self.uid, self.raw_data)
-            await Database.insert_or_replace(gshowcase)
-
-        self.data = enkanetwork.EnkaNetworkResponse.parse_obj(self.raw_data)
+        """取得玩家的角色展示櫃資料，同一位玩家的並行請求會共用同一次 API 請求與資料庫寫入"""
+        self.raw_data, self.is_cached_data, self.api_error_msg = await _loader.do(
+            self.uid, lambda: _load_raw_data(self.uid)
+        )
+        self._data = None
+        self.player_data = enkanetwork.EnkaNetworkResponse.parse_obj(
+            {k: v for k, v in self.raw_data.items() if k != "avatarInfoList"}
+        )
+
+    async def delete_data(self) -> None:
+        """刪除資料庫內此玩家的展示櫃資料，並清除記憶體內保存的資料"""
+        await Database.delete_where(GenshinShowcase, GenshinShowcase.uid.is_(self.uid))
+        self.invalidate(self.uid)
+
+    @staticmethod
+    def invalidate(uid: int) -> None:
+        """清除記憶體內保存的玩家展示櫃資料，在刪除資料庫內的展示櫃資料後呼叫"""
+        _loader.invalidate(uid)
+
+    @property
+    def data(self) -> enkanetwork.EnkaNetworkResponse:
+        """經由 EnkaNetwork.py 解析 raw_data 後的完整資料"""
+        if self._data is None:
+            self._data = enkanetwork.EnkaNetworkResponse.parse_obj(self.raw_data)
+        return self._data
 
     def get_player_overview_embed(self) -> discord.Embed:
         """取得玩家基本資料的嵌入訊息"""
-        player = self.data.player
+        player = self.player_data.player
         if self.raw_data is None or player is None:
             raise Exception("玩家資料不存在")
         embed = discord.Embed(
@@ -299,17 +359,22 @@ class Showcase:
             image = image_buffer
             image.seek(0)
         else:
-            image = await generate_image(
-                self.data,
-                self.data.characters[index],
-                enkanetwork.Language.EN,
-                save_locally=False,
-            )
+            character = self.data.characters[index]
+            locale = enkanetwork.Language.EN
+            cache_key = CardCache.key(self.data, character, locale)
+            if (content := await CardCache.get(cache_key)) is not None:
+                image = io.BytesIO(content)
+            else:
+                await prefetch_assets(character)
+                image = await RenderExecutor.run(
+                    render_image, self.data, character, locale, save_locally=False
+                )
+                await CardCache.put(cache_key, image.getvalue())
             self.image_buffers[index] = image
         return image
 
     def get_default_embed(self, index: int) -> discord.Embed:
-        character = self.data.player.characters_preview[index]  # type: ignore
+        character = self.player_data.player.characters_preview[index]  # type: ignore
         color = {
             enkanetwork.ElementType.Pyro: 0xFB4120,
             enkanetwork.ElementType.Electro: 0xBF73E7,
@@ -327,7 +392,7 @@ class Showcase:
         if character.icon:
             embed.set_thumbnail(url=character.icon.url)
 
-        if (player := self.data.player) is not None:
+        if (player := self.player_data.player) is not None:
             embed.set_author(
                 name=f"{player.nickname} Character Showcase",
                 url=self.url,
@@ -335,7 +400,7 @@ class Showcase:
             )
             embed.set_footer(text=f"{player.nickname}．Lv. {player.level}．UID: {self.uid}")
 
-        if self.data.characters is None:
+        if self.raw_data is None or self.raw_data.get("avatarInfoList") is None:
             embed.description = "Please open [Show Character Details] in your in-game character showcase to view more detailed character information."
 
         return embed
@@ -3,6 +3,8 @@ from typing import Any, ClassVar, Union
 
 import aiohttp
 
+from utility.prometheus import upstream_trace_config
+
 
 class API:
     """genshin-db api，能夠取得遊戲內容 json 格式資料"""
@@ -80,7 +82,7 @@ class API:
             "queryLanguages": queryLanguages,
             "resultLanguage": resultLanguage,
         }
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[upstream_trace_config("genshin_db")]) as session:
             async with session.get(url, params=params) as response:
                 if response.status != 200:
                     raise Exception(
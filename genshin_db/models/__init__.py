@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from ..search_index import SearchIndex
 
 from .achievements import Achievement, Achievements
 from .artifacts import Artifact, Artifacts
@@ -39,6 +41,20 @@ class GenshinDbAllData:
     talents: Talents
     tcg_cards: TCGCards
     weapons: Weapons
+    search_indices: dict[str, SearchIndex] = field(init=False, repr=False)
+    """各類別的名稱搜尋索引，key 為 characters、weapons、artifacts、items (物品與食物)、achievements、tcg_cards"""
+
+    def __post_init__(self) -> None:
+        self.search_indices = {
+            "characters": SearchIndex(c.name for c in self.characters.list),
+            "weapons": SearchIndex(w.name for w in self.weapons.list),
+            "artifacts": SearchIndex(a.name for a in self.artifacts.list),
+            "items": SearchIndex(
+                [m.name for m in self.materials.list] + [f.name for f in self.foods.list]
+            ),
+            "achievements": SearchIndex(a.name for a in self.achievements.list),
+            "tcg_cards": SearchIndex(c.name for c in self.tcg_cards.list),
+        }
 
     def find(self, item_name: str) -> GenshinDbItem | None:
         return (
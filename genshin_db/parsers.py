@@ -1,4 +1,5 @@
-from typing import Callable, Type
+import copy
+from typing import Any, Callable, ClassVar, Type
 
 import discord
 
@@ -8,6 +9,7 @@ from .api import API
 from .models import Achievement, Character, Constellation, Food, Material, Talent, Weapon
 from .models.artifacts import Artifact, PartDetail
 from .models.tcg_cards import ActionCard, CharacterCard, DiceCost, Summon
+from .snapshot import GenshinDbSnapshot
 
 
 def parse(model) -> discord.Embed:
@@ -34,6 +36,34 @@ def parse(model) -> discord.Embed:
         return EmbedTemplate.error("發生錯誤，無法解析資料")
 
 
+class EmbedCache:
+    """快取 `parse` 產生的嵌入訊息
+
+    以 (model 類別, 名稱) 為 key 保存嵌入訊息的 dict，genshin-db 資料替換 (`GenshinDbSnapshot.version` 改變) 時自動清空，
+    重複查詢相同項目時不必再次解析資料與排版。
+    """
+
+    _version: ClassVar[int] = -1
+    _embeds: ClassVar[dict[tuple[Type, str], dict[str, Any]]] = {}
+
+    @classmethod
+    def parse(cls, model) -> discord.Embed:
+        """與 `parse` 相同，但優先使用快取的嵌入訊息"""
+        name = getattr(model, "name", None)
+        if not isinstance(name, str):
+            return parse(model)
+        if cls._version != GenshinDbSnapshot.version:
+            cls._embeds = {}
+            cls._version = GenshinDbSnapshot.version
+
+        key = (type(model), name)
+        if (embed_dict := cls._embeds.get(key)) is None:
+            embed_dict = parse(model).to_dict()
+            cls._embeds[key] = embed_dict
+        # 回傳的嵌入訊息可能被修改，因此每次都從複製的 dict 建立
+        return discord.Embed.from_dict(copy.deepcopy(embed_dict))
+
+
 class TCGCardParser:
     """七聖召喚"""
 
@@ -1,4 +1,5 @@
-from typing import Any, Tuple
+import asyncio
+from typing import Any
 
 from .api import API
 from .models import (
@@ -21,74 +22,41 @@ async def _request(folder: API.GenshinDBFolder) -> Any:
     )
 
 
-async def fetch_cards() -> TCGCards:
-    """取得七聖召喚卡牌的資料，並將資料傳入卡牌模型解析"""
+async def fetch_raw_data() -> dict[str, Any]:
+    """同時向 genshin-db api 請求所有資料夾，回傳尚未解析的 json 格式資料
 
-    action_cards = await _request(API.GenshinDBFolder.TCG_ACTION_CARDS)
-    character_cards = await _request(API.GenshinDBFolder.TCG_CHARACTER_CARDS)
-    summons = await _request(API.GenshinDBFolder.TCG_SUMMONS)
+    Returns
+    ------
+    `dict[str, Any]`
+        dict[資料夾名稱 (`GenshinDBFolder.value`), 該資料夾的 json 格式資料]
+    """
+    folders = list(API.GenshinDBFolder)
+    results = await asyncio.gather(*[_request(folder) for folder in folders])
+    return {folder.value: result for folder, result in zip(folders, results)}
 
-    return TCGCards(action_cards, character_cards, summons)
 
+def parse_raw_data(raw_data: dict[str, Any]) -> GenshinDbAllData:
+    """將 `fetch_raw_data` 取得的 json 格式資料傳入各模型解析後封裝"""
 
-async def fetch_achievements() -> Achievements:
-    """取得成就資料，並傳入模型解析"""
-    data = await _request(API.GenshinDBFolder.ACHIEVEMENTS)
-    return Achievements.parse_obj(data)
+    def get(folder: API.GenshinDBFolder) -> Any:
+        return raw_data[folder.value]
 
-
-async def fetch_characters() -> Tuple[Characters, Constellations, Talents]:
-    """取得角色、天賦、命座資料，並傳入模型解析"""
-    data = await _request(API.GenshinDBFolder.CHARACTERS)
-    characters = Characters.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.CONSTELLATIONS)
-    constellations = Constellations.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.TALENTS)
-    talents = Talents.parse_obj(data)
-
-    return characters, constellations, talents
-
-
-async def fetch_materials() -> Tuple[Materials, Foods]:
-    """取得物品、食物資料，並傳入模型解析"""
-    data = await _request(API.GenshinDBFolder.MATERIALS)
-    materials = Materials.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.FOODS)
-    foods = Foods.parse_obj(data)
-
-    return materials, foods
-
-
-async def fetch_equipments() -> Tuple[Artifacts, Weapons]:
-    """取得聖遺物、武器資料，並傳入模型解析"""
-    data = await _request(API.GenshinDBFolder.ARTIFACTS)
-    artifacts = Artifacts.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.WEAPONS)
-    weapons = Weapons.parse_obj(data)
-
-    return artifacts, weapons
+    Folder = API.GenshinDBFolder
+    return GenshinDbAllData(
+        Achievements.parse_obj(get(Folder.ACHIEVEMENTS)),
+        Artifacts.parse_obj(get(Folder.ARTIFACTS)),
+        Characters.parse_obj(get(Folder.CHARACTERS)),
+        Constellations.parse_obj(get(Folder.CONSTELLATIONS)),
+        Foods.parse_obj(get(Folder.FOODS)),
+        Materials.parse_obj(get(Folder.MATERIALS)),
+        Talents.parse_obj(get(Folder.TALENTS)),
+        TCGCards(
+            get(Folder.TCG_ACTION_CARDS), get(Folder.TCG_CHARACTER_CARDS), get(Folder.TCG_SUMMONS)
+        ),
+        Weapons.parse_obj(get(Folder.WEAPONS)),
+    )
 
 
 async def fetch_all() -> GenshinDbAllData:
     """取得所有 genshin-db 資料，解析後封裝"""
-    tcg_cards = await fetch_cards()
-    achievements = await fetch_achievements()
-    characters, constellations, talents = await fetch_characters()
-    materials, foods = await fetch_materials()
-    artifacts, weapons = await fetch_equipments()
-
-    return GenshinDbAllData(
-        achievements,
-        artifacts,
-        characters,
-        constellations,
-        foods,
-        materials,
-        talents,
-        tcg_cards,
-        weapons,
-    )
+    return parse_raw_data(await fetch_raw_data())
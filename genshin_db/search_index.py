@@ -0,0 +1,63 @@
+import random
+from typing import Final, Iterable
+
+
+class SearchIndex:
+    """物品名稱的搜尋索引，用於斜線指令的自動完成
+
+    建立時將每個名稱轉成小寫，並記錄名稱內所有長度 1 ~ 3 的片段 (n-gram) 出現在哪些名稱；
+    搜尋時只需取出關鍵字片段對應的名稱交集再確認，不必掃描所有名稱。
+    結果依照關鍵字在名稱中出現的位置、名稱長度排序，開頭相符的名稱排在最前面。
+
+    Parameters
+    ------
+    names: `Iterable[str]`
+        要建立索引的所有名稱，重複的名稱只會保留一個
+    """
+
+    MAX_GRAM: Final[int] = 3
+
+    def __init__(self, names: Iterable[str]):
+        self.names: list[str] = sorted(set(names))
+        self._normalized: list[str] = [name.casefold() for name in self.names]
+        self._postings: dict[str, list[int]] = {}
+        """dict[名稱片段, 包含此片段的名稱索引 (由小到大)]"""
+        for i, name in enumerate(self._normalized):
+            grams: set[str] = set()
+            for n in range(1, self.MAX_GRAM + 1):
+                grams.update(name[j : j + n] for j in range(len(name) - n + 1))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def search(self, query: str, limit: int = 25) -> list[str]:
+        """搜尋包含關鍵字的名稱 (不分大小寫)
+
+        Parameters
+        ------
+        query: `str`
+            搜尋關鍵字，空字串時隨機回傳名稱
+        limit: `int` = 25
+            最多回傳的名稱數量
+
+        Returns
+        ------
+        `list[str]`
+            符合的名稱，依照相符程度排序
+        """
+        query = query.casefold()
+        if query == "":
+            return sorted(random.sample(self.names, k=min(limit, len(self.names))))
+
+        n = min(len(query), self.MAX_GRAM)
+        grams = {query[j : j + n] for j in range(len(query) - n + 1)}
+        postings = sorted((self._postings.get(gram, []) for gram in grams), key=len)
+        candidates: Iterable[int] = postings[0]
+        if len(postings) > 1:
+            candidates = set(postings[0]).intersection(*postings[1:])
+
+        matches: list[tuple[int, int, int]] = []
+        for i in candidates:
+            if (pos := self._normalized[i].find(query)) >= 0:
+                matches.append((pos, len(self.names[i]), i))
+        matches.sort()
+        return [self.names[i] for _, _, i in matches[:limit]]
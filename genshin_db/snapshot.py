@@ -0,0 +1,95 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, ClassVar, Final
+
+from utility.custom_log import LOG
+
+from .models import GenshinDbAllData
+from .request import fetch_raw_data, parse_raw_data
+
+
+class GenshinDbSnapshot:
+    """genshin-db 資料的本地快照
+
+    將 genshin-db api 的資料以 gzip 壓縮的 json 保存在硬碟，啟動時直接從快照載入，不需等待 API；
+    之後在背景向 API 取得最新資料，解析完成後才整份替換 `data`，替換前後的使用者都能取得完整的資料。
+    """
+
+    PATH: Final[Path] = Path("data/genshin_db/snapshot.json.gz")
+    """快照檔案的位置"""
+    FORMAT_VERSION: Final[int] = 1
+    """快照檔案的格式版本，與此數字不同的快照會被忽略"""
+
+    data: ClassVar[GenshinDbAllData | None] = None
+    """目前使用中的 genshin-db 資料，尚未載入時為 `None`"""
+    version: ClassVar[int] = 0
+    """目前資料的版本，每次替換資料時增加"""
+    timestamp: ClassVar[int] = 0
+    """目前資料從 API 取得的時間戳"""
+
+    _refresh_lock: ClassVar[asyncio.Lock | None] = None
+
+    @classmethod
+    async def load(cls) -> bool:
+        """從硬碟載入快照
+
+        Returns
+        ------
+        `bool`
+            是否成功載入快照，快照不存在或格式不符時回傳 `False`
+        """
+        try:
+            snapshot = await asyncio.to_thread(cls._read)
+            if snapshot is None:
+                return False
+            data = await asyncio.to_thread(parse_raw_data, snapshot["folders"])
+        except Exception as e:
+            LOG.Error(f"genshin-db 快照載入失敗: {e}")
+            return False
+        cls._swap(data, snapshot["timestamp"])
+        LOG.System(f"genshin-db 已從快照載入 (資料時間: {snapshot['timestamp']})")
+        return True
+
+    @classmethod
+    async def refresh(cls) -> None:
+        """從 genshin-db api 取得最新資料，保存快照並替換目前的資料"""
+        if cls._refresh_lock is None:
+            cls._refresh_lock = asyncio.Lock()
+        async with cls._refresh_lock:
+            raw_data = await fetch_raw_data()
+            data = await asyncio.to_thread(parse_raw_data, raw_data)
+            timestamp = int(time.time())
+            await asyncio.to_thread(
+                cls._write,
+                {"format": cls.FORMAT_VERSION, "timestamp": timestamp, "folders": raw_data},
+            )
+            cls._swap(data, timestamp)
+            LOG.System("genshin-db 已從 API 更新資料")
+
+    @classmethod
+    def _swap(cls, data: GenshinDbAllData, timestamp: int) -> None:
+        cls.data = data
+        cls.timestamp = timestamp
+        cls.version += 1
+
+    @classmethod
+    def _read(cls) -> dict[str, Any] | None:
+        if not cls.PATH.exists():
+            return None
+        with gzip.open(cls.PATH, "rt", encoding="utf-8") as f:
+            snapshot: dict[str, Any] = json.load(f)
+        if snapshot.get("format") != cls.FORMAT_VERSION:
+            return None
+        return snapshot
+
+    @classmethod
+    def _write(cls, snapshot: dict[str, Any]) -> None:
+        cls.PATH.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cls.PATH.with_suffix(".tmp")
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, cls.PATH)
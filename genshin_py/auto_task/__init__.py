@@ -1,4 +1,5 @@
 """此模組的函式用來給 schedule cog 使用，包含了自動排程執行時會用到的每日簽到與確認即時便箋"""
 
 from .daily_reward import DailyReward
+from .notification import Notification, NotificationDispatcher
 from .realtime_notes import *
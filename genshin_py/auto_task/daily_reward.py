@@ -9,9 +9,10 @@ from discord.ext import commands
 
 import database
 from database import Database, GeetestChallenge, ScheduleDailyCheckin, User
-from utility import LOG, EmbedTemplate, config
+from utility import LOG, config
 
 from .. import claim_daily_reward
+from .notification import Notification, NotificationDispatcher
 
 
 class DailyReward:
@@ -58,12 +59,16 @@ class DailyReward:
             cls._starrail_count = {}
             cls._zzz_count = {}
             cls._themis_count = {}
-            daily_users = await Database.select_all(ScheduleDailyCheckin)
+            # 只從資料庫選出簽到時間已到的使用者，依簽到時間排序 (使用 next_checkin_time 索引)
+            daily_users = await Database.select_all(
+                ScheduleDailyCheckin,
+                ScheduleDailyCheckin.next_checkin_time < datetime.now(),
+                order_by=ScheduleDailyCheckin.next_checkin_time,
+            )
 
             # 將所有需要簽到的使用者放入佇列 (Producer)
             for user in daily_users:
-                if user.next_checkin_time < datetime.now():
-                    await queue.put(user)
+                await queue.put(user)
 
             # 建立本地簽到任務 (Consumer)
             tasks = [asyncio.create_task(cls._claim_daily_reward_task(queue, "LOCAL", bot))]
@@ -241,22 +246,27 @@ class DailyReward:
 
     @classmethod
     async def _send_message(cls, bot: commands.Bot, user: ScheduleDailyCheckin, message: str):
-        """向使用者發送簽到結果的訊息"""
+        """將簽到結果的通知交給 `NotificationDispatcher`，同一頻道的通知會合併發送"""
         try:
-            _id = user.discord_channel_id
-            channel = bot.get_channel(_id) or await bot.fetch_channel(_id)
-            # 若不用@提及使用者，則先取得此使用者的名稱然後發送訊息
-            if user.is_mention is False and "Cookie已失效" not in message:
-                _user = await bot.fetch_user(user.discord_id)
-                await channel.send(embed=EmbedTemplate.normal(f"Automatic sign-in: {_user.name}：{message}"))  # type: ignore
-            else:  # 若需要@提及使用者或是 Cookie 已失效
-                await channel.send(f"<@{user.discord_id}>", embed=EmbedTemplate.normal(f"Automatic sign-in: {message}"))  # type: ignore
-        except (
-            discord.Forbidden,
-            discord.NotFound,
-            discord.InvalidData,
-        ) as e:  # 發送訊息失敗，移除此使用者
-            LOG.Except(f"Failed to send message, remove this user. {LOG.User(user.discord_id)}：{e}")
+            # 若不用@提及使用者，則先取得此使用者的名稱；若需要@提及使用者或是 Cookie 已失效則提及使用者
+            mention = user.is_mention or "Cookie已失效" in message
+            name = f"<@{user.discord_id}>" if mention else (await NotificationDispatcher.get_user(bot, user.discord_id)).name
+        except (discord.Forbidden, discord.NotFound) as e:  # 無法取得使用者 (例如帳號已刪除)，移除此使用者
+            LOG.Except(f"Failed to fetch user, remove this user. {LOG.User(user.discord_id)}：{e}")
             await Database.delete_instance(user)
+            return
         except Exception as e:
             sentry_sdk.capture_exception(e)
+            return
+
+        async def remove_user() -> None:
+            await Database.delete_instance(user)
+
+        notification = Notification(
+            user.discord_id,
+            user.discord_channel_id,
+            f"Automatic sign-in: {name}：{message}",
+            mention=mention,
+            on_unreachable=remove_user,
+        )
+        NotificationDispatcher.enqueue(bot, notification)
@@ -0,0 +1,218 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, ClassVar, Final
+
+import discord
+import sentry_sdk
+from discord.ext import commands
+
+from utility import LOG, EmbedTemplate, config
+from utility.rate_limit import TokenBucket
+from utility.singleflight import SingleFlight
+
+
+@dataclass
+class Notification:
+    """一則排程要發送給使用者的通知"""
+
+    discord_id: int
+    """使用者的 Discord ID"""
+    channel_id: int
+    """發送通知的頻道 ID"""
+    line: str
+    """通知的文字內容，同一頻道的通知會合併在同一個 embed，一則通知一行"""
+    embed: discord.Embed | None = None
+    """通知額外附加的 embed，`line` 會放在此 embed 的開頭，而不合併到共用的 embed"""
+    mention: bool = True
+    """是否在訊息內容 @提及使用者"""
+    check_mentioned: bool = False
+    """發送後是否確認使用者有被提及，沒有被提及表示使用者已不在頻道"""
+    on_unreachable: Callable[[], Awaitable[None]] | None = None
+    """無法發送到頻道 (或使用者已不在頻道) 時呼叫，用來將使用者從排程移除"""
+
+
+class NotificationDispatcher:
+    """合併排程通知後再發送到頻道
+
+    通知依照頻道放入佇列，頻道收到第一則通知後等待 {config.notification_coalesce_window} 秒，
+    期間同一頻道的通知合併成一則訊息 (內容為所有使用者的提及，embed 內一位使用者一行)，
+    超過 Discord 訊息限制時才拆成多則訊息。每個頻道同時只有一個發送中的任務，依序發送，
+    各頻道的路由速率限制由 discord.py 依照回應標頭處理；所有頻道的發送則另外以 token bucket 限制總速率，
+    保留全域速率給使用者的指令。頻道與使用者的查詢結果會保存在記憶體，避免每則通知都呼叫 API。
+    """
+
+    MAX_CONTENT_LENGTH: Final[int] = 2000
+    """訊息內容的字數上限"""
+    MAX_EMBEDS: Final[int] = 10
+    """每則訊息的 embed 數量上限"""
+    MAX_DESCRIPTION_LENGTH: Final[int] = 4096
+    """embed 描述的字數上限"""
+    MAX_EMBEDS_LENGTH: Final[int] = 6000
+    """每則訊息所有 embed 的總字數上限"""
+    SEND_RATE: Final[float] = 20.0
+    """所有頻道每秒最多發送的訊息數量"""
+    CHANNEL_CACHE_TTL: Final[float] = 600.0
+    """頻道查詢結果保存的秒數"""
+    USER_CACHE_TTL: Final[float] = 3600.0
+    """使用者查詢結果保存的秒數"""
+
+    _pending: ClassVar[dict[int, list[Notification]]] = {}
+    """等待發送的通知 dict[頻道 ID, 通知]"""
+    _tasks: ClassVar[dict[int, asyncio.Task]] = {}
+    """各頻道的發送任務 dict[頻道 ID, task]"""
+    _send_bucket: ClassVar[TokenBucket] = TokenBucket(SEND_RATE)
+    _channels: ClassVar[SingleFlight[int, discord.abc.Messageable]] = SingleFlight()
+    _users: ClassVar[SingleFlight[int, discord.User]] = SingleFlight()
+
+    @classmethod
+    def enqueue(cls, bot: commands.Bot, notification: Notification) -> None:
+        """將通知放入頻道的佇列，頻道沒有發送中的任務時建立新的任務
+
+        Parameters
+        ------
+        bot: `commands.Bot`
+            Discord 機器人客戶端
+        notification: `Notification`
+            要發送的通知
+        """
+        channel_id = notification.channel_id
+        cls._pending.setdefault(channel_id, []).append(notification)
+        if channel_id not in cls._tasks:
+            cls._tasks[channel_id] = asyncio.create_task(cls._run_channel(bot, channel_id))
+
+    @classmethod
+    async def flush(cls) -> None:
+        """等待所有頻道目前的通知發送完畢，在機器人關閉前呼叫"""
+        await asyncio.gather(*cls._tasks.values(), return_exceptions=True)
+
+    @classmethod
+    async def get_channel(cls, bot: commands.Bot, channel_id: int) -> discord.abc.Messageable:
+        """取得頻道，優先使用機器人與記憶體內的快取"""
+        if (channel := bot.get_channel(channel_id)) is not None:
+            return channel  # type: ignore
+
+        async def fetch() -> tuple[discord.abc.Messageable, float]:
+            return await bot.fetch_channel(channel_id), cls.CHANNEL_CACHE_TTL  # type: ignore
+
+        return await cls._channels.do(channel_id, fetch)
+
+    @classmethod
+    async def get_user(cls, bot: commands.Bot, user_id: int) -> discord.User:
+        """取得使用者，優先使用機器人與記憶體內的快取"""
+        if (user := bot.get_user(user_id)) is not None:
+            return user
+
+        async def fetch() -> tuple[discord.User, float]:
+            return await bot.fetch_user(user_id), cls.USER_CACHE_TTL
+
+        return await cls._users.do(user_id, fetch)
+
+    @classmethod
+    async def _run_channel(cls, bot: commands.Bot, channel_id: int) -> None:
+        """頻道的發送任務：等待合併時間後發送佇列內所有的通知，直到佇列清空為止"""
+        try:
+            while True:
+                await asyncio.sleep(config.notification_coalesce_window)
+                notifications = cls._pending.pop(channel_id, [])
+                if len(notifications) == 0:
+                    break
+                await cls._send_channel(bot, channel_id, notifications)
+        finally:
+            cls._tasks.pop(channel_id, None)
+
+    @classmethod
+    async def _send_channel(cls, bot: commands.Bot, channel_id: int, notifications: list[Notification]) -> None:
+        try:
+            channel = await cls.get_channel(bot, channel_id)
+        except (discord.Forbidden, discord.NotFound, discord.InvalidData) as e:
+            await cls._remove_unreachable(notifications, f"無法取得頻道 {channel_id}：{e}")
+            return
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+            return
+
+        for content, embeds, batch in cls._build_messages(notifications):
+            await cls._send_bucket.acquire()
+            try:
+                message = await channel.send(content, embeds=embeds)
+            except (discord.Forbidden, discord.NotFound, discord.InvalidData) as e:
+                cls._channels.invalidate(channel_id)
+                await cls._remove_unreachable(batch, f"無法發送訊息到頻道 {channel_id}：{e}")
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
+            else:
+                mentioned = {user.id for user in message.mentions}
+                absent = [n for n in batch if n.check_mentioned and n.mention and n.discord_id not in mentioned]
+                await cls._remove_unreachable(absent, f"使用者不在頻道 {channel_id}")
+
+    @classmethod
+    def _build_messages(
+        cls, notifications: list[Notification]
+    ) -> list[tuple[str | None, list[discord.Embed], list[Notification]]]:
+        """將通知依照 Discord 訊息的限制合併成最少數量的訊息
+
+        Returns
+        ------
+        `list[tuple[str | None, list[Embed], list[Notification]]]`
+            每則訊息的 (訊息內容, embeds, 此訊息包含的通知)
+        """
+        messages: list[tuple[str | None, list[discord.Embed], list[Notification]]] = []
+        mentions: dict[int, None] = {}
+        lines: list[str] = []
+        embeds: list[discord.Embed] = []
+        batch: list[Notification] = []
+
+        def lines_length(_lines: list[str]) -> int:
+            return len("\n".join(_lines))
+
+        def message_embeds(_lines: list[str], _embeds: list[discord.Embed]) -> list[discord.Embed]:
+            """訊息實際的 embeds：所有通知行合併成的共用 embed 加上各通知附加的 embed"""
+            return ([EmbedTemplate.normal("\n".join(_lines))] if len(_lines) > 0 else []) + _embeds
+
+        def pack() -> None:
+            content = " ".join(f"<@{user_id}>" for user_id in mentions) or None
+            messages.append((content, message_embeds(lines, embeds), batch.copy()))
+            mentions.clear()
+            lines.clear()
+            embeds.clear()
+            batch.clear()
+
+        for n in notifications:
+            new_mentions = mentions | ({n.discord_id: None} if n.mention else {})
+            new_lines, new_embeds = lines, embeds
+            if n.embed is not None:
+                embed = n.embed.copy()
+                embed.description = n.line + (f"\n\n{embed.description}" if embed.description else "")
+                new_embeds = embeds + [embed]
+            else:
+                new_lines = lines + [n.line]
+            candidate_embeds = message_embeds(new_lines, new_embeds)
+            fits = (
+                len(" ".join(f"<@{user_id}>" for user_id in new_mentions)) <= cls.MAX_CONTENT_LENGTH
+                and lines_length(new_lines) <= cls.MAX_DESCRIPTION_LENGTH
+                and len(candidate_embeds) <= cls.MAX_EMBEDS
+                and sum(len(e) for e in candidate_embeds) <= cls.MAX_EMBEDS_LENGTH
+            )
+            if fits is False and len(batch) > 0:
+                pack()
+                new_mentions = {n.discord_id: None} if n.mention else {}
+                new_lines = [] if n.embed is not None else [n.line]
+                new_embeds = new_embeds[-1:] if n.embed is not None else []
+            mentions.update(new_mentions)
+            lines[:] = new_lines
+            embeds[:] = new_embeds
+            batch.append(n)
+        if len(batch) > 0:
+            pack()
+        return messages
+
+    @classmethod
+    async def _remove_unreachable(cls, notifications: list[Notification], reason: str) -> None:
+        for n in notifications:
+            if n.on_unreachable is None:
+                continue
+            LOG.Except(f"notification: {reason}，移除使用者 {LOG.User(n.discord_id)}")
+            try:
+                await n.on_unreachable()
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
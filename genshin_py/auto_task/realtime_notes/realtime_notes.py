@@ -1,17 +1,20 @@
 import asyncio
-from datetime import datetime
-from typing import Awaitable, Callable, ClassVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, ClassVar
 
 import discord
 import sentry_sdk
-import sqlalchemy
 from discord.ext import commands
 
 from database import Database, GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes
 from utility import LOG, config
+from utility.prometheus import Metrics
 
+from ... import upstream_rate_limited
+from ..notification import Notification, NotificationDispatcher
 from .common import CheckResult, T_User
 from .genshin import check_genshin_notes
+from .scheduler import DueTimeScheduler
 from .starrail import check_starrail_notes
 from .zzz import check_zzz_notes
 
@@ -19,104 +22,209 @@ from .zzz import check_zzz_notes
 class RealtimeNotes:
     """自動排程的類別
 
+    每個遊戲各有一個常駐的排程任務，以 `DueTimeScheduler` 依照使用者的下次檢查時間排序，
+    在使用者到期時將其放入佇列，再由固定數量的 worker 同時檢查即時便箋，
+    對 Hoyolab 的請求速率由各上游的 token bucket 限制
+
     Methods
     -----
     execute(bot: `commands.Bot`)
-        執行自動排程
+        啟動自動排程
+    stop()
+        停止自動排程
+    schedule(user: `T_User`)
+        新增或更新使用者在排程中的下次檢查時間
+    unschedule(game_orm: type[`T_User`], discord_id: `int`)
+        將使用者從排程中移除
     """
 
-    _lock: ClassVar[asyncio.Lock] = asyncio.Lock()
-    _bot: commands.Bot
+    _bot: ClassVar[commands.Bot]
+    _games: ClassVar[dict[type, tuple[str, Callable[[Any], Awaitable[CheckResult | None]]]]] = {
+        GenshinScheduleNotes: ("Genshin Impact", check_genshin_notes),
+        StarrailScheduleNotes: ("Honkai: Star Rail", check_starrail_notes),
+        ZZZScheduleNotes: ("Zenless Zone Zero", check_zzz_notes),
+    }
+    """每個遊戲的名稱與檢查即時便箋的函式 dict[game_orm, (game_name, check_function)]"""
+    _schedulers: ClassVar[dict[type, DueTimeScheduler]] = {
+        game_orm: DueTimeScheduler(game_orm) for game_orm in _games
+    }
+    _queue: ClassVar[asyncio.Queue[tuple[type, int, datetime]]] = asyncio.Queue()
+    """已到期等待檢查的使用者佇列 (game_orm, discord_id, 到期時間)"""
+    _game_tasks: ClassVar[dict[type, asyncio.Task]] = {}
+    """每個遊戲的常駐排程任務 dict[game_orm, task]"""
+    _worker_tasks: ClassVar[list[asyncio.Task]] = []
+
+    MAX_WAIT_SECONDS: ClassVar[float] = 60.0
+    """排程每次等待的最長時間 (單位：秒)，用來定期確認遊戲維護時間"""
 
     @classmethod
     async def execute(cls, bot: commands.Bot):
-        """執行自動排程
+        """啟動自動排程，已在執行中的任務維持不變，只重新啟動尚未啟動或已結束的排程任務與 worker
 
         Parameters
         -----
         bot: `commands.Bot`
             Discord 機器人客戶端
         """
-        if cls._lock.locked():
-            return
-        await cls._lock.acquire()
         cls._bot = bot
-        try:
-            LOG.System("Start automatic resin checking")
-            await asyncio.gather(
-                cls._check_games_note(GenshinScheduleNotes, "Genshin Impact", check_genshin_notes),
-                cls._check_games_note(StarrailScheduleNotes, "Honkai: Star Rail", check_starrail_notes),
-                cls._check_games_note(ZZZScheduleNotes, "Zenless Zone Zero", check_zzz_notes),
-            )
-        except Exception as e:
-            sentry_sdk.capture_exception(e)
-            LOG.Error(f"Automatic schedule Real-time Notes encountered an error：{e}")
-        finally:
-            cls._lock.release()
+        if len(cls._game_tasks) == 0:
+            LOG.System(f"Start automatic resin checking with {config.schedule_notes_workers} workers")
+        for game_orm in cls._games:
+            task = cls._game_tasks.get(game_orm)
+            if task is None or task.done():
+                cls._game_tasks[game_orm] = asyncio.create_task(cls._run_games_note(game_orm))
+        cls._worker_tasks = [task for task in cls._worker_tasks if not task.done()]
+        while len(cls._worker_tasks) < config.schedule_notes_workers:
+            cls._worker_tasks.append(asyncio.create_task(cls._worker()))
+
+    @classmethod
+    def stop(cls) -> None:
+        """停止自動排程並清空佇列與排程，重新啟動後由資料庫重建排程"""
+        for task in [*cls._game_tasks.values(), *cls._worker_tasks]:
+            task.cancel()
+        cls._game_tasks = {}
+        cls._worker_tasks = []
+        while not cls._queue.empty():
+            cls._queue.get_nowait()
+            cls._queue.task_done()
+        for scheduler in cls._schedulers.values():
+            scheduler.clear()
+
+    @classmethod
+    def schedule(cls, user: T_User) -> None:
+        """新增或更新使用者在排程中的下次檢查時間，在使用者設定即時便箋提醒後呼叫"""
+        cls._schedulers[type(user)].schedule(user.discord_id, user.next_check_time)
 
     @classmethod
-    async def _check_games_note(
+    def unschedule(cls, game_orm: type[T_User], discord_id: int) -> None:
+        """將使用者從排程中移除，在使用者關閉即時便箋提醒後呼叫"""
+        cls._schedulers[game_orm].remove(discord_id)
+
+    @classmethod
+    async def _run_games_note(cls, game_orm: type[T_User]) -> None:
+        """指定遊戲的常駐排程：等待下一位使用者到期，然後將到期的使用者放入佇列
+
+        每 {config.schedule_check_resin_interval} 分鐘從資料庫重建一次排程，以同步其他途徑對資料庫的修改
+
+        Parameters
+        ----------
+        game_orm: Type[`T_User`]
+            排程檢查即時便箋的 ORM（物件關聯對映）類型
+        """
+        game_name, _ = cls._games[game_orm]
+        scheduler = cls._schedulers[game_orm]
+        last_rebuild_time = datetime.min
+        while True:
+            try:
+                now = datetime.now()
+                # 遊戲維護期間不檢查
+                if config.game_maintenance_time is not None and (
+                    config.game_maintenance_time[0] <= now < config.game_maintenance_time[1]
+                ):
+                    await asyncio.sleep(cls.MAX_WAIT_SECONDS)
+                    continue
+
+                rebuild_interval = timedelta(minutes=config.schedule_check_resin_interval)
+                if now - last_rebuild_time >= rebuild_interval:
+                    # 只載入兩個重建間隔內到期的使用者，其餘的使用者在之後的重建時載入
+                    await scheduler.rebuild(horizon=now + 2 * rebuild_interval)
+                    last_rebuild_time = now
+                    LOG.Debug(f"{game_name} real-time notes scheduler rebuilt, {len(scheduler)} people scheduled")
+
+                for user_id, check_time in scheduler.pop_due(now):
+                    # 新使用者沒有檢查時間，以放入佇列的時間作為到期時間
+                    due_time = now if check_time == datetime.min else check_time
+                    await cls._queue.put((game_orm, user_id, due_time))
+                Metrics.NOTES_QUEUE_SIZE.set(cls._queue.qsize())
+                await scheduler.wait_next_due(cls.MAX_WAIT_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
+                LOG.Error(f"Automatic schedule Real-time Notes encountered an error：{e}")
+                await asyncio.sleep(cls.MAX_WAIT_SECONDS)
+
+    @classmethod
+    async def _worker(cls) -> None:
+        """從佇列取出到期的使用者並檢查即時便箋，本任務內對 Hoyolab 的請求會經過上游的速率限制"""
+        upstream_rate_limited.set(True)
+        while True:
+            game_orm, user_id, due_time = await cls._queue.get()
+            Metrics.NOTES_QUEUE_SIZE.set(cls._queue.qsize())
+            game_name, game_check_function = cls._games[game_orm]
+            lag = (datetime.now() - due_time).total_seconds()
+            Metrics.NOTES_CHECK_LAG.labels(game_name).observe(max(lag, 0.0))
+            try:
+                await cls._check_game_note(game_orm, game_check_function, user_id)
+            except asyncio.CancelledError:
+                # 檢查到一半被取消時將使用者放回排程，避免使用者停留在檢查中而不再被檢查
+                cls._schedulers[game_orm].schedule(user_id, None)
+                raise
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
+                LOG.Error(f"Automatic schedule Real-time Notes encountered an error：{e}")
+                # 發生錯誤時仍將使用者放回排程，避免使用者從排程中遺失
+                cls._schedulers[game_orm].schedule(
+                    user_id, datetime.now() + timedelta(minutes=config.schedule_check_resin_interval)
+                )
+            finally:
+                cls._queue.task_done()
+
+    @classmethod
+    async def _check_game_note(
         cls,
         game_orm: type[T_User],
-        game_name: str,
         game_check_fucntion: Callable[[T_User], Awaitable[CheckResult | None]],
+        user_id: int,
     ) -> None:
-        """檢查指定遊戲的所有使用者的即時便箋
+        """檢查指定遊戲中一位已到期使用者的即時便箋
 
         Parameters
         ----------
         game_orm: Type[`T_User`]
             排程檢查即時便箋的 ORM（物件關聯對映）類型
-        game_name: `str`
-            遊戲名稱
         game_check_function: Callable[[`T_User`], Awaitable[`CheckResult` | `None`]]
             檢查遊戲便箋的函式
+        user_id: `int`
+            已到期的使用者 ID
 
         """
-        count = 0
-        # 選擇所有使用者 ID
-        stmt = sqlalchemy.select(game_orm.discord_id)
-        async with Database.sessionmaker() as session:
-            user_ids = (await session.execute(stmt)).scalars().all()
-        for user_id in user_ids:
-            # 取得要檢查的使用者，若檢查時間還沒到則跳過
-            user = await Database.select_one(game_orm, game_orm.discord_id.is_(user_id))
-            if user is None or user.next_check_time and datetime.now() < user.next_check_time:
-                continue
-            r = await game_check_fucntion(user)
-            if r is not None:
-                count += 1
-            # 當有錯誤訊息或是即時便箋快要額滿時，向使用者發送訊息
-            if r and len(r.message) > 0:
-                await cls._send_message(user, r.message, r.embed)
-            # 使用者之間的檢查間隔時間
-            await asyncio.sleep(config.schedule_loop_delay)
-        LOG.System(f"{game_name} automatic real-time notes check ended, {count}/{len(user_ids)} people have been checked")
+        scheduler = cls._schedulers[game_orm]
+        # 取得要檢查的使用者，排程中的時間可能已過時，因此以資料庫的檢查時間為準
+        user = await Database.select_one(game_orm, game_orm.discord_id.is_(user_id))
+        if user is None:
+            scheduler.remove(user_id)
+            return
+        if user.next_check_time and datetime.now() < user.next_check_time:
+            scheduler.schedule(user_id, user.next_check_time)
+            return
+        r = await game_check_fucntion(user)
+        # 檢查函式會更新下次檢查時間，若沒有更新則至少等待一個間隔以免重複檢查
+        next_check_time = user.next_check_time or datetime.min
+        if next_check_time <= datetime.now():
+            next_check_time = datetime.now() + timedelta(
+                minutes=config.schedule_check_resin_interval
+            )
+        scheduler.schedule(user_id, next_check_time)
+        # 當有錯誤訊息或是即時便箋快要額滿時，向使用者發送訊息
+        if r and len(r.message) > 0:
+            await cls._send_message(user, r.message, r.embed)
 
     @classmethod
     async def _send_message(cls, user: T_User, message: str, embed: discord.Embed) -> None:
-        """發送訊息提醒使用者"""
-        bot = cls._bot
-        try:
-            _id = user.discord_channel_id
-            channel = bot.get_channel(_id) or await bot.fetch_channel(_id)
-            discord_user = bot.get_user(user.discord_id) or await bot.fetch_user(user.discord_id)
-            msg_sent = await channel.send(f"{discord_user.mention}，{message}", embed=embed)  # type: ignore
-        except (
-            discord.Forbidden,
-            discord.NotFound,
-            discord.InvalidData,
-        ) as e:  # 發送訊息失敗，移除此使用者
-            LOG.Except(
-                f"Automatic check and send reminder message failed, removing user {LOG.User(user.discord_id)}: {e}"
-            )
+        """將提醒使用者的通知交給 `NotificationDispatcher`，同一頻道的通知會合併發送"""
+
+        async def remove_user() -> None:
+            # 無法發送訊息或使用者不在發送訊息的頻道，移除此使用者
             await Database.delete_instance(user)
-        except Exception as e:
-            sentry_sdk.capture_exception(e)
-        else:  # 成功發送訊息
-            # 若使用者不在發送訊息的頻道則移除
-            if discord_user.mentioned_in(msg_sent) is False:
-                LOG.Except(
-                    f"Automatic check shows the user is not in the channel, removing user {LOG.User(discord_user)}"
-                )
-                await Database.delete_instance(user)
+            cls.unschedule(type(user), user.discord_id)
+
+        notification = Notification(
+            user.discord_id,
+            user.discord_channel_id,
+            f"<@{user.discord_id}>，{message}",
+            embed=embed,
+            check_mentioned=True,
+            on_unreachable=remove_user,
+        )
+        NotificationDispatcher.enqueue(cls._bot, notification)
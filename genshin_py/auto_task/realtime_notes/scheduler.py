@@ -0,0 +1,113 @@
+import asyncio
+import heapq
+from datetime import datetime
+
+import sqlalchemy
+
+from database import Database
+
+from .common import T_User
+
+
+class DueTimeScheduler:
+    """依照使用者的下次檢查時間 (next_check_time) 排序的排程器
+
+    內部以 min-heap 保存 `(next_check_time, discord_id)`，讓自動排程只需在下一位使用者到期時才被喚醒，
+    而不用每次循環都從資料庫選出全部使用者逐一確認檢查時間。
+    heap 內過期 (已被更新或移除) 的項目採延遲刪除，以 `_due_time` 內保存的時間為準。
+    """
+
+    def __init__(self, game_orm: type[T_User]):
+        self.game_orm = game_orm
+        """排程檢查即時便箋的 ORM 類型"""
+        self._heap: list[tuple[datetime, int]] = []
+        self._due_time: dict[int, datetime] = {}
+        """每位使用者目前有效的檢查時間 dict[discord_id, next_check_time]"""
+        self._in_flight: set[int] = set()
+        """已從 heap 取出、正在檢查中的使用者"""
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._due_time) + len(self._in_flight)
+
+    async def rebuild(self, horizon: datetime) -> None:
+        """從資料庫重建 heap，只選擇檢查時間在 `horizon` 之前的使用者的 discord_id 與 next_check_time 兩個欄位，
+        檢查時間較晚的使用者會在之後的重建時載入
+
+        Parameters
+        ------
+        horizon: `datetime`
+            載入檢查時間在此時間之前的使用者，應晚於下次重建的時間
+        """
+        next_check_time = self.game_orm.next_check_time
+        # 不加 ORDER BY，讓 SQLite 以索引分別搜尋兩個條件 (MULTI-INDEX OR)，排序交給 heap
+        stmt = sqlalchemy.select(self.game_orm.discord_id, next_check_time).where(
+            sqlalchemy.or_(next_check_time.is_(None), next_check_time <= horizon)
+        )
+        async with Database.sessionmaker() as session:
+            rows = (await session.execute(stmt)).all()
+        self._due_time = {
+            discord_id: check_time or datetime.min
+            for discord_id, check_time in rows
+            if discord_id not in self._in_flight
+        }
+        self._heap = [(check_time, discord_id) for discord_id, check_time in self._due_time.items()]
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def schedule(self, discord_id: int, next_check_time: datetime | None) -> None:
+        """新增或更新使用者的下次檢查時間，`None` 表示立即檢查"""
+        check_time = next_check_time or datetime.min
+        self._in_flight.discard(discord_id)
+        self._due_time[discord_id] = check_time
+        heapq.heappush(self._heap, (check_time, discord_id))
+        # 若新的時間比目前最早的時間還早，則喚醒等待中的排程
+        if self._heap[0] == (check_time, discord_id):
+            self._wakeup.set()
+
+    def remove(self, discord_id: int) -> None:
+        """將使用者從排程中移除"""
+        self._in_flight.discard(discord_id)
+        self._due_time.pop(discord_id, None)
+
+    def clear(self) -> None:
+        """清空排程與檢查中的使用者，在停止自動排程時呼叫，重新啟動後由 `rebuild` 從資料庫載入"""
+        self._heap.clear()
+        self._due_time.clear()
+        self._in_flight.clear()
+
+    def pop_due(self, now: datetime) -> list[tuple[int, datetime]]:
+        """取出所有檢查時間已到的使用者 `(discord_id, next_check_time)`，
+        取出的使用者在重新 `schedule` 或 `remove` 之前視為檢查中"""
+        users: list[tuple[int, datetime]] = []
+        self._discard_stale()
+        while len(self._heap) > 0 and self._heap[0][0] <= now:
+            check_time, discord_id = heapq.heappop(self._heap)
+            del self._due_time[discord_id]
+            self._in_flight.add(discord_id)
+            users.append((discord_id, check_time))
+            self._discard_stale()
+        return users
+
+    async def wait_next_due(self, max_wait: float) -> None:
+        """等待到下一位使用者的檢查時間，或是有更早的使用者被加入排程，最多等待 `max_wait` 秒"""
+        self._discard_stale()
+        self._wakeup.clear()
+        if len(self._heap) > 0:
+            delay = (self._heap[0][0] - datetime.now()).total_seconds()
+            if delay <= 0:
+                return
+        else:
+            delay = max_wait
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, max_wait))
+        except asyncio.TimeoutError:
+            pass
+
+    def _discard_stale(self) -> None:
+        """移除 heap 頂端已失效的項目"""
+        while len(self._heap) > 0:
+            check_time, discord_id = self._heap[0]
+            if self._due_time.get(discord_id) == check_time:
+                break
+            heapq.heappop(self._heap)
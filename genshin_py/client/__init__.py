@@ -1,4 +1,5 @@
 from .common import *
 from .genshin import *
+from .pool import ClientPool
 from .starrail import *
-from .zzz import *
\ No newline at end of file
+from .zzz import *
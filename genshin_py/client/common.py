@@ -1,5 +1,6 @@
 import asyncio
-from typing import Mapping, Sequence
+from contextvars import ContextVar
+from typing import Final, Mapping, Sequence
 
 import genshin
 import sentry_sdk
@@ -7,45 +8,66 @@ import sentry_sdk
 import database
 from database import Database, GeetestChallenge, User
 from utility import LOG, config, get_app_command_mention
+from utility.prometheus import UpstreamTimer
+from utility.rate_limit import TokenBucket
 
 from ..errors import UserDataNotFound
 from ..errors_decorator import generalErrorHandler
+from .pool import ClientPool
 
+upstream_rate_limited: ContextVar[bool] = ContextVar("upstream_rate_limited", default=False)
+"""設為 `True` 時，`get_client` 在回傳 client 前會先向對應上游的 token bucket 取得權杖，用於自動排程"""
 
-async def get_client(
-    user_id: int,
-    *,
-    game: genshin.Game = genshin.Game.GENSHIN,
-    check_uid=True,
-) -> genshin.Client:
-    """設定並取得原神 API 的 Client
+_upstream_buckets: dict[str, TokenBucket] = {}
 
-    Parameters
-    ------
-    user_id: `int`
-        使用者 Discord ID
-    game: `genshin.Game`
-        要取得的遊戲 Client
-    check_uid: `bool`
-        是否檢查 UID
+CLAIM_REWARD_CONCURRENCY: Final[int] = 3
+"""每位使用者同時進行簽到的遊戲數量上限"""
+CLAIM_REWARD_RETRY: Final[int] = 5
+"""遊戲簽到發生未預期錯誤時的重試次數"""
+CLAIM_REWARD_BACKOFF: Final[float] = 1.0
+"""遊戲簽到第一次重試前的等待時間 (單位：秒)，之後每次重試加倍"""
+CLAIM_REWARD_MAX_BACKOFF: Final[float] = 8.0
+"""遊戲簽到重試前的最長等待時間 (單位：秒)"""
+
+
+def _get_upstream_bucket(upstream: str) -> TokenBucket:
+    """取得上游 (Hoyolab 國際服、米游社、Proxy) 的 token bucket，速率設定從 config 讀取"""
+    if upstream not in _upstream_buckets:
+        rate: float = {
+            "hoyolab_os": config.hoyolab_os_rate_limit,
+            "hoyolab_cn": config.hoyolab_cn_rate_limit,
+            "proxy": config.proxy_rate_limit,
+        }[upstream]
+        _upstream_buckets[upstream] = TokenBucket(rate)
+    return _upstream_buckets[upstream]
+
+
+async def _acquire_upstream(client: genshin.Client) -> None:
+    """依照 client 的伺服器與是否使用 proxy，向對應上游取得權杖"""
+    upstream = "hoyolab_cn" if client.region == genshin.Region.CHINESE else "hoyolab_os"
+    await _get_upstream_bucket(upstream).acquire()
+    if config.genshin_py_proxy_server is not None:
+        await _get_upstream_bucket("proxy").acquire()
 
-    Returns
-    ------
-    `genshin.Client`
-        原神 API 的 Client
-    """
-    user = await Database.select_one(User, User.discord_id.is_(user_id))
-    check, msg = await database.Tool.check_user(user, check_uid=check_uid, game=game)
-    if check is False or user is None:
-        raise UserDataNotFound(msg)
 
-    client = genshin.Client(lang="vi-vn")
+class MeasuredClient(genshin.Client):
+    """每次向 Hoyolab 或米游社請求時，將花費時間與成功與否記錄到 Prometheus 的 genshin.Client"""
+
+    async def request(self, *args, **kwargs):
+        upstream = "hoyolab_cn" if self.region == genshin.Region.CHINESE else "hoyolab_os"
+        with UpstreamTimer(upstream):
+            return await super().request(*args, **kwargs)
+
+
+def _build_client(user: User, game: genshin.Game) -> genshin.Client:
+    """依照使用者保存的 Cookie 與 UID 建立指定遊戲的 Client，伺服器由 UID 決定"""
+    client = MeasuredClient(lang="vi-vn")
     match game:
         case genshin.Game.GENSHIN:
             uid = user.uid_genshin or 0
             cookie = user.cookie_genshin or user.cookie_default
             if len(str(uid)) == 9 and str(uid)[0] in ["1", "2", "5"]:
-                client = genshin.Client(region=genshin.Region.CHINESE, lang="zh-cn")
+                client = MeasuredClient(region=genshin.Region.CHINESE, lang="zh-cn")
         case genshin.Game.HONKAI:
             uid = user.uid_honkai3rd or 0
             cookie = user.cookie_honkai3rd or user.cookie_default
@@ -53,7 +75,7 @@ async def get_client(
             uid = user.uid_starrail or 0
             cookie = user.cookie_starrail or user.cookie_default
             if str(uid)[0] in ["1", "2", "5"]:
-                client = genshin.Client(region=genshin.Region.CHINESE, lang="zh-cn")
+                client = MeasuredClient(region=genshin.Region.CHINESE, lang="zh-cn")
         case genshin.Game.ZZZ:
             uid = user.uid_zzz or 0
             cookie = user.cookie_zzz or user.cookie_default
@@ -74,6 +96,59 @@ async def get_client(
     return client
 
 
+async def get_client(
+    user_id: int,
+    *,
+    game: genshin.Game = genshin.Game.GENSHIN,
+    check_uid=True,
+) -> genshin.Client:
+    """設定並取得原神 API 的 Client
+
+    Parameters
+    ------
+    user_id: `int`
+        使用者 Discord ID
+    game: `genshin.Game`
+        要取得的遊戲 Client
+    check_uid: `bool`
+        是否檢查 UID
+
+    Returns
+    ------
+    `genshin.Client`
+        原神 API 的 Client
+    """
+    user = await _get_user(user_id)
+    return await _get_user_client(user_id, user, game=game, check_uid=check_uid)
+
+
+async def _get_user(user_id: int) -> User | None:
+    """取得使用者的資料庫資料，優先使用 `ClientPool` 內的快取"""
+    user = ClientPool.get_user(user_id)
+    if user is None:
+        user = await Database.select_one(User, User.discord_id.is_(user_id))
+        if user is not None:
+            ClientPool.put_user(user)
+    return user
+
+
+async def _get_user_client(
+    user_id: int, user: User | None, *, game: genshin.Game, check_uid: bool
+) -> genshin.Client:
+    """以已取得的使用者資料檢查使用者並取得指定遊戲的 Client，參數說明同 `get_client`"""
+    check, msg = await database.Tool.check_user(user, check_uid=check_uid, game=game)
+    if check is False or user is None:
+        raise UserDataNotFound(msg)
+
+    client = ClientPool.get_client(user_id, game)
+    if client is None:
+        client = _build_client(user, game)
+        ClientPool.put_client(user_id, game, client)
+    if upstream_rate_limited.get() is True:
+        await _acquire_upstream(client)
+    return client
+
+
 @generalErrorHandler
 async def get_game_accounts(
     user_id: int, game: genshin.Game
@@ -117,7 +192,7 @@ async def set_cookie(user_id: int, cookie: str, games: Sequence[genshin.Game]) -
     """
     LOG.Info(f"設定 {LOG.User(user_id)} 的Cookie：{cookie}")
 
-    client = genshin.Client(lang="vi-vn")
+    client = MeasuredClient(lang="vi-vn")
     client.set_cookies(cookie)
 
     # 先以國際服 client 取得帳號資訊，若失敗則嘗試使用中國服 client
@@ -170,6 +245,7 @@ async def set_cookie(user_id: int, cookie: str, games: Sequence[genshin.Game]) -
         user.cookie_themis = cookie
 
     await Database.insert_or_replace(user)
+    ClientPool.invalidate(user_id)
     LOG.Info(f"{LOG.User(user_id)} Cookie Setting Successful")
 
     result = "Cookie has been set！"
@@ -220,7 +296,9 @@ async def claim_daily_reward(
         回覆給使用者的訊息
     """
     try:
-        client = await get_client(user_id, check_uid=False)
+        # 只讀取一次使用者資料，各遊戲的 Client 都由這份資料建立
+        user = await _get_user(user_id)
+        client = await _get_user_client(user_id, user, game=genshin.Game.GENSHIN, check_uid=False)
     except Exception as e:
         return str(e)
 
@@ -247,32 +325,31 @@ async def claim_daily_reward(
             GeetestChallenge, GeetestChallenge.discord_id.is_(user_id)
         )
 
-    result = ""
+    # 各遊戲的簽到同時進行，結果依照固定的遊戲順序組合
+    # (遊戲, geetest 驗證資料, 是否設定新的 geetest 驗證)，只有原神、崩壞3、星穹鐵道使用 geetest 驗證
+    claims: list[tuple[genshin.Game, Mapping[str, str] | None, bool]] = []
     if has_genshin:
-        challenge = gt_challenge.genshin if gt_challenge else None
-        client = await get_client(user_id, game=genshin.Game.GENSHIN, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.GENSHIN, is_geetest, challenge)
+        claims.append((genshin.Game.GENSHIN, gt_challenge.genshin if gt_challenge else None, is_geetest))
     if has_honkai3rd:
-        challenge = gt_challenge.honkai3rd if gt_challenge else None
-        client = await get_client(user_id, game=genshin.Game.HONKAI, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.HONKAI, is_geetest, challenge)
+        claims.append((genshin.Game.HONKAI, gt_challenge.honkai3rd if gt_challenge else None, is_geetest))
     if has_starrail:
-        challenge = gt_challenge.starrail if gt_challenge else None
-        client = await get_client(user_id, game=genshin.Game.STARRAIL, check_uid=False)
-        result += await _claim_reward(
-            user_id, client, genshin.Game.STARRAIL, is_geetest, challenge
-        )
+        claims.append((genshin.Game.STARRAIL, gt_challenge.starrail if gt_challenge else None, is_geetest))
     if has_zzz:
-        client = await get_client(user_id, game=genshin.Game.ZZZ, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.ZZZ)
+        claims.append((genshin.Game.ZZZ, None, False))
     if has_themis:
-        client = await get_client(user_id, game=genshin.Game.THEMIS, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.THEMIS)
+        claims.append((genshin.Game.THEMIS, None, False))
     if has_themis_tw:
-        client = await get_client(user_id, game=genshin.Game.THEMIS_TW, check_uid=False)
-        result += await _claim_reward(user_id, client, genshin.Game.THEMIS_TW)
+        claims.append((genshin.Game.THEMIS_TW, None, False))
 
-    return result
+    semaphore = asyncio.Semaphore(CLAIM_REWARD_CONCURRENCY)
+
+    async def claim(game: genshin.Game, challenge: Mapping[str, str] | None, geetest: bool) -> str:
+        async with semaphore:
+            client = await _get_user_client(user_id, user, game=game, check_uid=False)
+            return await _claim_reward(user_id, client, game, geetest, challenge)
+
+    results = await asyncio.gather(*[claim(*args) for args in claims])
+    return "".join(results)
 
 
 async def _claim_reward(
@@ -281,9 +358,9 @@ async def _claim_reward(
     game: genshin.Game,
     is_geetest: bool = False,
     gt_challenge: Mapping[str, str] | None = None,
-    retry: int = 5,
+    retry: int = CLAIM_REWARD_RETRY,
 ) -> str:
-    """遊戲簽到函式"""
+    """遊戲簽到函式，發生未預期的錯誤時最多重試 `retry` 次，每次重試前等待的時間依序加倍"""
     game_name = {
         genshin.Game.GENSHIN: "Genshin Impact",
         genshin.Game.HONKAI: "Honkai Impact 3",
@@ -293,42 +370,44 @@ async def _claim_reward(
         genshin.Game.THEMIS_TW: "Tears of Themis(TW)",
     }
 
-    try:
-        reward = await client.claim_daily_reward(game=game, challenge=gt_challenge)
-    except genshin.errors.AlreadyClaimed:
-        return f"{game_name[game]}Today's reward has already been claimed.！"
-    except genshin.errors.InvalidCookies:
-        return "Cookie has expired, please get a new one from Hoyolab.。"
-    except genshin.errors.DailyGeetestTriggered as exception:
-        # 使用者選擇設定圖形驗證，回傳網址
-        if is_geetest is True and config.geetest_solver_url is not None:
-            url = config.geetest_solver_url
-            url += f"/geetest/{game}/{user_id}?gt={exception.gt}&challenge={exception.challenge}"
-            return f"Please go to the website to unlock the graphic validation: [click me to open the link].({url})\nIf an error occurs, use this command again to regenerate the link."
-        # 提示使用者可以設定圖形驗證
-        if config.geetest_solver_url is not None:
-            command_str = get_app_command_mention("daily每日簽到")
-            return f"{game_name[game]}Failed to sign in: Graphical validation is blocked. {command_str} Command to select Setup Graphic Validation "
-        link: str = {
-            genshin.Game.GENSHIN: "https://act.hoyolab.com/ys/event/signin-sea-v3/index.html?act_id=e202102251931481",
-            genshin.Game.HONKAI: "https://act.hoyolab.com/bbs/event/signin-bh3/index.html?act_id=e202110291205111",
-            genshin.Game.STARRAIL: "https://act.hoyolab.com/bbs/event/signin/hkrpg/index.html?act_id=e202303301540311",
-            genshin.Game.ZZZ: "https://act.hoyolab.com/bbs/event/signin/zzz/index.html?act_id=e202406031448091",
-        }.get(game, "")
-        return f"{game_name[game]}Failed to sign in: Graphical verification is blocked, please go to [Official Website].({link}) Getting Started。"
-    except Exception as e:
-        if isinstance(e, genshin.errors.GenshinException) and e.retcode == -10002:
-            return f"{game_name[game]}Sign-in failed, no character information was found for the currently logged-in account."
-        if isinstance(e, genshin.errors.GenshinException) and e.retcode == 50000:
-            return f"{game_name[game]}The request failed. Please try again later."
-
-        LOG.FuncExceptionLog(user_id, "claimDailyReward", e)
-        if retry > 0:
-            await asyncio.sleep(1)
-            return await _claim_reward(user_id, client, game, is_geetest, gt_challenge, retry - 1)
-
-        LOG.Error(f"{LOG.User(user_id)} {game_name[game]}Failed to sign in")
-        sentry_sdk.capture_exception(e)
-        return f"{game_name[game]}Failed to sign in：{e}。"
-    else:
-        return f"{game_name[game]} Sign in today and get {reward.amount}x {reward.name}！"
+    for attempt in range(retry + 1):
+        try:
+            reward = await client.claim_daily_reward(game=game, challenge=gt_challenge)
+        except genshin.errors.AlreadyClaimed:
+            return f"{game_name[game]}Today's reward has already been claimed.！"
+        except genshin.errors.InvalidCookies:
+            return "Cookie has expired, please get a new one from Hoyolab.。"
+        except genshin.errors.DailyGeetestTriggered as exception:
+            # 使用者選擇設定圖形驗證，回傳網址
+            if is_geetest is True and config.geetest_solver_url is not None:
+                url = config.geetest_solver_url
+                url += f"/geetest/{game}/{user_id}?gt={exception.gt}&challenge={exception.challenge}"
+                return f"Please go to the website to unlock the graphic validation: [click me to open the link].({url})\nIf an error occurs, use this command again to regenerate the link."
+            # 提示使用者可以設定圖形驗證
+            if config.geetest_solver_url is not None:
+                command_str = get_app_command_mention("daily每日簽到")
+                return f"{game_name[game]}Failed to sign in: Graphical validation is blocked. {command_str} Command to select Setup Graphic Validation "
+            link: str = {
+                genshin.Game.GENSHIN: "https://act.hoyolab.com/ys/event/signin-sea-v3/index.html?act_id=e202102251931481",
+                genshin.Game.HONKAI: "https://act.hoyolab.com/bbs/event/signin-bh3/index.html?act_id=e202110291205111",
+                genshin.Game.STARRAIL: "https://act.hoyolab.com/bbs/event/signin/hkrpg/index.html?act_id=e202303301540311",
+                genshin.Game.ZZZ: "https://act.hoyolab.com/bbs/event/signin/zzz/index.html?act_id=e202406031448091",
+            }.get(game, "")
+            return f"{game_name[game]}Failed to sign in: Graphical verification is blocked, please go to [Official Website].({link}) Getting Started。"
+        except Exception as e:
+            if isinstance(e, genshin.errors.GenshinException) and e.retcode == -10002:
+                return f"{game_name[game]}Sign-in failed, no character information was found for the currently logged-in account."
+            if isinstance(e, genshin.errors.GenshinException) and e.retcode == 50000:
+                return f"{game_name[game]}The request failed. Please try again later."
+
+            LOG.FuncExceptionLog(user_id, "claimDailyReward", e)
+            if attempt < retry:
+                await asyncio.sleep(min(CLAIM_REWARD_BACKOFF * 2**attempt, CLAIM_REWARD_MAX_BACKOFF))
+                continue
+
+            LOG.Error(f"{LOG.User(user_id)} {game_name[game]}Failed to sign in")
+            sentry_sdk.capture_exception(e)
+            return f"{game_name[game]}Failed to sign in：{e}。"
+        else:
+            return f"{game_name[game]} Sign in today and get {reward.amount}x {reward.name}！"
+    return f"{game_name[game]}Failed to sign in。"
@@ -6,7 +6,7 @@ import genshin
 from database import GenshinSpiralAbyss
 
 from ..errors_decorator import generalErrorHandler
-from .common import get_client
+from .common import MeasuredClient, get_client
 
 
 @generalErrorHandler
@@ -126,6 +126,6 @@ async def get_genshin_notices() -> Sequence[genshin.models.Announcement]:
     `Sequence[Announcement]`
         公告事項查詢結果
     """
-    client = genshin.Client(lang="vi-vn")
+    client = MeasuredClient(lang="vi-vn")
     notices = await client.get_genshin_announcements()
     return notices
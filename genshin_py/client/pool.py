@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import ClassVar, Final, NamedTuple
+
+import genshin
+
+from database import User
+
+
+class _PoolEntry(NamedTuple):
+    expire_time: float
+    """此快取的過期時間 (time.monotonic)"""
+    user: User
+    """使用者的資料庫資料"""
+    clients: dict[genshin.Game, genshin.Client]
+    """已建立的各遊戲 Client"""
+
+
+class ClientPool:
+    """genshin.py Client 的快取池
+
+    以使用者 Discord ID 為單位，保存使用者的資料庫資料與已建立的各遊戲 Client
+    (Client 的伺服器由該遊戲的 UID 決定，因此等同以 (discord_id, game, region) 為 key)，
+    讓同一位使用者在短時間內重複呼叫 `get_client` 時，不需要再次讀取資料庫與建立新的 Client。
+    超過 `TTL` 秒的快取會失效，快取的使用者數量超過 `MAX_USERS` 時移除最久未使用的使用者 (LRU)。
+    任何修改或刪除 `User` 資料的途徑都需要清除快取：Cookie、UID 變更或刪除單一使用者時呼叫 `invalidate`，
+    以條件一次刪除多位使用者 (例：刪除過期使用者) 時呼叫 `clear`。
+    只更新 `last_used_time` 的寫入 (`LastUsedTimeBuffer`) 不影響 Client，不需要清除。
+    """
+
+    MAX_USERS: Final[int] = 1000
+    """快取的最大使用者數量"""
+    TTL: Final[float] = 600.0
+    """快取的有效時間 (單位：秒)"""
+
+    _entries: ClassVar[OrderedDict[int, _PoolEntry]] = OrderedDict()
+
+    @classmethod
+    def get_user(cls, discord_id: int) -> User | None:
+        """取得快取中的使用者資料，若不存在或已過期則回傳 `None`"""
+        entry = cls._entries.get(discord_id)
+        if entry is None:
+            return None
+        if entry.expire_time < time.monotonic():
+            del cls._entries[discord_id]
+            return None
+        cls._entries.move_to_end(discord_id)
+        return entry.user
+
+    @classmethod
+    def get_client(cls, discord_id: int, game: genshin.Game) -> genshin.Client | None:
+        """取得快取中使用者指定遊戲的 Client，呼叫前需先以 `get_user` 確認快取有效"""
+        entry = cls._entries.get(discord_id)
+        return entry.clients.get(game) if entry is not None else None
+
+    @classmethod
+    def put_user(cls, user: User) -> None:
+        """將使用者資料放入快取，會清除此使用者先前已建立的 Client"""
+        cls._entries[user.discord_id] = _PoolEntry(time.monotonic() + cls.TTL, user, {})
+        cls._entries.move_to_end(user.discord_id)
+        while len(cls._entries) > cls.MAX_USERS:
+            cls._entries.popitem(last=False)
+
+    @classmethod
+    def put_client(cls, discord_id: int, game: genshin.Game, client: genshin.Client) -> None:
+        """將使用者指定遊戲的 Client 放入快取，使用者資料需已存在快取中"""
+        entry = cls._entries.get(discord_id)
+        if entry is not None:
+            entry.clients[game] = client
+
+    @classmethod
+    def invalidate(cls, discord_id: int) -> None:
+        """清除使用者的快取，在使用者的 Cookie、UID 變更或刪除資料後呼叫"""
+        cls._entries.pop(discord_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """清除所有使用者的快取，在以條件一次修改或刪除多位使用者的資料後呼叫"""
+        cls._entries.clear()
@@ -1,12 +1,11 @@
 import asyncio
-import datetime
 from typing import Callable
 
 import aiohttp
 import genshin
 import sentry_sdk
 
-from database import Database, User
+from database import LastUsedTimeBuffer
 from utility import LOG, config
 
 from .errors import GenshinAPIException, UserDataNotFound
@@ -29,11 +28,9 @@ def generalErrorHandler(func: Callable):
                 try:
                     result = await func(*args, **kwargs)
 
-                    # 成功使用指令則更新使用者的最後使用時間
-                    user = await Database.select_one(User, User.discord_id.is_(user_id))
-                    if user is not None:
-                        user.last_used_time = datetime.datetime.now()
-                        await Database.insert_or_replace(user)
+                    # 成功使用指令則更新使用者的最後使用時間 (由緩衝區定期批次寫入資料庫)
+                    if user_id != -1:
+                        LastUsedTimeBuffer.touch(user_id)
 
                     return result
                 except (genshin.errors.InternalDatabaseError, aiohttp.ClientOSError) as e:
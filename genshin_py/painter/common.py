@@ -1,5 +1,41 @@
+from functools import lru_cache
+
 from PIL import Image, ImageDraw, ImageFont
 
+from utility.render_executor import RenderExecutor
+
+PRELOAD_FONTS: tuple[tuple[str, int], ...] = (
+    ("SourceHanSerifTC-Bold.otf", 88),
+    ("SourceHanSansTC-Medium.otf", 40),
+    ("SourceHanSansTC-Bold.otf", 36),
+    ("SourceHanSansTC-Bold.otf", 38),
+    ("SourceHanSansTC-Bold.otf", 80),
+    ("SourceHanSansTC-Bold.otf", 82),
+    ("SourceHanSansTC-Bold.otf", 85),
+    ("SourceHanSansTC-Regular.otf", 24),
+    ("SourceHanSansTC-Regular.otf", 28),
+    ("SourceHanSansTC-Regular.otf", 30),
+    ("SourceHanSansTC-Regular.otf", 32),
+    ("SourceHanSansTC-Regular.otf", 40),
+    ("SourceHanSansTC-Regular.otf", 45),
+)
+"""各卡片會用到的 (字型檔名, 字體大小)，在繪圖程序啟動時預先載入"""
+
+
+@lru_cache(maxsize=None)
+def get_font(font_name: str, size: int) -> ImageFont.FreeTypeFont:
+    """取得字型物件，相同 (字型檔名, 字體大小) 的字型只會從檔案載入一次"""
+    return ImageFont.truetype(f"data/font/{font_name}", size)
+
+
+def preload_fonts() -> None:
+    """預先載入 `PRELOAD_FONTS` 內的字型"""
+    for font_name, size in PRELOAD_FONTS:
+        get_font(font_name, size)
+
+
+RenderExecutor.register_initializer(preload_fonts)
+
 
 def draw_avatar(img: Image.Image, avatar: Image.Image, pos: tuple[int, int]):
     """以圓形畫個人頭像"""
@@ -10,7 +46,7 @@ def draw_avatar(img: Image.Image, avatar: Image.Image, pos: tuple[int, int]):
 
 
 def draw_text(
-    img: Image.Image,
+    draw: ImageDraw.ImageDraw,
     pos: tuple[float, float],
     text: str,
     font_name: str,
@@ -18,7 +54,5 @@ def draw_text(
     fill,
     anchor=None,
 ):
-    """在圖片上印文字"""
-    draw = ImageDraw.Draw(img)
-    font = ImageFont.truetype(f"data/font/{font_name}", size)  # type: ignore
-    draw.text(pos, text, fill, font, anchor=anchor)
+    """在圖片上印文字，同一張圖片應共用同一個 `ImageDraw`"""
+    draw.text(pos, text, fill, get_font(font_name, size), anchor=anchor)
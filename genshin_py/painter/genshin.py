@@ -1,3 +1,4 @@
+import asyncio
 import random
 from io import BytesIO
 from pathlib import Path
@@ -10,6 +11,8 @@ from PIL import Image, ImageDraw
 
 from database.dataclass import spiral_abyss
 from utility import get_server_name
+from utility.prometheus import upstream_trace_config
+from utility.render_executor import RenderExecutor
 
 from .common import draw_avatar, draw_text
 
@@ -26,7 +29,8 @@ def draw_rounded_rect(img: Image.Image, pos: tuple[float, float, float, float],
 
 def draw_basic_card(
     avatar_bytes: bytes, uid: int, user_stats: genshin.models.PartialGenshinUserStats
-) -> Image.Image:
+) -> tuple[Image.Image, ImageDraw.ImageDraw]:
+    """畫紀錄卡片的背景、頭像與基本資料，回傳圖片與之後繼續在此圖片上印文字用的 `ImageDraw`"""
     img: Image.Image = Image.open(f"data/image/record_card/{random.randint(1, 12)}.jpg")
     img = img.convert("RGBA")
 
@@ -36,10 +40,11 @@ def draw_basic_card(
     draw_rounded_rect(img, (340, 130, 990, 320), radius=30, fill=(0, 0, 0, 120))
     draw_rounded_rect(img, (90, 380, 990, 1810), radius=30, fill=(0, 0, 0, 120))
 
+    draw = ImageDraw.Draw(img)
     info = user_stats.info
-    draw_text(img, (665, 195), info.nickname, "SourceHanSerifTC-Bold.otf", 88, (255, 255, 255, 255), "mm")
+    draw_text(draw, (665, 195), info.nickname, "SourceHanSerifTC-Bold.otf", 88, (255, 255, 255, 255), "mm")
     draw_text(
-        img,
+        draw,
         (665, 275),
         f"{get_server_name(info.server)}  Lv.{info.level}  UID:{uid}",
         "SourceHanSansTC-Medium.otf",
@@ -48,7 +53,7 @@ def draw_basic_card(
         "mm",
     )
 
-    return img
+    return img, draw
 
 
 def draw_record_card(
@@ -65,7 +70,7 @@ def draw_record_card(
     Returns
     `BytesIO`: 製作完成的圖片存在記憶體，回傳file pointer，存取前需要先`seek(0)`
     """
-    img = draw_basic_card(avatar_bytes, uid, user_stats)
+    img, draw = draw_basic_card(avatar_bytes, uid, user_stats)
 
     white = (255, 255, 255, 255)
     grey = (230, 230, 230, 255)
@@ -95,7 +100,7 @@ def draw_record_card(
         column = int(n % 3)
         row = int(n / 3)
         draw_text(
-            img,
+            draw,
             (245 + column * 295, 500 + row * 210),
             str(stat[0]),
             "SourceHanSansTC-Bold.otf",
@@ -104,7 +109,7 @@ def draw_record_card(
             "mm",
         )
         draw_text(
-            img,
+            draw,
             (245 + column * 295, 570 + row * 210),
             str(stat[1]),
             "SourceHanSansTC-Regular.otf",
@@ -133,7 +138,7 @@ def draw_exploration_card(
     Returns
     `BytesIO`: 製作完成的圖片存在記憶體，回傳file pointer，存取前需要先`seek(0)`
     """
-    img = draw_basic_card(avatar_bytes, uid, user_stats)
+    img, draw = draw_basic_card(avatar_bytes, uid, user_stats)
 
     white = (255, 255, 255, 255)
     grey = (230, 230, 230, 255)
@@ -183,7 +188,7 @@ def draw_exploration_card(
         column = int(n % 3)
         row = int(n / 3)
         draw_text(
-            img,
+            draw,
             (245 + column * 295, 430 + row * 200),
             stat[0],
             "SourceHanSansTC-Regular.otf",
@@ -192,7 +197,7 @@ def draw_exploration_card(
             "mm",
         )
         draw_text(
-            img,
+            draw,
             (245 + column * 295, 483 + row * 200),
             f"{stat[1]:g}",
             "SourceHanSansTC-Bold.otf",
@@ -201,7 +206,7 @@ def draw_exploration_card(
             "mm",
         )
         draw_text(
-            img,
+            draw,
             (245 + column * 295, 550 + row * 200),
             stat[2],
             "SourceHanSansTC-Regular.otf",
@@ -216,13 +221,41 @@ def draw_exploration_card(
     return fp
 
 
-async def draw_character(
+async def download_character_icon(character: genshin.models.AbyssCharacter) -> None:
+    """若本地沒有角色頭像圖檔則從URL下載，在繪圖前呼叫，讓繪圖時不需要網路"""
+    avatar_file = Path(f"data/image/character/{character.id}.png")
+    if avatar_file.exists() is True:
+        return
+    avatar_img: bytes | None = None
+    async with aiohttp.ClientSession(trace_configs=[upstream_trace_config("assets")]) as session:
+        # 嘗試從 Enkanetwork CDN 取得圖片
+        try:
+            enka_cdn = enkanetwork.Assets.character(character.id).images.icon.url  # type: ignore
+        except Exception:
+            pass
+        else:
+            async with session.get(enka_cdn) as resp:
+                if resp.status == 200:
+                    avatar_img = await resp.read()
+        # 當從 Enkanetwork CDN 取得圖片失敗時改用 Ambr
+        if avatar_img is None:
+            icon_name = character.icon.split("/")[-1]  # UI_AvatarIcon_XXXX.png
+            ambr_url = "https://api.ambr.top/assets/UI/" + icon_name
+            async with session.get(ambr_url) as resp:
+                if resp.status == 200:
+                    avatar_img = await resp.read()
+    if avatar_img is not None:
+        with open(avatar_file, "wb") as fp:
+            fp.write(avatar_img)
+
+
+def draw_character(
     img: Image.Image,
     character: genshin.models.AbyssCharacter,
     size: tuple[int, int],
     pos: tuple[int, int],
 ):
-    """畫角色頭像，包含背景框
+    """畫角色頭像，包含背景框，本地沒有角色頭像圖檔時不畫
 
     ------
     Parameters
@@ -230,37 +263,14 @@ async def draw_character(
     size `Tuple[int, int]`: 背景框大小
     pos `Tuple[int, int]`: 要畫的左上角位置
     """
+    avatar_file = Path(f"data/image/character/{character.id}.png")
+    if avatar_file.exists() is False:
+        return
     background = (
         Image.open(f"data/image/character/char_{character.rarity}star_bg.png")
         .convert("RGBA")
         .resize(size)
     )
-    avatar_file = Path(f"data/image/character/{character.id}.png")
-    # 若本地沒有圖檔則從URL下載
-    if avatar_file.exists() is False:
-        avatar_img: bytes | None = None
-        async with aiohttp.ClientSession() as session:
-            # 嘗試從 Enkanetwork CDN 取得圖片
-            try:
-                enka_cdn = enkanetwork.Assets.character(character.id).images.icon.url  # type: ignore
-            except Exception:
-                pass
-            else:
-                async with session.get(enka_cdn) as resp:
-                    if resp.status == 200:
-                        avatar_img = await resp.read()
-            # 當從 Enkanetwork CDN 取得圖片失敗時改用 Ambr
-            if avatar_img is None:
-                icon_name = character.icon.split("/")[-1]  # UI_AvatarIcon_XXXX.png
-                ambr_url = "https://api.ambr.top/assets/UI/" + icon_name
-                async with session.get(ambr_url) as resp:
-                    if resp.status == 200:
-                        avatar_img = await resp.read()
-        if avatar_img is None:
-            return
-        else:
-            with open(avatar_file, "wb") as fp:
-                fp.write(avatar_img)
     avatar = Image.open(avatar_file).convert("RGBA").resize((size[0], size[0]))
     img.paste(background, pos, background)
     img.paste(avatar, pos, avatar)
@@ -298,14 +308,30 @@ async def draw_abyss_card(
     Returns
     `BytesIO`: 製作完成的圖片存在記憶體，回傳file pointer，存取前需要先`seek(0)`
     """
+    abyss_characters = {
+        character.id: character
+        for chamber in abyss_floor.chambers
+        for battle in chamber.battles
+        for character in battle.characters
+    }
+    await asyncio.gather(*[download_character_icon(c) for c in abyss_characters.values()])
+    return await RenderExecutor.run(render_abyss_card, abyss_floor, characters)
+
+
+def render_abyss_card(
+    abyss_floor: genshin.models.Floor,
+    characters: Sequence[spiral_abyss.CharacterData] | None = None,
+) -> BytesIO:
+    """`draw_abyss_card` 的同步繪圖部分，在繪圖執行器中執行"""
     img = Image.open("data/image/spiral_abyss/background_blur.jpg")
     img = img.convert("RGBA")
+    draw = ImageDraw.Draw(img)
 
     character_size = (172, 210)
     character_pad = 8
     # 顯示第幾層深淵
     draw_text(
-        img,
+        draw,
         (1050, 145),
         f"{abyss_floor.floor}",
         "SourceHanSansTC-Bold.otf",
@@ -331,7 +357,7 @@ async def draw_abyss_card(
             for k, character in enumerate(battle.characters):
                 x = left_upper[0] + k * (character_size[0] + 2 * character_pad)
                 y = left_upper[1]
-                await draw_character(img, character, (172, 210), (x, y))
+                draw_character(img, character, (172, 210), (x, y))
                 if characters is not None:
                     constellation = next(
                         (c.constellation for c in characters if c.id == character.id), 0
@@ -340,7 +366,7 @@ async def draw_abyss_card(
                 else:
                     text = f"Level {character.level}"
                 draw_text(
-                    img,
+                    draw,
                     (x + character_size[0] / 2, y + character_size[1] * 0.90),
                     text,
                     "SourceHanSansTC-Regular.otf",
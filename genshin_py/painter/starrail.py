@@ -1,32 +1,44 @@
+import asyncio
 from io import BytesIO
 from pathlib import Path
 
 import aiohttp
 import genshin
-from PIL import Image
+from PIL import Image, ImageDraw
+
+from utility.prometheus import upstream_trace_config
+from utility.render_executor import RenderExecutor
 
 from .common import draw_avatar, draw_text
 
 __all__ = ["draw_starrail_forgottenhall_card"]
 
+MAX_FLOOR_NUM = 3
+"""卡片最多繪製的樓層數量"""
 
-async def draw_character(character: genshin.models.FloorCharacter) -> Image.Image:
-    """畫角色頭像，包含背景框"""
-    background = Image.open(f"data/image/character/hsr_{character.rarity}star_bg.png").convert(
-        "RGBA"
-    )
+
+async def download_character_icon(character: genshin.models.FloorCharacter) -> None:
+    """若本地沒有角色頭像圖檔則從URL下載，在繪圖前呼叫，讓繪圖時不需要網路"""
     avatar_file = Path(f"data/image/character/{character.id}.png")
     # Download avatar if not exists
     if avatar_file.exists() is False:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[upstream_trace_config("assets")]) as session:
             async with session.get(character.icon) as response:
                 if response.status == 200:
                     avatar_file.write_bytes(await response.read())
 
+
+def draw_character(character: genshin.models.FloorCharacter) -> Image.Image:
+    """畫角色頭像，包含背景框"""
+    background = Image.open(f"data/image/character/hsr_{character.rarity}star_bg.png").convert(
+        "RGBA"
+    )
+    avatar_file = Path(f"data/image/character/{character.id}.png")
     avatar = Image.open(avatar_file).convert("RGBA")
     background.paste(avatar, (0, -8), avatar)
+    draw = ImageDraw.Draw(background)
     draw_text(
-        background,
+        draw,
         (background.width / 2, 193),
         f"E{character.rank} Level {character.level}",
         "SourceHanSansTC-Regular.otf",
@@ -37,17 +49,18 @@ async def draw_character(character: genshin.models.FloorCharacter) -> Image.Imag
     return background
 
 
-async def draw_floor(
+def draw_floor(
     floor: genshin.models.StarRailFloor | genshin.models.FictionFloor,
 ) -> Image.Image:
     """畫忘卻之庭、虛構敘事樓層"""
     # Create a transparent image
     img = Image.new("RGBA", (1714, 270), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
 
     # Draw floor title
-    draw_text(img, (0, 5), f"{floor.name}", "SourceHanSansTC-Bold.otf", 36, (200, 200, 200), "lt")
+    draw_text(draw, (0, 5), f"{floor.name}", "SourceHanSansTC-Bold.otf", 36, (200, 200, 200), "lt")
     draw_text(
-        img,
+        draw,
         (img.width, 5),
         f"Round Used: {floor.round_num}",
         "SourceHanSansTC-Regular.otf",
@@ -58,7 +71,7 @@ async def draw_floor(
     # 虛構敘事多了上下半分數
     if isinstance(floor, genshin.models.FictionFloor):
         draw_text(
-            img,
+            draw,
             (1000, 5),
             f"Total Score: {floor.score} ({floor.node_1.score} + {floor.node_2.score})",
             "SourceHanSansTC-Regular.otf",
@@ -73,13 +86,13 @@ async def draw_floor(
     character_num = len(floor.node_1.avatars)
     x = int(357 - character_num / 2 * character_width - (character_num - 1) * pad)
     for i, character in enumerate(floor.node_1.avatars):
-        character_img = await draw_character(character)
+        character_img = draw_character(character)
         img.paste(character_img, (x + (character_img.width + 2 * pad) * i, 60), character_img)
 
     character_num = len(floor.node_2.avatars)
     x = int(1357 - character_num / 2 * character_width - (character_num - 1) * pad)
     for i, character in enumerate(floor.node_2.avatars):
-        character_img = await draw_character(character)
+        character_img = draw_character(character)
         img.paste(character_img, (x + (character_img.width + 2 * pad) * i, 60), character_img)
 
     # Draw star
@@ -101,8 +114,26 @@ async def draw_starrail_forgottenhall_card(
     floors: list[genshin.models.StarRailFloor] | list[genshin.models.FictionFloor],
 ) -> BytesIO:
     """畫忘卻之庭、虛構敘事卡片"""
-    MAX_FLOOR_NUM = 3
     floors = floors[:MAX_FLOOR_NUM]
+    floor_characters = {
+        character.id: character
+        for floor in floors
+        for character in [*floor.node_1.avatars, *floor.node_2.avatars]
+    }
+    await asyncio.gather(*[download_character_icon(c) for c in floor_characters.values()])
+    return await RenderExecutor.run(
+        render_starrail_forgottenhall_card, avatar_bytes, nickname, uid, hall, floors
+    )
+
+
+def render_starrail_forgottenhall_card(
+    avatar_bytes: bytes,
+    nickname: str,
+    uid: int,
+    hall: genshin.models.StarRailChallenge | genshin.models.StarRailPureFiction,
+    floors: list[genshin.models.StarRailFloor] | list[genshin.models.FictionFloor],
+) -> BytesIO:
+    """`draw_starrail_forgottenhall_card` 的同步繪圖部分，在繪圖執行器中執行"""
 
     if isinstance(hall, genshin.models.StarRailChallenge):
         background_img_path = "data/image/forgotten_hall/bg.png"
@@ -115,9 +146,10 @@ async def draw_starrail_forgottenhall_card(
 
     avatar: Image.Image = Image.open(BytesIO(avatar_bytes)).resize((160, 160), Image.LANCZOS)
     draw_avatar(img, avatar, (230, 55))
+    draw = ImageDraw.Draw(img)
 
     draw_text(
-        img,
+        draw,
         (img.width / 2, 80),
         f"{nickname} {title}",
         "SourceHanSansTC-Bold.otf",
@@ -126,7 +158,7 @@ async def draw_starrail_forgottenhall_card(
         "mm",
     )
     draw_text(
-        img,
+        draw,
         (img.width / 2, 140),
         f"{hall.begin_time.datetime.strftime('%Y.%m.%d')} ~ {hall.end_time.datetime.strftime('%Y.%m.%d')}",
         "SourceHanSansTC-Regular.otf",
@@ -135,7 +167,7 @@ async def draw_starrail_forgottenhall_card(
         "mm",
     )
     draw_text(
-        img,
+        draw,
         (img.width / 2, 190),
         f"Progress: {hall.max_floor}　Total Battles: {hall.total_battles}",
         "SourceHanSansTC-Regular.otf",
@@ -144,7 +176,7 @@ async def draw_starrail_forgottenhall_card(
         "mm",
     )
     draw_text(
-        img,
+        draw,
         (img.width - 220, 140),
         f"★：{hall.total_stars}",
         "SourceHanSansTC-Bold.otf",
@@ -153,7 +185,7 @@ async def draw_starrail_forgottenhall_card(
         "rm",
     )
     draw_text(
-        img,
+        draw,
         (img.width - 220, 190),
         f"UID：{uid}",
         "SourceHanSansTC-Regular.otf",
@@ -165,7 +197,7 @@ async def draw_starrail_forgottenhall_card(
     # Draw all floors
     floor_img_height = 0
     for i, floor in enumerate(floors):
-        floor_img = await draw_floor(floor)
+        floor_img = draw_floor(floor)
         w = floor_img.width
         h = floor_img.height
         floor_img = floor_img.resize((int(w * 0.85), int(h * 0.85)), Image.LANCZOS)
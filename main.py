@@ -10,6 +10,11 @@ from discord.ext import commands
 
 import database
 from utility import LOG, config, sentry_logging
+from utility.app_command_sync import AppCommandSync
+from utility.loop_monitor import SlowCallbackMonitor
+from utility.prometheus import upstream_trace_config
+from utility.render_executor import RenderExecutor
+from utility.startup import StartupTimer, WarmUp
 
 intents = discord.Intents.default()
 argparser = argparse.ArgumentParser()
@@ -18,6 +23,7 @@ argparser = argparse.ArgumentParser()
 class GenshinDiscordBot(commands.AutoShardedBot):
     def __init__(self):
         self.db = database.Database
+        self.startup_timer: StartupTimer | None = StartupTimer()
         super().__init__(
             command_prefix=commands.when_mentioned_or("$"),
             intents=intents,
@@ -26,46 +32,66 @@ class GenshinDiscordBot(commands.AutoShardedBot):
                 guild=True, dm_channel=True, private_channel=True
             ),
             allowed_installs=discord.app_commands.AppInstallationType(guild=True, user=True),
+            http_trace=upstream_trace_config("discord"),
         )
 
     async def setup_hook(self) -> None:
-        # 載入 jishaku
-        await self.load_extension("jishaku")
+        timer = self.startup_timer or StartupTimer()
 
-        # 初始化資料庫
-        await database.Database.init()
-
-        # 初始化 genshin api 角色名字
-        await genshin.utility.update_characters_enka(["vi-vn"])
-
-        # 從 cogs 資料夾載入所有 cog
-        for filepath in Path("./cogs").glob("**/*cog.py"):
-            parts = list(filepath.parts)
-            parts[-1] = filepath.stem
-            await self.load_extension(".".join(parts))
-
-        # 從 cogs_external 資料夾載入所有 cog
-        for filepath in Path("./cogs_external").glob("**/*.py"):
-            cog_name = Path(filepath).stem
-            await self.load_extension(f"cogs_external.{cog_name}")
+        # 偵測阻塞 event loop 過久的程式碼 (可選)
+        if config.slow_callback_threshold:
+            SlowCallbackMonitor.start(config.slow_callback_threshold)
 
-        # 同步 Slash commands
-        if config.test_server_id is not None:
-            test_guild = discord.Object(id=config.test_server_id)
-            self.tree.copy_global_to(guild=test_guild)
-            await self.tree.sync(guild=test_guild)
-        await self.tree.sync()
+        # 初始化資料庫
+        with timer.phase("database"):
+            await database.Database.init()
+
+        # 在背景初始化 genshin api 角色名字
+        WarmUp.start("genshin_characters", lambda: genshin.utility.update_characters_enka(["vi-vn"]))
+
+        # 同時載入 jishaku、cogs 資料夾與 cogs_external 資料夾內的所有 cog (需要網路的暖機工作在各 cog 內以背景執行)
+        with timer.phase("cogs"):
+            extensions = ["jishaku"]
+            for filepath in Path("./cogs").glob("**/*cog.py"):
+                parts = list(filepath.parts)
+                parts[-1] = filepath.stem
+                extensions.append(".".join(parts))
+            for filepath in Path("./cogs_external").glob("**/*.py"):
+                extensions.append(f"cogs_external.{Path(filepath).stem}")
+            await asyncio.gather(*[self.load_extension(extension) for extension in extensions])
+
+        # 啟動繪圖執行器 (各 cog 載入繪圖模組時已註冊預先載入字型等初始化函式)
+        with timer.phase("render_executor"):
+            RenderExecutor.start()
+
+        # 同步 Slash commands，指令沒有變動時略過
+        with timer.phase("sync_commands"):
+            if config.test_server_id is not None:
+                test_guild = discord.Object(id=config.test_server_id)
+                self.tree.copy_global_to(guild=test_guild)
+                await AppCommandSync.sync(self.tree, guild=test_guild)
+            await AppCommandSync.sync(self.tree)
 
         # 啟動 Prometheus Server
         if config.prometheus_server_port is not None:
             prometheus_client.start_http_server(config.prometheus_server_port)
             LOG.System(f"prometheus server: started on port {config.prometheus_server_port}")
 
+        timer.log()
+
     async def on_ready(self):
         LOG.System(f"on_ready: You have logged in as {self.user}")
         LOG.System(f"on_ready: Total {len(self.guilds)} servers connected")
+        if self.startup_timer is not None:
+            LOG.System(f"on_ready: {self.startup_timer.elapsed():.2f}s from start to ready for commands")
+            self.startup_timer = None
 
     async def close(self) -> None:
+        # 寫入緩衝區內尚未寫入的使用者最後使用時間
+        await database.LastUsedTimeBuffer.close()
+        SlowCallbackMonitor.stop()
+        # 關閉繪圖執行器
+        RenderExecutor.shutdown()
         # 關閉資料庫
         await database.Database.close()
         LOG.System("on_close: Database closed")
@@ -79,24 +105,25 @@ class GenshinDiscordBot(commands.AutoShardedBot):
         LOG.ErrorLog(ctx, error)
 
 
-argparser.add_argument("--migrate_database", action="store_true")
-args = argparser.parse_args()
-
-if args.migrate_database:
-    asyncio.run(database.migration.migrate())
-    exit()
-
-sentry_sdk.init(dsn=config.sentry_sdk_dsn, integrations=[sentry_logging], traces_sample_rate=1.0)
-
-client = GenshinDiscordBot()
-
-
-@client.tree.error
-async def on_error(
+async def on_tree_error(
     interaction: discord.Interaction, error: discord.app_commands.AppCommandError
 ) -> None:
     LOG.ErrorLog(interaction, error)
     sentry_sdk.capture_exception(error)
 
 
-client.run(config.bot_token)
+# 繪圖執行器以 spawn 建立子程序時會重新載入本檔案，因此啟動機器人的程式碼只在主程序執行
+if __name__ == "__main__":
+    argparser.add_argument("--migrate_database", action="store_true")
+    args = argparser.parse_args()
+
+    if args.migrate_database:
+        asyncio.run(database.migration.migrate())
+        exit()
+
+    sentry_sdk.init(dsn=config.sentry_sdk_dsn, integrations=[sentry_logging], traces_sample_rate=1.0)
+
+    client = GenshinDiscordBot()
+    client.tree.error(on_tree_error)
+    # 不使用 discord.py 預設的 log handler，讓所有 log 都經過 root logger 的佇列
+    client.run(config.bot_token, log_handler=None)
@@ -0,0 +1,63 @@
+"""字型快取與共用 ImageDraw 的效能測試
+
+以紀錄卡片的文字繪製量 (每張卡片 34 次 `draw_text`，字型與大小輪流使用 `PRELOAD_FONTS`) 比較調整前後每張卡片的繪製時間：
+- 調整前：每次繪製文字都建立新的 `ImageDraw` 並以 `ImageFont.truetype` 從檔案載入字型
+- 調整後：同一張圖片共用一個 `ImageDraw`，字型由 `get_font` 快取
+
+在專案根目錄執行：`python -m scripts.benchmark_fonts [--cards 20]`
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from PIL import Image, ImageDraw, ImageFont
+
+from genshin_py.painter.common import PRELOAD_FONTS, draw_text, get_font
+
+TEXTS_PER_CARD = 34
+"""每張紀錄卡片繪製文字的次數"""
+FILL = (255, 255, 255, 255)
+
+
+def draw_card_before(img: Image.Image) -> None:
+    """調整前的 `draw_text`：每次都建立 `ImageDraw` 並從檔案載入字型"""
+    for i in range(TEXTS_PER_CARD):
+        font_name, size = PRELOAD_FONTS[i % len(PRELOAD_FONTS)]
+        draw = ImageDraw.Draw(img)
+        font = ImageFont.truetype(f"data/font/{font_name}", size)
+        draw.text((100, 30 * i), f"Text {i} 文字", FILL, font)
+
+
+def draw_card_after(img: Image.Image) -> None:
+    """調整後的 `draw_text`：共用一個 `ImageDraw`，字型從快取取得"""
+    draw = ImageDraw.Draw(img)
+    for i in range(TEXTS_PER_CARD):
+        font_name, size = PRELOAD_FONTS[i % len(PRELOAD_FONTS)]
+        draw_text(draw, (100, 30 * i), f"Text {i} 文字", font_name, size, FILL)
+
+
+def measure(draw_card: Callable[[Image.Image], None], cards: int) -> float:
+    """回傳每張卡片平均的繪製時間 (單位：毫秒)"""
+    start = time.perf_counter()
+    for _ in range(cards):
+        draw_card(Image.new("RGBA", (1800, 1100)))
+    return (time.perf_counter() - start) / cards * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=20, help="每種方式繪製的卡片數量")
+    args = parser.parse_args()
+
+    get_font.cache_clear()
+    before = measure(draw_card_before, args.cards)
+    # 繪圖程序啟動時就會預先載入字型，因此調整後的測試不計入第一次載入字型的時間
+    draw_card_after(Image.new("RGBA", (1800, 1100)))
+    after = measure(draw_card_after, args.cards)
+    print(f"調整前：{before:.2f} ms/張")
+    print(f"調整後：{after:.2f} ms/張 ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
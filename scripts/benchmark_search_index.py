@@ -0,0 +1,104 @@
+"""data_search 自動完成搜尋索引的效能測試
+
+以 genshin-db 快照中的全部成就名稱建立 `SearchIndex`，從名稱中隨機取出長度 1 ~ 6 的片段
+(另加入一些不存在的關鍵字) 作為 `--queries` 個查詢，比較調整前後每次查詢的延遲分布：
+- 調整前：每次查詢掃描全部名稱，以 `in` 確認是否包含關鍵字，等同原本的自動完成
+- 調整後：`SearchIndex.search`，只確認 n-gram 交集內的名稱
+兩種方式的結果以相同的規則排序後必須完全相同，否則以結束碼 1 結束。
+
+快照不存在時會先從 genshin-db api 取得資料並保存快照。
+
+在專案根目錄執行：`python -m scripts.benchmark_search_index [--queries 5000]`
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from typing import Callable
+
+from genshin_db import GenshinDbSnapshot
+from genshin_db.search_index import SearchIndex
+
+LIMIT = 25
+"""自動完成最多回傳的選項數量"""
+
+
+def brute_force(names: list[str], query: str) -> list[str]:
+    """調整前的搜尋：掃描全部名稱，再以與 `SearchIndex` 相同的規則排序"""
+    query = query.casefold()
+    matches = [(pos, len(name), name) for name in names if (pos := name.casefold().find(query)) >= 0]
+    matches.sort()
+    return [name for _, _, name in matches[:LIMIT]]
+
+
+def make_queries(names: list[str], count: int) -> list[str]:
+    """從名稱中隨機取出片段作為查詢，約十分之一為不存在的關鍵字"""
+    queries: list[str] = []
+    for _ in range(count):
+        if random.random() < 0.1:
+            queries.append(f"不存在的成就{random.randrange(1000)}")
+            continue
+        name = random.choice(names)
+        length = random.randint(1, min(6, len(name)))
+        start = random.randrange(len(name) - length + 1)
+        queries.append(name[start : start + length])
+    return queries
+
+
+def measure(search: Callable[[str], list[str]], queries: list[str]) -> tuple[list[float], list[list[str]]]:
+    """回傳每次查詢的延遲 (單位：微秒) 與查詢結果"""
+    latencies: list[float] = []
+    results: list[list[str]] = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies, results
+
+
+def describe(latencies: list[float]) -> str:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return (
+        f"平均 {statistics.fmean(latencies):.1f} µs，p50 {quantiles[49]:.1f} µs，"
+        f"p95 {quantiles[94]:.1f} µs，p99 {quantiles[98]:.1f} µs，最大 {max(latencies):.1f} µs"
+    )
+
+
+async def load_names() -> list[str]:
+    """從 genshin-db 快照載入全部成就名稱"""
+    if await GenshinDbSnapshot.load() is False:
+        await GenshinDbSnapshot.refresh()
+    assert GenshinDbSnapshot.data is not None
+    return [achievement.name for achievement in GenshinDbSnapshot.data.achievements.list]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=5000, help="查詢的次數")
+    args = parser.parse_args()
+
+    names = asyncio.run(load_names())
+    start = time.perf_counter()
+    index = SearchIndex(names)
+    build_time = (time.perf_counter() - start) * 1000
+    print(f"成就數量：{len(index.names)}，建立索引：{build_time:.1f} ms")
+
+    queries = make_queries(index.names, args.queries)
+    before, expected = measure(lambda query: brute_force(index.names, query), queries)
+    after, results = measure(lambda query: index.search(query, LIMIT), queries)
+    print(f"調整前：{describe(before)}")
+    print(f"調整後：{describe(after)} ({statistics.fmean(before) / statistics.fmean(after):.1f}x)")
+
+    mismatched = [query for query, a, b in zip(queries, expected, results) if a != b]
+    if len(mismatched) > 0:
+        print(f"{len(mismatched)} 個查詢的結果不同，例如：{mismatched[:5]}")
+        return 1
+    print(f"{len(queries)} 個查詢的結果完全相同")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
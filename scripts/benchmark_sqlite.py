@@ -0,0 +1,103 @@
+"""SQLite 效能設定檔與合併寫入的效能測試
+
+建立有 `--users` 位使用者的暫存資料庫，以與自動簽到更新下次簽到時間相同的寫入 (一筆 `ScheduleDailyCheckin`)
+隨機寫入 `--writes` 次，比較調整前後每秒能完成的寫入數量：
+- 調整前：default 設定檔 (rollback journal)，每筆寫入以 `session.merge` 各自 commit，等同原本的 `insert_or_replace`
+- 調整後：performance 設定檔 (WAL)，每 `Database.WRITE_BATCH_SIZE` 筆寫入以單一 `INSERT ... ON CONFLICT DO UPDATE`
+  語句在同一個交易 commit，等同寫入佇列
+
+在專案根目錄執行：`python -m scripts.benchmark_sqlite [--users 50000] [--writes 2000]`
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database.app import SQLITE_PROFILES, Database
+from database.models import Base, ScheduleDailyCheckin, User
+
+
+def create_database(path: Path, profile: str, users: int) -> sqlalchemy.Engine:
+    """建立套用指定 SQLite 設定檔、有 `users` 位使用者與每日簽到排程的資料庫"""
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+
+    @sqlalchemy.event.listens_for(engine, "connect")
+    def apply_profile(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PROFILES[profile].items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.insert(User), [{"discord_id": i} for i in range(users)])
+        conn.execute(
+            sqlalchemy.insert(ScheduleDailyCheckin),
+            [
+                {"discord_id": i, "discord_channel_id": i % 100, "is_mention": False, "next_checkin_time": now}
+                for i in range(users)
+            ],
+        )
+    return engine
+
+
+def run(engine: sqlalchemy.Engine, user_ids: list[int], batch_size: int) -> float:
+    """以每 `batch_size` 筆寫入一個交易的方式寫入，回傳每秒完成的寫入數量，
+    `batch_size` 為 1 時逐筆 `session.merge`，否則與寫入佇列相同，整批以單一 upsert 語句寫入"""
+    next_checkin_time = datetime.now() + timedelta(days=1)
+    stmt = sqlite_insert(ScheduleDailyCheckin)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["discord_id"],
+        set_={c.name: stmt.excluded[c.name] for c in ScheduleDailyCheckin.__table__.columns if not c.primary_key},
+    )
+    start = time.perf_counter()
+    for i in range(0, len(user_ids), batch_size):
+        instances = [
+            ScheduleDailyCheckin(
+                discord_id=user_id,
+                discord_channel_id=user_id % 100,
+                is_mention=False,
+                next_checkin_time=next_checkin_time,
+            )
+            for user_id in user_ids[i : i + batch_size]
+        ]
+        with Session(engine) as session:
+            if batch_size == 1:
+                session.merge(instances[0])
+            else:
+                mapper = sqlalchemy.inspect(ScheduleDailyCheckin)
+                rows = [{attr.key: getattr(n, attr.key) for attr in mapper.column_attrs} for n in instances]
+                session.execute(stmt, rows)
+            session.commit()
+    return len(user_ids) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50000, help="資料庫內的使用者數量")
+    parser.add_argument("--writes", type=int, default=2000, help="測試的寫入次數")
+    args = parser.parse_args()
+
+    user_ids = random.sample(range(args.users), min(args.writes, args.users))
+    cases = [
+        ("調整前 (default，每筆 commit)", "default", 1),
+        (f"調整後 (performance，每 {Database.WRITE_BATCH_SIZE} 筆 commit)", "performance", Database.WRITE_BATCH_SIZE),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        for name, profile, batch_size in cases:
+            engine = create_database(Path(directory) / f"{profile}.db", profile, args.users)
+            writes_per_second = run(engine, user_ids, batch_size)
+            engine.dispose()
+            print(f"{name}：{writes_per_second:,.0f} 筆寫入/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""確認排程相關的查詢有使用資料表索引
+
+以 models 建立空的記憶體資料庫，對排程與使用者清理時使用的查詢執行 `EXPLAIN QUERY PLAN`，
+任何一個查詢沒有使用預期的索引時，以結束碼 1 結束，可以放在 CI 或升級 SQLite / SQLAlchemy 之後執行。
+
+在專案根目錄執行：`python -m scripts.check_schedule_indexes`
+"""
+
+import importlib.util
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import sqlalchemy
+
+from database.models import (
+    Base,
+    GenshinScheduleNotes,
+    ScheduleDailyCheckin,
+    StarrailScheduleNotes,
+    User,
+    ZZZScheduleNotes,
+)
+
+
+def get_queries(now: datetime) -> list[tuple[str, sqlalchemy.Executable, str]]:
+    """list[(說明, 查詢, 預期使用的索引名稱)]，查詢內容與程式內實際使用的查詢相同"""
+    queries: list[tuple[str, sqlalchemy.Executable, str]] = [
+        (
+            "DailyReward.execute 選出簽到時間已到的使用者",
+            sqlalchemy.select(ScheduleDailyCheckin)
+            .where(ScheduleDailyCheckin.next_checkin_time < now)
+            .order_by(ScheduleDailyCheckin.next_checkin_time),
+            "ix_schedule_daily_checkin_next_checkin_time",
+        ),
+        (
+            "Tool.remove_expired_user 刪除過期的使用者",
+            sqlalchemy.delete(User).where(User.last_used_time <= now),
+            "ix_users_last_used_time",
+        ),
+    ]
+    for table in (ScheduleDailyCheckin, GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes):
+        queries.append(
+            (
+                f"/move_users 移動頻道內的使用者 ({table.__tablename__})",
+                sqlalchemy.update(table)
+                .where(table.discord_channel_id.is_(0))
+                .values({table.discord_channel_id: 1}),
+                f"ix_{table.__tablename__}_discord_channel_id",
+            )
+        )
+    for table in (GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes):
+        queries.append(
+            (
+                f"DueTimeScheduler.rebuild ({table.__tablename__})",
+                sqlalchemy.select(table.discord_id, table.next_check_time).where(
+                    sqlalchemy.or_(table.next_check_time.is_(None), table.next_check_time <= now)
+                ),
+                f"ix_{table.__tablename__}_next_check_time",
+            )
+        )
+    return queries
+
+
+def check_migration() -> int:
+    """確認 Alembic 遷移建立的索引與 models 宣告的索引相同，讓既有的資料庫升級後也有相同的索引"""
+    path = next(Path("database/alembic/versions").glob("7e3b9c41d2a8_*.py"))
+    spec = importlib.util.spec_from_file_location("migration", path)
+    assert spec is not None and spec.loader is not None
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    migration_indexes = {f"ix_{table}_{column}" for table, column in migration.INDEXES}
+    model_indexes = {index.name for table in Base.metadata.tables.values() for index in table.indexes}
+    missing = migration_indexes - model_indexes
+    if len(missing) > 0:
+        print(f"[FAIL] models 沒有宣告遷移建立的索引：{sorted(missing)}")
+        return 1
+    print(f"[OK] 遷移建立的 {len(migration_indexes)} 個索引都已在 models 宣告")
+    return 0
+
+
+def main() -> int:
+    engine = sqlalchemy.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    failed = check_migration()
+    with engine.connect() as conn:
+        for description, query, index in get_queries(datetime.now()):
+            compiled = query.compile(engine)
+            # SQLite 的 datetime 欄位以字串保存，參數以相同的格式傳入
+            params = tuple(
+                str(v) if isinstance(v, datetime) else v
+                for v in (compiled.params[name] for name in compiled.positiontup or [])
+            )
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+            details = [row[-1] for row in plan]
+            ok = any(f"INDEX {index}" in detail for detail in details)
+            failed += int(not ok)
+            print(f"[{'OK' if ok else 'FAIL'}] {description}: {' | '.join(details)}")
+
+    if failed > 0:
+        print(f"{failed} 項檢查失敗")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 import io
 import json
-from typing import Tuple
+from typing import Final, Tuple
 
 import discord
 from cachetools import LRUCache
@@ -11,6 +11,44 @@ from mihomo import tools as mihomo_tools
 from PIL.Image import Image
 
 from database import Database, StarrailShowcase
+from utility.prometheus import UpstreamTimer
+from utility.singleflight import SingleFlight
+
+
+DATA_TTL: Final[float] = 60.0
+"""從 API 取得的展示櫃資料在記憶體內的有效時間 (單位：秒)"""
+
+_loader: SingleFlight[int, tuple[StarrailInfoParsed, bool]] = SingleFlight()
+"""以 UID 為 key 合併並行的展示櫃資料請求，並在 `DATA_TTL` 內保存資料"""
+
+
+async def _load_data(client: MihomoAPI, uid: int) -> tuple[tuple[StarrailInfoParsed, bool], float]:
+    """從 API 取得玩家的展示櫃資料，無法取得時改用資料庫資料
+
+    Returns
+    ------
+    `tuple[tuple[StarrailInfoParsed, bool], float]`
+        ((展示櫃資料, 是否為快取資料), 資料在記憶體內的有效秒數)
+    """
+    # 從資料庫取得舊資料作為快取資料
+    srshowcase = await Database.select_one(StarrailShowcase, StarrailShowcase.uid.is_(uid))
+    cached_data: StarrailInfoParsed | None = None
+    if srshowcase:
+        cached_data = srshowcase.data
+    try:
+        with UpstreamTimer("mihomo"):
+            new_data = await client.fetch_user(uid)
+    except Exception as e:
+        # 無法從 API 取得時，改用資料庫資料，若兩者都沒有則拋出錯誤；API 發生錯誤時不保存在記憶體
+        if cached_data is None:
+            raise e from e
+        return (cached_data, True), 0.0
+    else:
+        if cached_data is not None:
+            new_data = mihomo_tools.merge_character_data(new_data, cached_data)
+        data = mihomo_tools.remove_duplicate_character(new_data)
+        await Database.insert_or_replace(StarrailShowcase(uid, data))
+        return (data, False), DATA_TTL
 
 
 class Showcase:
@@ -24,29 +62,20 @@ class Showcase:
         self.is_cached_data: bool = False
 
     async def load_data(self) -> None:
-        """取得玩家的角色展示櫃資料"""
-
-        # 從資料庫取得舊資料作為快取資料
-        srshowcase = await Database.select_one(
-            StarrailShowcase, StarrailShowcase.uid.is_(self.uid)
+        """取得玩家的角色展示櫃資料，同一位玩家的並行請求會共用同一次 API 請求與資料庫寫入"""
+        self.data, self.is_cached_data = await _loader.do(
+            self.uid, lambda: _load_data(self.client, self.uid)
         )
-        cached_data: StarrailInfoParsed | None = None
-        if srshowcase:
-            cached_data = srshowcase.data
-        try:
-            new_data = await self.client.fetch_user(self.uid)
-        except Exception as e:
-            # 無法從 API 取得時，改用資料庫資料，若兩者都沒有則拋出錯誤
-            if cached_data is None:
-                raise e from e
-            else:
-                self.data = cached_data
-                self.is_cached_data = True
-        else:
-            if cached_data is not None:
-                new_data = mihomo_tools.merge_character_data(new_data, cached_data)
-            self.data = mihomo_tools.remove_duplicate_character(new_data)
-            await Database.insert_or_replace(StarrailShowcase(self.uid, self.data))
+
+    async def delete_data(self) -> None:
+        """刪除資料庫內此玩家的展示櫃資料，並清除記憶體內保存的資料"""
+        await Database.delete_where(StarrailShowcase, StarrailShowcase.uid.is_(self.uid))
+        self.invalidate(self.uid)
+
+    @staticmethod
+    def invalidate(uid: int) -> None:
+        """清除記憶體內保存的玩家展示櫃資料，在刪除資料庫內的展示櫃資料後呼叫"""
+        _loader.invalidate(uid)
 
     def get_player_overview_embed(self) -> discord.Embed:
         """取得玩家基本資料的嵌入訊息"""
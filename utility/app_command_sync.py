@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, ClassVar, Final
+
+import discord
+from discord import app_commands
+
+from .config import config
+from .custom_log import LOG
+from .utils import get_app_command_mention
+
+
+class AppCommandSync:
+    """只在斜線指令有變動時才向 Discord 同步指令
+
+    將指令樹序列化後計算雜湊值 (指紋) 保存在 data 資料夾，啟動時與上次同步的指紋相同就略過同步，
+    減少每次啟動都要等待 Discord 同步 (且受速率限制) 的時間。
+    """
+
+    FINGERPRINT_PATH: Final[Path] = Path("data/app_commands_fingerprint.json")
+    """保存各範圍 (全域、測試伺服器) 上次同步的指紋"""
+    APP_COMMANDS_PATH: Final[Path] = Path("data/app_commands.json")
+    """`get_app_command_mention` 使用的 dict[指令名稱, 指令 ID]"""
+
+    _fingerprints: ClassVar[dict[str, str] | None] = None
+
+    @classmethod
+    def fingerprint(cls, tree: app_commands.CommandTree, guild: discord.abc.Snowflake | None = None) -> str:
+        """計算指令樹在指定範圍內所有指令的指紋
+
+        Parameters
+        ------
+        tree: `CommandTree`
+            機器人的指令樹
+        guild: `Snowflake | None` = None
+            伺服器範圍，`None` 表示全域指令
+
+        Returns
+        ------
+        `str`
+            指令序列化後的 sha256 雜湊值
+        """
+        commands = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+        commands.sort(key=lambda c: (c.get("type", 1), c["name"]))
+        content = json.dumps(
+            {"application_id": config.application_id, "commands": commands},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    @classmethod
+    async def sync(cls, tree: app_commands.CommandTree, guild: discord.abc.Snowflake | None = None) -> bool:
+        """指令有變動時才同步指令，全域同步後也一併更新 `APP_COMMANDS_PATH`
+
+        Parameters
+        ------
+        tree: `CommandTree`
+            機器人的指令樹
+        guild: `Snowflake | None` = None
+            要同步的伺服器，`None` 表示同步全域指令
+
+        Returns
+        ------
+        `bool`
+            是否有向 Discord 同步指令
+        """
+        scope = "global" if guild is None else f"guild:{guild.id}"
+        fingerprints = cls._get_fingerprints()
+        fingerprint = cls.fingerprint(tree, guild)
+        if fingerprints.get(scope) == fingerprint and (guild is not None or cls.APP_COMMANDS_PATH.exists()):
+            LOG.System(f"app commands ({scope}): 指令沒有變動，略過同步")
+            return False
+
+        synced = await tree.sync(guild=guild)
+        if guild is None:
+            cls._write_app_commands(synced)
+        fingerprints[scope] = fingerprint
+        cls._write_json(cls.FINGERPRINT_PATH, fingerprints)
+        LOG.System(f"app commands ({scope}): 已同步 {len(synced)} 個指令")
+        return True
+
+    @classmethod
+    def _get_fingerprints(cls) -> dict[str, str]:
+        if cls._fingerprints is None:
+            try:
+                cls._fingerprints = json.loads(cls.FINGERPRINT_PATH.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                cls._fingerprints = {}
+        return cls._fingerprints
+
+    @classmethod
+    def _write_app_commands(cls, synced: list[app_commands.AppCommand]) -> None:
+        """保存同步後 Discord 回傳的指令 ID，子指令以 `指令 子指令` 為名稱"""
+        appcmd_id: dict[str, int] = {}
+        for command in synced:
+            appcmd_id[command.name] = command.id
+            for option in command.options:
+                if isinstance(option, app_commands.AppCommandGroup):
+                    appcmd_id[option.qualified_name] = command.id
+        cls._write_json(cls.APP_COMMANDS_PATH, appcmd_id)
+        # 讓 get_app_command_mention 直接使用新的指令 ID
+        setattr(get_app_command_mention, "appcmd_id", appcmd_id)
+
+    @staticmethod
+    def _write_json(path: Path, obj: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(obj, ensure_ascii=False, indent=4), encoding="utf-8")
+        os.replace(temp_path, path)
@@ -14,6 +14,10 @@ import discord
 import genshin
 from discord.ext import commands
 
+from .config import config
+from .log_pipeline import ANSI_ESCAPE, setup_logging
+from .prometheus import Metrics
+
 #   六位色碼的正則表達式
 COLOR_CODE = re.compile(r"^[#]?[a-f0-9]{6}$")
 
@@ -28,8 +32,13 @@ elif platform.system() == "Java":
 else:
     pass
 
-#   設定 logging
-logging.basicConfig(format="%(message)s", level=logging.INFO)
+#   設定 logging：格式化與輸出在背景執行緒處理，可選 JSON 格式與每個標籤的輸出速率上限
+setup_logging(
+    logging.INFO,
+    json_format=config.log_format == "json",
+    rate_limit=config.log_rate_limit,
+    burst=config.log_rate_burst,
+)
 
 
 #   Log更改顏色用
@@ -248,17 +257,19 @@ class LogTool(ColorTool):
         logging_level: int = logging.INFO,
         message: str = "",
         show_timestamp: bool = True,
+        fields: dict[str, Any] | None = None,
     ) -> None:
         message = message[:-1] if (len(message) > 0 and message[-1] == "\n") else message
+        extra = {
+            "tag": ANSI_ESCAPE.sub("", tag).strip("【】").lower() if tag is not None else None,
+            "fields": fields or {},
+        }
+        if config.log_format == "json":  # JSON 格式不需要時間戳與縮排，由 JsonFormatter 處理
+            logging.log(logging_level, message, extra=extra)
+            return
         msg = str(message).replace("\n", (self.indent if tag is not None else self.indent_noTag))
         msg = f'{self.__get_timestamp__(show_timestamp)}{(tag if tag != None else " ")}{msg}'
-        for level, func in zip(
-            [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL],
-            [logging.debug, logging.info, logging.warning, logging.error, logging.critical],
-        ):
-            if logging_level == level:
-                func(msg)
-                break
+        logging.log(logging_level, msg, extra=extra)
 
     def System(self, message: str = "", show_timestamp: bool = True) -> None:
         """[YYYY-MM-DD hh:mm:ss]【系統】"""
@@ -272,9 +283,11 @@ class LogTool(ColorTool):
         """[YYYY-MM-DD hh:mm:ss]【事件】"""
         self.__print_with_tag__(self.EVENT, logging.INFO, message, show_timestamp)
 
-    def Cmd(self, message: str = "", show_timestamp: bool = True) -> None:
+    def Cmd(
+        self, message: str = "", show_timestamp: bool = True, fields: dict[str, Any] | None = None
+    ) -> None:
         """[YYYY-MM-DD hh:mm:ss]【指令】"""
-        self.__print_with_tag__(self.COMMAND, logging.INFO, message, show_timestamp)
+        self.__print_with_tag__(self.COMMAND, logging.INFO, message, show_timestamp, fields)
 
     def Interact(self, message: str = "", show_timestamp: bool = True) -> None:
         """[YYYY-MM-DD hh:mm:ss]【互動】"""
@@ -292,13 +305,17 @@ class LogTool(ColorTool):
         """[YYYY-MM-DD hh:mm:ss]【警告】"""
         self.__print_with_tag__(self.WARN, logging.WARN, message, show_timestamp)
 
-    def Error(self, message: str = "", show_timestamp: bool = True) -> None:
+    def Error(
+        self, message: str = "", show_timestamp: bool = True, fields: dict[str, Any] | None = None
+    ) -> None:
         """[YYYY-MM-DD hh:mm:ss]【錯誤】"""
-        self.__print_with_tag__(self.ERROR, logging.WARN, message, show_timestamp)
+        self.__print_with_tag__(self.ERROR, logging.WARN, message, show_timestamp, fields)
 
-    def Except(self, message: str = "", show_timestamp: bool = True) -> None:
+    def Except(
+        self, message: str = "", show_timestamp: bool = True, fields: dict[str, Any] | None = None
+    ) -> None:
         """[YYYY-MM-DD hh:mm:ss]【例外】"""
-        self.__print_with_tag__(self.EXCEPTION, logging.INFO, message, show_timestamp)
+        self.__print_with_tag__(self.EXCEPTION, logging.INFO, message, show_timestamp, fields)
 
     def Test(self, message: str = "", show_timestamp: bool = True) -> None:
         """[YYYY-MM-DD hh:mm:ss]【測試】"""
@@ -394,7 +411,7 @@ class LogTool(ColorTool):
         for name, argument in kwargs.items():
             arg_list.append(f"{self.__ParameterName__(name)}={parse_argument(argument)}")
         log = f"{self.User(ctx.user)} 使用了 {self.__CmdName__(cmd_name)}：{', '.join(arg_list)}"
-        self.Cmd(log)
+        self.Cmd(log, fields=self.__ContextFields__(ctx))
 
     def CmdResult(
         self,
@@ -461,7 +478,12 @@ class LogTool(ColorTool):
             else ""
         )
         #   輸出Log
-        self.Cmd("⤷ " + log + cost_time + postition + msg, show_timestamp)
+        fields = self.__ContextFields__(ctx, cmd_name)
+        if start_time is not None:
+            fields["latency"] = round(time.perf_counter() - start_time, 3)
+        if success is not None:
+            fields["success"] = success
+        self.Cmd("⤷ " + log + cost_time + postition + msg, show_timestamp, fields)
 
     def ErrorLog(
         self,
@@ -485,7 +507,7 @@ class LogTool(ColorTool):
                 msg = f"{self.User(ctx.user)}引發斜線指令錯誤{self.ErrorType(error)}：\n錯誤訊息：{self.__ErrorMsg__(error)}"
             else:
                 msg = f"{self.User(ctx.user)}執行斜線指令期間發生錯誤{self.ErrorType(error)}：\n錯誤訊息：{self.__ErrorMsg__(error)}"
-        self.Error(msg)
+        self.Error(msg, fields=self.__ContextFields__(ctx) | {"error": type(error).__qualname__})
         # if not isinstance(error, discord.NotFound):  # 忽略 Not Found 例外
         #     traceback.print_tb(error.__traceback__)
 
@@ -494,6 +516,9 @@ class LogTool(ColorTool):
     ) -> None:
         """原神函式內發生例外Log模板"""
         msg = f"{self.User(user)} 執行函式 {self.__FuncName__(func_name)} 期間發生錯誤：\n"
+        fields: dict[str, Any] = {"user": user, "function": func_name, "error": type(error).__qualname__}
+        if isinstance(error, genshin.GenshinException):
+            fields["retcode"] = error.retcode
         if isinstance(error, genshin.GenshinException):
             msg = msg + (
                 f"retcode：{self.__ErrorMsg__(error.retcode)}、"
@@ -502,7 +527,20 @@ class LogTool(ColorTool):
             )
         else:  # Exception
             msg = msg + f"錯誤訊息：{self.__ErrorMsg__(error)}"
-        self.Except(msg)
+        self.Except(msg, fields=fields)
+
+    def __ContextFields__(
+        self, ctx: commands.Context | discord.Interaction, command_name: str | None = None
+    ) -> dict[str, Any]:
+        """取得指令的結構化欄位 (使用者、指令、伺服器)，給 JSON 格式的 log 使用"""
+        user = ctx.author if isinstance(ctx, commands.Context) else ctx.user
+        if command_name is None:
+            command_name = ctx.command.qualified_name if ctx.command is not None else None
+        return {
+            "user": user.id,
+            "command": command_name,
+            "guild": ctx.guild.id if ctx.guild is not None else None,
+        }
 
     def HighLight(self, message: str) -> str:
         return f"{self._WHEAT_YELLOW}{message}{self.RESET}"
@@ -526,6 +564,12 @@ class LogTool(ColorTool):
 LOG = LogTool()
 
 
+def _observe_command_latency(ctx: discord.Interaction, start_time: float, outcome: str) -> None:
+    """將指令從被呼叫到執行完畢所花費的時間記錄到 Prometheus"""
+    command_name = ctx.command.qualified_name if ctx.command is not None else "None"
+    Metrics.COMMAND_LATENCY.labels(command_name, outcome).observe(time.perf_counter() - start_time)
+
+
 def SlashCommandLogger(func: Callable):
     """斜線指令Log裝飾器"""
 
@@ -533,7 +577,12 @@ def SlashCommandLogger(func: Callable):
     async def inner(self, ctx: discord.Interaction, *args, **kwargs):
         LOG.CmdCall(ctx, *args, **kwargs)
         start_time = time.perf_counter()
-        res = await func(self, ctx, *args, **kwargs)
+        try:
+            res = await func(self, ctx, *args, **kwargs)
+        except Exception:
+            _observe_command_latency(ctx, start_time, "error")
+            raise
+        _observe_command_latency(ctx, start_time, "success")
         LOG.CmdResult(ctx, start_time)
         return res
 
@@ -547,7 +596,12 @@ def ContextCommandLogger(func: Callable):
     async def inner(ctx: discord.Interaction, *args, **kwargs):
         LOG.CmdCall(ctx, *args, **kwargs)
         start_time = time.perf_counter()
-        res = await func(ctx, *args, **kwargs)
+        try:
+            res = await func(ctx, *args, **kwargs)
+        except Exception:
+            _observe_command_latency(ctx, start_time, "error")
+            raise
+        _observe_command_latency(ctx, start_time, "success")
         LOG.CmdResult(ctx, start_time)
         return res
 
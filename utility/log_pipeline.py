@@ -0,0 +1,128 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+ANSI_ESCAPE = re.compile(r"\033\[[0-9;]*m")
+"""ANSI 顏色轉義序列的正則表達式"""
+
+
+class JsonFormatter(logging.Formatter):
+    """將 log 輸出為一行一筆的 JSON，給 log 收集工具使用
+
+    除了時間、等級、標籤、訊息 (已移除顏色) 之外，`LogTool` 傳入的結構化欄位
+    (user、command、guild、latency、retcode...) 也會一併輸出
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        obj: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "tag": getattr(record, "tag", None),
+            "message": ANSI_ESCAPE.sub("", record.getMessage()),
+        }
+        obj.update(getattr(record, "fields", {}))
+        if (exception := getattr(record, "exception", None)) is not None:
+            obj["exception"] = exception
+        return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+class TagRateLimitFilter(logging.Filter):
+    """依照 log 的標籤限制每秒輸出的數量，避免大量相同類型的 log (例：Hoyolab 故障時的錯誤) 洗版
+
+    每個標籤各自以 token bucket 限流，被略過的數量會附加在該標籤下一筆輸出的 log
+
+    Parameters
+    ------
+    rate: `float`
+        每個標籤每秒最多輸出的 log 數量，小於等於 0 表示不限制
+    burst: `float`
+        每個標籤允許的瞬間突發數量
+    """
+
+    def __init__(self, rate: float, burst: float):
+        super().__init__()
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        """dict[標籤, (剩餘權杖數量, 上次更新時間)]"""
+        self._dropped: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0:
+            return True
+        tag = getattr(record, "tag", None) or record.name
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_time = self._buckets.get(tag, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_time) * self.rate)
+            if tokens < 1:
+                self._buckets[tag] = (tokens, now)
+                self._dropped[tag] = self._dropped.get(tag, 0) + 1
+                return False
+            self._buckets[tag] = (tokens - 1, now)
+            dropped = self._dropped.pop(tag, 0)
+        if dropped > 0:
+            record.msg = f"{record.getMessage()} (已略過 {dropped} 則同類 log)"
+            record.args = None
+        return True
+
+
+class _JsonQueueHandler(logging.handlers.QueueHandler):
+    """放入佇列前將 traceback 移到 `record.exception`，讓 `JsonFormatter` 以獨立的欄位輸出
+
+    `QueueHandler.prepare` 預設會把 traceback 合併到訊息內並清除 `exc_info`
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exception = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return super().prepare(record)
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def setup_logging(level: int, json_format: bool, rate_limit: float, burst: float) -> None:
+    """設定 root logger：呼叫端只把 log 放進佇列，格式化與寫入由背景執行緒處理，不阻塞 event loop
+
+    Parameters
+    ------
+    level: `int`
+        root logger 的 log 等級
+    json_format: `bool`
+        `True` 輸出 JSON 格式，`False` 輸出原本的文字格式
+    rate_limit: `float`
+        每個標籤每秒最多輸出的 log 數量，小於等於 0 表示不限制
+    burst: `float`
+        每個標籤允許的瞬間突發數量
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output_handler = logging.StreamHandler()
+    output_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter("%(message)s"))
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _JsonQueueHandler(log_queue) if json_format else logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(TagRateLimitFilter(rate_limit, burst))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers = [queue_handler]
+
+    _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+    _listener.start()
+    # 程式結束時寫出佇列內剩下的 log
+    atexit.register(_listener.stop)
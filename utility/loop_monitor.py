@@ -0,0 +1,110 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import ClassVar, Final
+
+from .custom_log import LOG
+from .prometheus import Metrics
+
+
+@dataclass
+class SlowCallbackRecord:
+    """一次 event loop 被阻塞的紀錄"""
+
+    time: datetime
+    """發現阻塞的時間"""
+    duration: float
+    """阻塞的秒數，阻塞結束前為目前已阻塞的秒數"""
+    stack: str
+    """發現阻塞時 event loop 所在執行緒正在執行的程式碼位置"""
+
+
+class SlowCallbackMonitor:
+    """偵測阻塞 event loop 過久的程式碼
+
+    event loop 內定時更新心跳時間，另一個執行緒檢查心跳，超過門檻時間沒有更新時，
+    記錄 event loop 執行緒當下的 stack，找出是哪段同步程式碼佔用了 event loop。
+    最近的紀錄保存在 `records`，並記錄到 Prometheus 的 `Metrics.SLOW_CALLBACK_DURATION`。
+    """
+
+    MAX_RECORDS: Final[int] = 50
+    """最多保存的紀錄數量"""
+
+    records: ClassVar[deque[SlowCallbackRecord]] = deque(maxlen=MAX_RECORDS)
+    """最近的阻塞紀錄，由舊到新排序"""
+
+    _threshold: ClassVar[float] = 0.0
+    _heartbeat: ClassVar[float] = 0.0
+    _loop_thread_id: ClassVar[int | None] = None
+    _heartbeat_task: ClassVar[asyncio.Task | None] = None
+    _watchdog: ClassVar[threading.Thread | None] = None
+    _stop_event: ClassVar[threading.Event] = threading.Event()
+
+    @classmethod
+    def start(cls, threshold: float) -> None:
+        """在目前的 event loop 開始偵測
+
+        Parameters
+        ------
+        threshold: `float`
+            event loop 被阻塞超過此秒數時記錄
+        """
+        if cls._watchdog is not None:
+            return
+        cls._threshold = threshold
+        cls._heartbeat = time.monotonic()
+        cls._loop_thread_id = threading.get_ident()
+        cls._stop_event.clear()
+        cls._heartbeat_task = asyncio.create_task(cls._beat())
+        cls._watchdog = threading.Thread(target=cls._watch, name="SlowCallbackMonitor", daemon=True)
+        cls._watchdog.start()
+        LOG.System(f"slow callback monitor: started (threshold {threshold}s)")
+
+    @classmethod
+    def stop(cls) -> None:
+        """停止偵測"""
+        cls._stop_event.set()
+        if cls._heartbeat_task is not None:
+            cls._heartbeat_task.cancel()
+            cls._heartbeat_task = None
+        cls._watchdog = None
+
+    @classmethod
+    async def _beat(cls) -> None:
+        interval = cls._threshold / 4
+        while True:
+            cls._heartbeat = time.monotonic()
+            await asyncio.sleep(interval)
+
+    @classmethod
+    def _watch(cls) -> None:
+        """在獨立執行緒檢查心跳，同一次阻塞只記錄一次，阻塞結束時更新阻塞的秒數"""
+        interval = cls._threshold / 4
+        record: SlowCallbackRecord | None = None
+        blocked_heartbeat = 0.0
+        while not cls._stop_event.wait(interval):
+            heartbeat = cls._heartbeat
+            blocked = time.monotonic() - heartbeat
+            if record is not None and heartbeat != blocked_heartbeat:
+                # 心跳已恢復，阻塞結束
+                Metrics.SLOW_CALLBACK_DURATION.observe(record.duration)
+                LOG.Error(f"slow callback: event loop 被阻塞 {record.duration:.2f}s\n{record.stack}")
+                record = None
+            if record is not None:
+                record.duration = blocked
+            elif blocked > cls._threshold:
+                record = SlowCallbackRecord(datetime.now(), blocked, cls._get_loop_stack())
+                blocked_heartbeat = heartbeat
+                cls.records.append(record)
+
+    @classmethod
+    def _get_loop_stack(cls) -> str:
+        frame = sys._current_frames().get(cls._loop_thread_id or 0)
+        if frame is None:
+            return "(無法取得 stack)"
+        return "".join(traceback.format_stack(frame, limit=15))
@@ -1,6 +1,10 @@
+import time
+from functools import lru_cache
+from types import SimpleNamespace
 from typing import Final
 
-from prometheus_client import Counter, Gauge
+import aiohttp
+from prometheus_client import Counter, Gauge, Histogram
 
 
 class Metrics:
@@ -39,6 +43,22 @@ class Metrics:
     )
     """文字指令被呼叫的次數"""
 
+    COMMAND_LATENCY: Final[Histogram] = Histogram(
+        PREFIX + "command_latency_seconds",
+        "斜線指令、右鍵選單指令從被呼叫到執行完畢所花費的時間",
+        ["command", "outcome"],
+        buckets=(0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 15, 30, 60),
+    )
+    """斜線指令、右鍵選單指令從被呼叫到執行完畢所花費的時間 (單位: 秒)，outcome 為 success 或 error"""
+
+    UPSTREAM_LATENCY: Final[Histogram] = Histogram(
+        PREFIX + "upstream_latency_seconds",
+        "向外部服務 (Hoyolab、Enka、Mihomo、genshin-db、素材下載、Discord) 請求所花費的時間",
+        ["upstream", "outcome"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+    )
+    """向外部服務請求所花費的時間 (單位: 秒)，outcome 為 success 或 error，error 的數量即為請求失敗次數"""
+
     CPU_USAGE: Final[Gauge] = Gauge(PREFIX + "cpu_usage_percent", "系統的 CPU 使用率")
     """系統的 CPU 使用率 (0 ~ 100%)"""
 
@@ -49,3 +69,122 @@ class Metrics:
         PREFIX + "process_start_time_seconds", "機器人程序啟動時當下的時間"
     )
     """機器人程序啟動時當下的時間 (UNIX Timestamp)"""
+
+    NOTES_QUEUE_SIZE: Final[Gauge] = Gauge(
+        PREFIX + "realtime_notes_queue_size", "自動檢查即時便箋佇列中等待檢查的使用者數量"
+    )
+    """自動檢查即時便箋佇列中等待檢查的使用者數量"""
+
+    NOTES_CHECK_LAG: Final[Histogram] = Histogram(
+        PREFIX + "realtime_notes_check_lag_seconds",
+        "使用者到期至實際開始檢查即時便箋之間的延遲",
+        ["game"],
+        buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+    )
+    """使用者到期至實際開始檢查即時便箋之間的延遲 (單位: 秒)"""
+
+    RENDER_QUEUE_SIZE: Final[Gauge] = Gauge(
+        PREFIX + "render_queue_size", "已交給繪圖執行器但尚未完成的工作數量"
+    )
+    """已交給繪圖執行器但尚未完成的工作數量"""
+
+    RENDER_DURATION: Final[Histogram] = Histogram(
+        PREFIX + "render_duration_seconds",
+        "繪圖工作從提交到完成 (包含排隊) 所花費的時間",
+        ["painter"],
+        buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+    )
+    """繪圖工作從提交到完成 (包含排隊) 所花費的時間 (單位: 秒)"""
+
+    RENDER_CACHE_EVENTS: Final[Counter] = Counter(
+        PREFIX + "render_cache_events", "繪圖時快取命中與未命中的次數", ["cache", "event"]
+    )
+    """繪圖時快取命中 (hit) 與未命中 (miss) 的次數"""
+
+    EVENT_LOOP_LAG: Final[Histogram] = Histogram(
+        PREFIX + "event_loop_lag_seconds",
+        "Event loop 排程的延遲，也就是計時器到期至實際被執行之間的時間",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    )
+    """Event loop 排程的延遲 (單位: 秒)，數值過高代表有同步程式碼佔用 event loop"""
+
+    DATABASE_BACKUP_DURATION: Final[Gauge] = Gauge(
+        PREFIX + "database_backup_duration_seconds", "上一次資料庫備份 (包含壓縮) 所花費的時間"
+    )
+    """上一次資料庫備份 (包含壓縮) 所花費的時間 (單位: 秒)"""
+
+    DATABASE_BACKUP_SIZE: Final[Gauge] = Gauge(
+        PREFIX + "database_backup_size_bytes", "上一次資料庫備份壓縮後的檔案大小"
+    )
+    """上一次資料庫備份壓縮後的檔案大小 (單位: bytes)"""
+
+    DATABASE_BACKUP_LAST_SUCCESS: Final[Gauge] = Gauge(
+        PREFIX + "database_backup_last_success_timestamp", "上一次資料庫備份成功的時間"
+    )
+    """上一次資料庫備份成功的時間 (UNIX Timestamp)"""
+
+    SLOW_CALLBACK_DURATION: Final[Histogram] = Histogram(
+        PREFIX + "slow_callback_duration_seconds",
+        "Event loop 被同步程式碼阻塞超過門檻的時間",
+        buckets=(0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    )
+    """Event loop 被同步程式碼阻塞超過門檻的時間 (單位: 秒)，只在啟用 `SlowCallbackMonitor` 時記錄"""
+
+
+class UpstreamTimer:
+    """計算向外部服務請求所花費的時間，離開 with 區塊時記錄到 `Metrics.UPSTREAM_LATENCY`
+
+    with 區塊內發生例外時記錄為失敗 (error)
+
+    Parameters
+    ------
+    upstream: `str`
+        外部服務的名稱，例：hoyolab、enka
+    """
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        self.start_time = 0.0
+
+    def __enter__(self) -> "UpstreamTimer":
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        outcome = "error" if exc_type is not None else "success"
+        Metrics.UPSTREAM_LATENCY.labels(self.upstream, outcome).observe(
+            time.perf_counter() - self.start_time
+        )
+
+
+@lru_cache(maxsize=None)
+def upstream_trace_config(upstream: str) -> aiohttp.TraceConfig:
+    """取得 aiohttp 的 TraceConfig，使用此設定的 ClientSession 每次請求都會記錄到 `Metrics.UPSTREAM_LATENCY`
+
+    HTTP 狀態碼 400 以上或連線發生例外時記錄為失敗 (error)
+
+    Parameters
+    ------
+    upstream: `str`
+        外部服務的名稱，例：discord、genshin_db
+    """
+
+    async def on_request_start(session, context: SimpleNamespace, params) -> None:
+        context.start_time = time.perf_counter()
+
+    async def on_request_end(session, context: SimpleNamespace, params) -> None:
+        outcome = "error" if params.response.status >= 400 else "success"
+        Metrics.UPSTREAM_LATENCY.labels(upstream, outcome).observe(
+            time.perf_counter() - context.start_time
+        )
+
+    async def on_request_exception(session, context: SimpleNamespace, params) -> None:
+        Metrics.UPSTREAM_LATENCY.labels(upstream, "error").observe(
+            time.perf_counter() - context.start_time
+        )
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
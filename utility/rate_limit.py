@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Token bucket 限流器，每秒補充 `rate` 個權杖，最多累積 `capacity` 個權杖
+
+    Parameters
+    ------
+    rate: `float`
+        每秒補充的權杖數量，小於等於 0 表示不限制
+    capacity: `float` | `None`
+        最多能累積的權杖數量 (允許的瞬間突發量)，`None` 表示與 `rate` 相同 (至少為 1)
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_time = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """取得一個權杖，若目前沒有權杖則等待到權杖補充為止，等待中的呼叫者依照先後順序取得權杖"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated_time) * self.rate
+                )
+                self._updated_time = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -0,0 +1,184 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, ClassVar, TypeVar
+
+from .config import config
+from .prometheus import Metrics
+
+T = TypeVar("T")
+
+
+class RenderQueueFull(Exception):
+    """繪圖佇列已滿，無法再接受新的繪圖工作時的例外"""
+
+    pass
+
+
+class RenderExecutor:
+    """繪製圖片 (PIL) 用的執行器
+
+    繪圖工作會交給獨立的 process pool 執行，避免 PIL 的合成與編碼佔用 event loop，
+    導致所有 shard 的 gateway heartbeat 停擺。交給執行器的函式與參數必須能被 pickle，
+    也就是模組層級的同步函式，且不能依賴網路下載 (需要的素材要在呼叫前先下載好)。
+
+    - `config.render_workers`：process 數量，設為 0 時改用 thread pool 執行
+    - `config.render_queue_size`：所有 process 都在忙碌時，最多能排隊等待的工作數量，超過時拋出 `RenderQueueFull`
+    - `config.render_timeout`：每個工作 (包含排隊) 的最長等待時間 (單位：秒)
+    """
+
+    _executor: ClassVar[Executor | None] = None
+    _pending: ClassVar[int] = 0
+    """已提交但尚未完成的工作數量"""
+    _initializers: ClassVar[list[Callable[[], None]]] = []
+    """每個繪圖程序啟動時要執行的函式"""
+
+    @classmethod
+    def register_initializer(cls, func: Callable[[], None]) -> None:
+        """註冊繪圖程序啟動時要執行的函式 (例如預先載入字型)，需要在 `start` 之前註冊
+
+        Parameters
+        ------
+        func: `Callable[[], None]`
+            模組層級的同步函式，必須能被 pickle
+        """
+        if func not in cls._initializers:
+            cls._initializers.append(func)
+
+    @classmethod
+    def start(cls) -> None:
+        """建立執行器並啟動所有繪圖程序，讓程序的啟動與初始化在機器人啟動時完成，而不是在第一次繪圖時"""
+        executor = cls._get_executor()
+        if isinstance(executor, ProcessPoolExecutor):
+            # process pool 只在有工作時才建立程序，送出與程序數量相同的空工作來啟動所有程序
+            for _ in range(config.render_workers):
+                executor.submit(_run_initializers, ())
+
+    @classmethod
+    async def run(cls, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """將繪圖函式交給執行器執行，並等待回傳結果
+
+        Parameters
+        ------
+        func: `Callable[..., T]`
+            模組層級的同步繪圖函式
+        *args, **kwargs: `Any`
+            傳給繪圖函式的參數，必須能被 pickle
+
+        Returns
+        ------
+        `T`
+            繪圖函式的回傳值
+
+        Raises
+        ------
+        RenderQueueFull
+            排隊中的工作已達上限
+        asyncio.TimeoutError
+            工作超過 `config.render_timeout` 秒仍未完成
+        """
+        if cls._pending >= max(config.render_workers, 1) + config.render_queue_size:
+            raise RenderQueueFull("The bot is busy drawing images right now, please try again later.")
+
+        cls._pending += 1
+        Metrics.RENDER_QUEUE_SIZE.set(cls._pending)
+        start_time = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                future = cls._get_executor().submit(_run_job, partial(func, *args, **kwargs))
+            except BaseException:
+                cls._job_done()
+                raise
+            # 逾時後正在執行的工作無法被取消，等工作真正結束 (或在開始前被取消) 才減少計數，
+            # 避免忙碌中的程序被當成空閒而接受超過上限的工作
+            future.add_done_callback(lambda _: cls._call_soon_threadsafe(loop, cls._job_done))
+            result, cache_events = await asyncio.wait_for(asyncio.wrap_future(future), timeout=config.render_timeout)
+            for (cache, event), count in cache_events.items():
+                Metrics.RENDER_CACHE_EVENTS.labels(cache, event).inc(count)
+            return result
+        except BrokenProcessPool:
+            # 子程序異常結束時，重新建立 process pool 給之後的工作使用
+            cls.shutdown()
+            raise
+        finally:
+            Metrics.RENDER_DURATION.labels(func.__name__).observe(time.perf_counter() - start_time)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """關閉執行器，尚未開始的工作會被取消，在機器人關閉時呼叫"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    @classmethod
+    def _job_done(cls) -> None:
+        cls._pending -= 1
+        Metrics.RENDER_QUEUE_SIZE.set(cls._pending)
+
+    @staticmethod
+    def _call_soon_threadsafe(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> None:
+        """工作結束的 callback 在執行器的執行緒被呼叫，交回 event loop 執行"""
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:  # event loop 已關閉
+            pass
+
+    @classmethod
+    def _get_executor(cls) -> Executor:
+        """取得執行器，第一次使用時才建立；`config.render_workers` 為 0 時使用 thread pool"""
+        if cls._executor is not None:
+            return cls._executor
+        if config.render_workers <= 0:
+            # 與 event loop 預設的 thread pool 相同的執行緒數量，初始化函式只需在主程序執行一次
+            _run_initializers(tuple(cls._initializers))
+            cls._executor = ThreadPoolExecutor(thread_name_prefix="RenderExecutor")
+        else:
+            # 使用 spawn 而非 fork，避免複製到主程序中其他 thread 持有的鎖
+            cls._executor = ProcessPoolExecutor(
+                max_workers=config.render_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_run_initializers,
+                initargs=(tuple(cls._initializers),),
+            )
+        return cls._executor
+
+
+_cache_events: Counter[tuple[str, str]] = Counter()
+"""繪圖程序內尚未回報的快取事件次數 Counter[(快取名稱, hit 或 miss)]"""
+_cache_events_lock = threading.Lock()
+
+
+def record_cache_event(cache: str, event: str) -> None:
+    """在繪圖工作中記錄一次快取命中 ("hit") 或未命中 ("miss")，
+    次數會隨工作的結果傳回主程序，更新 Prometheus 的 `RENDER_CACHE_EVENTS`
+
+    Parameters
+    ------
+    cache: `str`
+        快取名稱
+    event: `str`
+        "hit" 或 "miss"
+    """
+    with _cache_events_lock:
+        _cache_events[(cache, event)] += 1
+
+
+def _run_job(job: Callable[[], T]) -> tuple[T, dict[tuple[str, str], int]]:
+    """在繪圖程序內執行工作，並一併回傳此程序目前累積的快取事件次數"""
+    result = job()
+    with _cache_events_lock:
+        cache_events = dict(_cache_events)
+        _cache_events.clear()
+    return result, cache_events
+
+
+def _run_initializers(initializers: tuple[Callable[[], None], ...]) -> None:
+    """依序執行註冊的初始化函式，給 process pool 的 initializer 使用"""
+    for initializer in initializers:
+        initializer()
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """合併相同 key 的並行請求，並在記憶體內短暫保存結果
+
+    同一個 key 同時只會有一個執行中的請求，其他呼叫者等待並共用它的結果；
+    請求完成後，結果依照請求回傳的有效時間 (TTL) 保存在記憶體，有效時間內不會再次發出請求。
+    請求發生例外時，例外會傳給所有等待中的呼叫者，且不會被保存。
+
+    Parameters
+    ------
+    max_size: `int`
+        記憶體內最多保存的結果數量，超過時移除最久未使用的結果
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._in_flight: dict[K, asyncio.Task[tuple[V, float]]] = {}
+        self._results: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        """dict[key, (過期時間 (time.monotonic), 結果)]"""
+
+    async def do(self, key: K, func: Callable[[], Awaitable[tuple[V, float]]]) -> V:
+        """取得 key 的結果：優先使用記憶體內未過期的結果，其次等待執行中的請求，都沒有時才呼叫 `func`
+
+        Parameters
+        ------
+        key: `K`
+            請求的 key
+        func: `Callable[[], Awaitable[tuple[V, float]]]`
+            發出請求的函式，回傳 (結果, 結果的有效秒數)，有效秒數小於等於 0 表示不保存
+
+        Returns
+        ------
+        `V`
+            請求的結果
+        """
+        if (result := self._results.get(key)) is not None:
+            expire_time, value = result
+            if expire_time > time.monotonic():
+                self._results.move_to_end(key)
+                return value
+            del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, func))
+            self._in_flight[key] = task
+        # 呼叫者被取消時不影響其他正在等待的呼叫者
+        value, _ = await asyncio.shield(task)
+        return value
+
+    def invalidate(self, key: K) -> None:
+        """移除記憶體內保存的結果；執行中的請求仍會回傳給已在等待的呼叫者，但結果不會被保存，
+        之後的呼叫者會發出新的請求，避免保存到資料在 invalidate 之前的結果"""
+        self._results.pop(key, None)
+        self._in_flight.pop(key, None)
+
+    async def _run(self, key: K, func: Callable[[], Awaitable[tuple[V, float]]]) -> tuple[V, float]:
+        try:
+            value, ttl = await func()
+        finally:
+            # 執行期間被 invalidate 時，self._in_flight 內已不是此任務 (或已被新的請求取代)
+            stale = self._in_flight.get(key) is not asyncio.current_task()
+            if not stale:
+                del self._in_flight[key]
+        if ttl > 0 and not stale:
+            self._results[key] = (time.monotonic() + ttl, value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+        return value, ttl
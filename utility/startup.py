@@ -0,0 +1,110 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, ClassVar, Iterator
+
+import discord
+import sentry_sdk
+
+from .custom_log import LOG
+from .discord_ui_template import EmbedTemplate
+
+
+class StartupTimer:
+    """記錄機器人啟動時各階段花費的時間"""
+
+    def __init__(self) -> None:
+        self.start_time = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+        """list[(階段名稱, 花費秒數)]"""
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """計算 with 區塊內花費的時間，並記錄為一個階段"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def elapsed(self) -> float:
+        """從建立計時器到現在經過的秒數"""
+        return time.perf_counter() - self.start_time
+
+    def log(self) -> None:
+        """輸出各階段與總共花費的時間"""
+        total = self.elapsed()
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases)
+        LOG.System(f"setup_hook: 啟動完成，共 {total:.2f}s ({phases})")
+
+
+class WarmUp:
+    """在背景執行啟動時需要網路的暖機工作 (例：更新素材資料)，不阻塞機器人啟動
+
+    每項工作以名稱區分，結束後標記為就緒 (失敗時使用本地既有的資料)，
+    指令可以用 `check_ready` 在資料準備好之前回覆使用者稍後再試
+    """
+
+    _tasks: ClassVar[dict[str, asyncio.Task]] = {}
+    _ready: ClassVar[set[str]] = set()
+
+    @classmethod
+    def start(cls, name: str, func: Callable[[], Awaitable[None]]) -> asyncio.Task:
+        """在背景執行暖機工作，同名的工作仍在執行時不會重複執行
+
+        Parameters
+        ------
+        name: `str`
+            工作名稱
+        func: `Callable[[], Awaitable[None]]`
+            暖機工作的函式
+
+        Returns
+        ------
+        `asyncio.Task`
+            執行暖機工作的 task
+        """
+        task = cls._tasks.get(name)
+        if task is None or task.done():
+            task = asyncio.create_task(cls._run(name, func))
+            cls._tasks[name] = task
+        return task
+
+    @classmethod
+    def is_ready(cls, name: str) -> bool:
+        """暖機工作是否已經結束"""
+        return name in cls._ready
+
+    @classmethod
+    async def check_ready(cls, interaction: discord.Interaction, *names: str) -> bool:
+        """檢查指令需要的暖機工作是否都已經結束，尚未結束時回覆使用者稍後再試
+
+        Parameters
+        ------
+        interaction: `discord.Interaction`
+            指令的互動
+        *names: `str`
+            指令需要的暖機工作名稱
+
+        Returns
+        ------
+        `bool`
+            `True` 表示資料已經準備好，`False` 表示已回覆使用者
+        """
+        if all(cls.is_ready(name) for name in names):
+            return True
+        await interaction.response.send_message(embed=EmbedTemplate.error("資料載入中，請稍後再試"), ephemeral=True)
+        return False
+
+    @classmethod
+    async def _run(cls, name: str, func: Callable[[], Awaitable[None]]) -> None:
+        start = time.perf_counter()
+        try:
+            await func()
+        except Exception as e:
+            LOG.Error(f"warm up ({name}): 發生錯誤 {e}，使用本地既有的資料")
+            sentry_sdk.capture_exception(e)
+        else:
+            LOG.System(f"warm up ({name}): 完成，花費 {time.perf_counter() - start:.2f}s")
+        finally:
+            cls._ready.add(name)